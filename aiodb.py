@@ -0,0 +1,108 @@
+import asyncio
+import itertools
+import os
+import time
+
+import metrics
+from db import (DB_BACKEND, DB_CONFIG, DB_REPLICAS, POOL_PING_AFTER, POOL_SIZE, POOL_TIMEOUT,
+                REPLICA_RETRY_AFTER, PoolTimeout, connections, get_connection, replica_config, replica_up)
+
+# Асинхронний пул для ASGI-режиму (asgi.py). З'єднання не тримають потік,
+# поки чекають на базу, тож пул може бути значно більшим за синхронний.
+ASYNC_POOL_SIZE = int(os.environ.get("DB_ASYNC_POOL_SIZE", POOL_SIZE * 4))
+
+# Пули за адресою сервера: None — основний, інакше репліка з DB_REPLICAS
+_pools = {}
+_pool_lock = asyncio.Lock()
+_next_replica = itertools.count()
+_replica_down_until = {}
+
+
+async def get_pool(address=None):
+    if address not in _pools:
+        async with _pool_lock:
+            if address not in _pools:
+                import aiomysql
+                config = DB_CONFIG if address is None else replica_config(address)
+                _pools[address] = await aiomysql.create_pool(
+                    host=config["host"], port=config.get("port", 3306), user=config["user"],
+                    password=config["password"], db=config["database"], minsize=0, maxsize=ASYNC_POOL_SIZE,
+                    autocommit=True, pool_recycle=POOL_PING_AFTER)
+    return _pools[address]
+
+
+async def close_pool():
+    pools = list(_pools.values())
+    _pools.clear()
+    for pool in pools:
+        pool.close()
+        await pool.wait_closed()
+
+
+async def _acquire(address):
+    pool = await get_pool(address)
+    try:
+        return pool, await asyncio.wait_for(pool.acquire(), POOL_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise PoolTimeout("Немає вільних з'єднань з базою даних")
+
+
+async def _acquire_replica():
+    """З'єднання з наступною доступною реплікою (як db.ReplicaSet) або None."""
+    import aiomysql
+    start = next(_next_replica)
+    for n in range(len(DB_REPLICAS)):
+        address = DB_REPLICAS[(start + n) % len(DB_REPLICAS)]
+        if _replica_down_until.get(address, 0) > time.monotonic():
+            continue
+        try:
+            acquired = await _acquire(address)
+        except (OSError, PoolTimeout, aiomysql.MySQLError):
+            _replica_down_until[address] = time.monotonic() + REPLICA_RETRY_AFTER
+            replica_up.set(0, address)
+            continue
+        replica_up.set(1, address)
+        return acquired
+    return None
+
+
+async def fetch_all(sql, params=(), primary=True):
+    """
+    Виконує SELECT і повертає рядки як словники (як cursor(dictionary=True)).
+
+    primary=False — читати з репліки, якщо вони налаштовані й доступні.
+    """
+    if DB_BACKEND != "mysql":
+        # Для вбудованої бази немає асинхронного драйвера: запит іде через
+        # синхронний пул у потоці, а запити до SQLite — мілісекунди
+        return await asyncio.to_thread(_fetch_all_sync, sql, params)
+    import aiomysql
+    started = time.perf_counter()
+    acquired = None if primary or not DB_REPLICAS else await _acquire_replica()
+    connections.inc(1, "primary" if acquired is None else "replica")
+    pool, conn = acquired or await _acquire(None)
+    metrics.observe_acquire(time.perf_counter() - started)
+    try:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            started = time.perf_counter()
+            try:
+                await cur.execute(sql, tuple(params))
+            finally:
+                label = metrics.observe_query(sql, time.perf_counter() - started)
+            rows = await cur.fetchall()
+        metrics.observe_rows(label, len(rows))
+        return list(rows)
+    finally:
+        pool.release(conn)
+
+
+def _fetch_all_sync(sql, params):
+    conn = get_connection()
+    try:
+        cur = conn.cursor(dictionary=True)
+        cur.execute(sql, tuple(params))
+        rows = cur.fetchall()
+        cur.close()
+        return rows
+    finally:
+        conn.close()
@@ -0,0 +1,119 @@
+from collections import Counter
+from datetime import timedelta
+
+from availability import to_date
+
+# Зведені таблиці (див. course_work.sql) оновлюються в тій самій транзакції,
+# що й основні таблиці: після вставки — з sign=1, перед видаленням — з sign=-1,
+# при зміні — обидва виклики навколо UPDATE.
+
+
+def _upsert(cur, table, keys, counters, rows):
+    if not rows:
+        return
+    columns = keys + counters
+    updates = ", ".join(f"{c} = {table}.{c} + VALUES({c})" for c in counters)
+    cur.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON DUPLICATE KEY UPDATE {updates}",
+        rows)
+
+
+def apply_payments(cur, where, params, sign=1):
+    """Додає (sign=1) або віднімає (sign=-1) оплати, що відповідають умові, з revenue_daily."""
+    cur.execute(f"""SELECT payment_date, payment_method, SUM(amount), COUNT(*) FROM payments
+                    WHERE {where} GROUP BY payment_date, payment_method""", params)
+    rows = [(to_date(day), method, sign * amount, sign * count)
+            for day, method, amount, count in cur.fetchall()]
+    _upsert(cur, "revenue_daily", ["day", "payment_method"], ["amount", "payments"], rows)
+
+
+def apply_orders(cur, where, params, sign=1):
+    """Те саме для замовлень і таблиці dish_sales_daily."""
+    cur.execute(f"""SELECT order_date, dish_id, SUM(quantity), SUM(quantity * price), COUNT(*) FROM orders
+                    WHERE {where} GROUP BY order_date, dish_id""", params)
+    rows = [(to_date(day), dish_id, sign * quantity, sign * revenue, sign * count)
+            for day, dish_id, quantity, revenue, count in cur.fetchall()
+            if day is not None and dish_id is not None]
+    _upsert(cur, "dish_sales_daily", ["day", "dish_id"], ["quantity", "revenue", "orders"], rows)
+
+
+def apply_bookings(cur, where, params, sign=1):
+    """
+    Те саме для нескасованих бронювань і occupancy_daily.
+
+    Кожне бронювання розкладається на ночі від check_in до check_out,
+    тож заповненість за період рахується підсумовуванням по днях.
+    """
+    cur.execute(f"""SELECT room_id, check_in, check_out FROM bookings
+                    WHERE ({where}) AND booking_status <> 'cancelled'""", params)
+    bookings = cur.fetchall()
+    if not bookings:
+        return
+    room_ids = sorted({room_id for room_id, _, _ in bookings})
+    cur.execute(f"SELECT room_id, type FROM rooms WHERE room_id IN ({', '.join(['%s'] * len(room_ids))})",
+                tuple(room_ids))
+    types = dict(cur.fetchall())
+
+    nights = Counter()
+    for room_id, check_in, check_out in bookings:
+        day, last = to_date(check_in), to_date(check_out)
+        while day < last:
+            nights[(day, types.get(room_id))] += 1
+            day += timedelta(days=1)
+    rows = [(day, room_type, sign * count) for (day, room_type), count in nights.items()
+            if room_type is not None]
+    _upsert(cur, "occupancy_daily", ["day", "room_type"], ["room_nights"], rows)
+
+
+def rebuild(cur):
+    """Перераховує всі зведені таблиці з нуля (після міграції або ручних змін у базі)."""
+    for table in ("revenue_daily", "dish_sales_daily", "occupancy_daily"):
+        cur.execute(f"DELETE FROM {table}")
+    apply_payments(cur, "1=1", ())
+    apply_orders(cur, "1=1", ())
+    apply_bookings(cur, "1=1", ())
+
+
+def revenue(cur, date_from, date_to, group):
+    key = {"day": "day", "method": "payment_method"}[group]
+    cur.execute(f"""SELECT {key} AS {group}, SUM(amount) AS amount, SUM(payments) AS payments
+                    FROM revenue_daily WHERE day >= %s AND day <= %s
+                    GROUP BY {key} HAVING SUM(payments) <> 0 ORDER BY {key}""", (date_from, date_to))
+    return cur.fetchall()
+
+
+def dish_sales(cur, date_from, date_to):
+    cur.execute("""SELECT m.category, s.dish_id, m.name, SUM(s.quantity) AS quantity,
+                          SUM(s.revenue) AS revenue, SUM(s.orders) AS orders
+                   FROM dish_sales_daily s LEFT JOIN menuitems m ON m.dish_id = s.dish_id
+                   WHERE s.day >= %s AND s.day <= %s
+                   GROUP BY m.category, s.dish_id, m.name
+                   HAVING SUM(s.orders) <> 0
+                   ORDER BY m.category, quantity DESC""", (date_from, date_to))
+    categories = {}
+    for row in cur.fetchall():
+        category = categories.setdefault(row["category"], {"category": row["category"], "quantity": 0,
+                                                           "revenue": 0, "dishes": []})
+        category["quantity"] += row["quantity"]
+        category["revenue"] += row["revenue"]
+        category["dishes"].append({"dish_id": row["dish_id"], "name": row["name"], "quantity": row["quantity"],
+                                   "revenue": row["revenue"], "orders": row["orders"]})
+    return list(categories.values())
+
+
+def occupancy(cur, date_from, date_to):
+    days = (date_to - date_from).days + 1
+    cur.execute("SELECT type, COUNT(*) AS rooms FROM rooms GROUP BY type")
+    rooms = {row["type"]: row["rooms"] for row in cur.fetchall()}
+    cur.execute("""SELECT room_type, SUM(room_nights) AS room_nights FROM occupancy_daily
+                   WHERE day >= %s AND day <= %s GROUP BY room_type
+                   HAVING SUM(room_nights) <> 0""", (date_from, date_to))
+    booked = {row["room_type"]: row["room_nights"] for row in cur.fetchall()}
+    result = []
+    for room_type in sorted(set(rooms) | set(booked), key=str):
+        available = rooms.get(room_type, 0) * days
+        nights = booked.get(room_type, 0)
+        result.append({"room_type": room_type, "rooms": rooms.get(room_type, 0), "room_nights": nights,
+                       "occupancy_rate": round(float(nights) / available, 4) if available else None})
+    return result
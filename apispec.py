@@ -0,0 +1,65 @@
+"""
+Попередньо зібрана специфікація Swagger.
+
+Flasgger будує /apispec_1.json, розбираючи YAML з docstring-ів усіх
+обробників. Щоб не робити цього під час старту кожного процесу, специфікацію
+можна зібрати заздалегідь:
+
+    python apispec.py
+
+а в продакшні запускати з SWAGGER_PRECOMPILED=1 — тоді /apispec_1.json
+віддається з файлу з ETag і довгим Cache-Control, а docstring-и не розбираються.
+"""
+import hashlib
+import json
+import os
+import sys
+
+from flask import Response, request
+
+SPEC_FILE = os.environ.get("SWAGGER_SPEC_FILE",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "apispec.json"))
+PRECOMPILED = os.environ.get("SWAGGER_PRECOMPILED", "0") == "1"
+MAX_AGE = int(os.environ.get("SWAGGER_SPEC_MAX_AGE", 86400))
+
+SPEC_ENDPOINT = "flasgger.apispec_1"
+
+
+def build(app, swagger, path=SPEC_FILE):
+    """Розбирає docstring-и і записує специфікацію у файл. Повертає її розмір у байтах."""
+    with app.test_request_context():
+        spec = swagger.get_apispecs()
+    body = json.dumps(spec, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode()
+    with open(path, "wb") as f:
+        f.write(body)
+    return len(body)
+
+
+def init_app(app):
+    """У режимі SWAGGER_PRECOMPILED підміняє обробник /apispec_1.json читанням файлу."""
+    if not PRECOMPILED:
+        return
+    try:
+        with open(SPEC_FILE, "rb") as f:
+            body = f.read()
+    except FileNotFoundError:
+        raise RuntimeError(f"Немає {SPEC_FILE}: зберіть специфікацію командою `python apispec.py`")
+    etag = hashlib.sha1(body).hexdigest()
+
+    def precompiled_spec():
+        response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = f"public, max-age={MAX_AGE}"
+        return response.make_conditional(request)
+
+    app.view_functions[SPEC_ENDPOINT] = precompiled_spec
+
+
+if __name__ == "__main__":
+    # Збирати завжди з docstring-ів, навіть якщо в оточенні ввімкнено готовий файл
+    os.environ["SWAGGER_PRECOMPILED"] = "0"
+    from app import app, swagger
+
+    path = sys.argv[1] if len(sys.argv) > 1 else SPEC_FILE
+    size = build(app, swagger, path)
+    print(f"{path}: {size} байт")
@@ -1,1025 +1,651 @@
-from flask import Flask, request, redirect, jsonify
+import os
+from datetime import date
+
+from flask import Flask, Response, request, redirect, jsonify
 from flasgger import Swagger
-from db import get_connection
+
+import analytics
+import apispec
+import changefeed
+import formats
+import idempotency
+import importer
+import metrics
+import writebehind
+from availability import AvailabilityIndex, find_conflict, lock_room
+from crud import Resource, int_arg, request_data
+from db import get_connection, init_app, primary_connection
+from errors import ApiError
+from frontdesk import FrontDesk
+from pricing import PriceIndex
 
 app = Flask(__name__)
 swagger = Swagger(app)
+apispec.init_app(app)
+init_app(app)
+# after_request виконуються у зворотному порядку: idempotency зберігає ще
+# нестиснуту відповідь, а metrics бачить розмір уже стиснутої
+metrics.init_app(app)
+formats.init_app(app)
+idempotency.init_app(app)
+# Індекси в пам'яті перевіряють записи, тому завантажуються з основного сервера
+availability_index = AvailabilityIndex(primary_connection)
+price_index = PriceIndex(primary_connection)
+
+# Режим запуску через `python app.py`: sync — вбудований сервер Flask,
+# async — ASGI-застосунок з asgi.py під uvicorn
+SERVER_MODE = os.environ.get("SERVER_MODE", "sync")
+SERVER_HOST = os.environ.get("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("SERVER_PORT", 5000))
+# Налагоджувач Werkzeug дозволяє виконати довільний код, тож лише для локальної розробки
+SERVER_DEBUG = os.environ.get("SERVER_DEBUG", "0") == "1"
+
+
+@app.errorhandler(ApiError)
+def api_error(e):
+    return jsonify({"message": e.message}), e.status
+
+
+def parse_period(check_in, check_out):
+    try:
+        check_in = date.fromisoformat(str(check_in)[:10])
+        check_out = date.fromisoformat(str(check_out)[:10])
+    except ValueError:
+        raise ApiError("Дати мають бути у форматі YYYY-MM-DD")
+    if check_in >= check_out:
+        raise ApiError("Дата виїзду має бути пізніше дати заїзду")
+    return check_in, check_out
+
+
+def reserve_room(cur, room_id, check_in, check_out, booking_id=None):
+    """Перевіряє в поточній транзакції, що номер існує і вільний на ці дати."""
+    if not lock_room(cur, room_id):
+        raise ApiError("Номер не знайдено", 404)
+    conflict = find_conflict(cur, room_id, check_in, check_out, booking_id)
+    if conflict is not None:
+        raise ApiError(f"Номер уже заброньовано на ці дати (бронювання {conflict})", 409)
+
+
+def date_range_args():
+    try:
+        date_from = date.fromisoformat(request.args['date_from'])
+        date_to = date.fromisoformat(request.args['date_to'])
+    except KeyError:
+        raise ApiError("Потрібно вказати date_from та date_to")
+    except ValueError:
+        raise ApiError("Дати мають бути у форматі YYYY-MM-DD")
+    if date_from > date_to:
+        raise ApiError("date_from має бути не пізніше date_to")
+    return date_from, date_to
+
+
+def check_booking(cur, booking_id, row):
+    """Нескасоване бронювання має займати вільний номер."""
+    check_in, check_out = parse_period(row["check_in"], row["check_out"])
+    if row["booking_status"] != "cancelled":
+        reserve_room(cur, row["room_id"], check_in, check_out, booking_id)
+
+
+def booking_written(op, booking_id, row):
+    if op == "bulk":
+        availability_index.invalidate()
+    elif op == "delete" or row["booking_status"] == "cancelled":
+        availability_index.remove_booking(booking_id)
+    else:
+        availability_index.add_booking(booking_id, row["room_id"], row["check_in"], row["check_out"])
+
+
+def room_written(op, room_id, row):
+    # Заїзд і виїзд (frontdesk.py) змінюють лише room_status, від якого індекс не залежить
+    if row is None or set(row) != {"room_status"}:
+        availability_index.invalidate()
+    price_index.written("room", op, room_id, row)
+
+
+def menu_written(op, dish_id, row):
+    price_index.written("dish", op, dish_id, row)
+
+
+def client_written(op, client_id, row):
+    # Разом із клієнтом каскадно видаляються його бронювання
+    if op == "delete":
+        availability_index.invalidate()
+
+
+RESOURCES = [
+    Resource("clients", "Client", "Clients",
+             {"list": "Отримати всіх клієнтів", "create": "Додати нового клієнта",
+              "bulk": "Додати кількох клієнтів", "update": "Оновити дані клієнта",
+              "bulk_update": "Оновити кількох клієнтів", "bulk_delete": "Видалити кількох клієнтів",
+              "delete": "Видалити клієнта", "not_found": "Клієнта не знайдено"},
+             cascade=[("payments", analytics.apply_payments, "client_id=%s"),
+                      ("orders", analytics.apply_orders, "client_id=%s"),
+                      ("bookings", analytics.apply_bookings, "client_id=%s")],
+             on_write=client_written),
+    Resource("bookings", "Booking", "Bookings",
+             {"list": "Отримати всі бронювання", "create": "Додати нове бронювання",
+              "bulk": "Додати кілька бронювань", "update": "Оновити бронювання",
+              "bulk_update": "Оновити кілька бронювань", "bulk_delete": "Видалити кілька бронювань",
+              "delete": "Видалити бронювання", "not_found": "Бронювання не знайдено"},
+             summary=analytics.apply_bookings, cascade=[("payments", analytics.apply_payments, "booking_id=%s")],
+             check=check_booking, on_write=booking_written, compute=price_index.price_booking),
+    Resource("menuitems", "Menu item", "Menu Items",
+             {"list": "Отримати всі елементи меню", "create": "Додати новий елемент меню",
+              "bulk": "Додати кілька елементів меню", "update": "Оновити елемент меню",
+              "bulk_update": "Оновити кілька елементів меню", "bulk_delete": "Видалити кілька елементів меню",
+              "delete": "Видалити елемент меню", "not_found": "Елемент меню не знайдено"},
+             cached=True, on_write=menu_written),
+    Resource("orders", "Order", "Orders",
+             {"list": "Отримати всі замовлення", "create": "Додати нове замовлення",
+              "bulk": "Додати кілька замовлень", "update": "Оновити замовлення",
+              "bulk_update": "Оновити кілька замовлень", "bulk_delete": "Видалити кілька замовлень",
+              "delete": "Видалити замовлення", "not_found": "Замовлення не знайдено"},
+             summary=analytics.apply_orders, cascade=[("payments", analytics.apply_payments, "order_id=%s")],
+             compute=price_index.price_order),
+    Resource("payments", "Payment", "Payments",
+             {"list": "Отримати всі оплати", "create": "Додати нову оплату",
+              "bulk": "Додати кілька оплат", "update": "Оновити оплату",
+              "bulk_update": "Оновити кілька оплат", "bulk_delete": "Видалити кілька оплат",
+              "delete": "Видалити оплату", "not_found": "Оплату не знайдено"},
+             summary=analytics.apply_payments),
+    Resource("rooms", "Room", "Rooms",
+             {"list": "Отримати всі номери готелю", "create": "Додати новий номер",
+              "bulk": "Додати кілька номерів", "update": "Оновити номер",
+              "bulk_update": "Оновити кілька номерів", "bulk_delete": "Видалити кілька номерів",
+              "delete": "Видалити номер", "not_found": "Номер не знайдено"},
+             cached=True,
+             cascade=[("payments", analytics.apply_payments,
+                       "booking_id IN (SELECT booking_id FROM bookings WHERE room_id=%s)"),
+                      ("bookings", analytics.apply_bookings, "room_id=%s")],
+             dependents=[({"type"}, analytics.apply_bookings, "room_id=%s")], on_write=room_written),
+]
+for resource in RESOURCES:
+    resource.register(app)
+writebehind.init_app(app, RESOURCES[3])  # orders
+changefeed.init_app(app)
+importer.init_app(app, RESOURCES)
+front_desk = FrontDesk(bookings=RESOURCES[1], rooms=RESOURCES[5], payments=RESOURCES[4])
+
+
 @app.route('/')
 def index():
     return redirect('/apidocs/')
 
-@app.route('/clients', methods=['GET'])
-def get_clients():
+@app.route('/clients/<int:id>/folio', methods=['GET'])
+def get_client_folio(id):
     """
-    Отримати всіх клієнтів
+    Отримати рахунок клієнта
     ---
     tags:
       - Clients
-    summary: Виводить усіх клієнтів, які зареєстровані у базі даних
+    summary: Виводить бронювання, замовлення, оплати та борг клієнта
     description: |
-      Цей метод дозволяє вивести інформацію про усіх клієнтів.
-    responses:
-      200:
-        description: Список клієнтів
-    """
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM clients")
-    data = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return jsonify(data)
-
-
-@app.route('/clients', methods=['POST'])
-def create_client():
-    """
-    Додати нового клієнта
-    ---
-    tags:
-      - Clients
-    summary: Додає нового клієнта до бази даних
-    description: |
-      Цей метод дозволяє створити нового клієнта.
-      Потрібно вказати ім'я, прізвище, телефон та email.
-    parameters:
-      - name: name
-        in: formData
-        type: string
-        required: true
-        example: Анастасія
-        description: Ім'я клієнта
-      - name: surname
-        in: formData
-        type: string
-        required: true
-        example: Мельник
-        description: Прізвище клієнта
-      - name: phone
-        in: formData
-        type: string
-        required: true
-        example: "380501234567"
-        description: Номер телефону клієнта
-      - name: email
-        in: formData
-        type: string
-        required: true
-        example: test@example.com
-        description: Email клієнта
-    responses:
-      201:
-        description: Клієнта успішно створено
-    """
-    data = request.form
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    sql = """INSERT INTO clients (name, surname, phone, email)
-             VALUES (%s, %s, %s, %s)"""
-
-    cursor.execute(sql, (
-        data['name'],
-        data['surname'],
-        data['phone'],
-        data['email']
-    ))
-
-    conn.commit()
-    new_id = cursor.lastrowid
-
-    cursor.close()
-    conn.close()
-
-    return jsonify({"message": "Client added", "client_id": new_id}), 201
-
-@app.route('/clients/<int:id>', methods=['PUT'])
-def update_client(id):
-    """
-    Оновити дані клієнта
-    ---
-    tags:
-      - Clients
-    summary: Оновлює інформацію про клієнта
-    description: |
-      Цей метод дозволяє оновити інформацію про клієнта.
-      Потрібно обов'язково вказати id клієнта
-      та заповнити тільки ті поля, які хочете змінити.
+      Цей метод дозволяє отримати весь рахунок гостя одним запитом:
+      бронювання з номерами кімнат, замовлення з назвами страв, оплати
+      та залишок до сплати (нескасовані бронювання + замовлення - оплати).
     parameters:
       - name: id
         in: path
         type: integer
         required: true
-      - name: name
-        in: formData
-        type: string
-      - name: surname
-        in: formData
-        type: string
-      - name: phone
-        in: formData
-        type: string
-      - name: email
-        in: formData
-        type: string
     responses:
       200:
-        description: Дані успішно оновлено
-    """
-    data = request.form
-    conn = get_connection()
-    cur = conn.cursor()
-
-    fields = []
-    values = []
-    for key in ['name', 'surname', 'phone', 'email']:
-        if key in data:
-            fields.append(f"{key}=%s")
-            values.append(data[key])
-
-    if not fields:
-        return jsonify({"message": "Нічого оновлювати"}), 400
-
-    sql = f"UPDATE clients SET {', '.join(fields)} WHERE client_id=%s"
-    values.append(id)
-    cur.execute(sql, tuple(values))
-    conn.commit()
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Client updated"})
-
-@app.route('/clients/<int:id>', methods=['DELETE'])
-def delete_client(id):
-    """
-    Видалити клієнта
-    ---
-    tags:
-      - Clients
-    summary: Видаляє клієнта з бази даних
-    description: |
-      Цей метод дозволяє видалити клієнта.
-      Потрібно вказати лише id клієнта, якого хочете видалити.
-    parameters:
-      - name: id
-        in: path
-        type: integer
-        required: true
-    responses:
-      204:
-        description: Клієнта успішно видалено
-    """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM clients WHERE client_id=%s", (id,))
-    conn.commit()
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Deleted"}), 204
-
-@app.route('/bookings', methods=['GET'])
-def get_bookings():
-    """
-    Отримати всі бронювання
-    ---
-    tags:
-      - Bookings
-    summary: Виводить список усіх бронювань
-    description: |
-      Цей метод дозволяє отримати інформацію про всі бронювання.
-    responses:
-      200:
-        description: Список бронювань
+        description: Рахунок клієнта
+      404:
+        description: Клієнта не знайдено
     """
     conn = get_connection()
     cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM bookings")
-    data = cur.fetchall()
+    cur.execute("SELECT client_id, name, surname, phone, email FROM clients WHERE client_id=%s", (id,))
+    client = cur.fetchone()
+    if client is None:
+        return jsonify({"message": "Клієнта не знайдено"}), 404
+
+    # Один запит замість трьох; кожна частина — пошук за індексом по client_id
+    cur.execute("""
+        SELECT 'booking' AS kind, b.booking_id AS id, b.room_id AS ref_id, r.room_number AS ref_name,
+               b.check_in AS date_from, b.check_out AS date_to, NULL AS quantity, NULL AS price,
+               b.total_amount AS amount, b.booking_status AS status, NULL AS booking_id, NULL AS order_id
+        FROM bookings b LEFT JOIN rooms r ON r.room_id = b.room_id
+        WHERE b.client_id = %s
+        UNION ALL
+        SELECT 'order', o.order_id, o.dish_id, m.name, o.order_date, NULL, o.quantity, o.price,
+               o.quantity * o.price, o.order_status, NULL, NULL
+        FROM orders o LEFT JOIN menuitems m ON m.dish_id = o.dish_id
+        WHERE o.client_id = %s
+        UNION ALL
+        SELECT 'payment', p.payment_id, NULL, NULL, p.payment_date, NULL, NULL, NULL,
+               p.amount, p.payment_method, p.booking_id, p.order_id
+        FROM payments p
+        WHERE p.client_id = %s
+        ORDER BY date_from, id""", (id, id, id))
+    rows = cur.fetchall()
     cur.close()
     conn.close()
-    return jsonify(data)
 
-@app.route('/bookings', methods=['POST'])
-def add_booking():
-    """
-    Додати нове бронювання
+    bookings, orders, payments = [], [], []
+    charged = paid = 0
+    for row in rows:
+        if row["kind"] == "booking":
+            bookings.append({"booking_id": row["id"], "room_id": row["ref_id"], "room_number": row["ref_name"],
+                             "check_in": row["date_from"], "check_out": row["date_to"],
+                             "total_amount": row["amount"], "booking_status": row["status"]})
+            if row["status"] != "cancelled":
+                charged += row["amount"]
+        elif row["kind"] == "order":
+            orders.append({"order_id": row["id"], "dish_id": row["ref_id"], "dish_name": row["ref_name"],
+                           "order_date": row["date_from"], "quantity": row["quantity"], "price": row["price"],
+                           "line_total": row["amount"], "order_status": row["status"]})
+            charged += row["amount"] or 0
+        else:
+            payments.append({"payment_id": row["id"], "booking_id": row["booking_id"], "order_id": row["order_id"],
+                             "payment_date": row["date_from"], "amount": row["amount"],
+                             "payment_method": row["status"]})
+            paid += row["amount"]
+
+    return jsonify({"client": client, "bookings": bookings, "orders": orders, "payments": payments,
+                    "total_charged": charged, "total_paid": paid, "balance": charged - paid})
+
+@app.route('/rooms/available', methods=['GET'])
+def get_available_rooms():
+    """
+    Знайти вільні номери
     ---
     tags:
-      - Bookings
-    summary: Додає нове бронювання до бази даних
+      - Rooms
+    summary: Виводить номери, вільні на вказаний період
     description: |
-      Цей метод дозволяє створити нове бронювання.
-      Потрібно вказати id клієнта, id кімнати,
-      дату заїзду та виїзду, загальну суму та статус бронювання.
+      Цей метод дозволяє знайти номери, які не мають бронювань
+      (крім скасованих), що перетинаються з періодом від check_in до check_out.
+      День виїзду вважається вільним для наступного заїзду.
     parameters:
-      - name: client_id
-        in: formData
-        type: integer
-        required: true
-        example: 1
-      - name: room_id
-        in: formData
-        type: integer
-        required: true
-        example: 101
       - name: check_in
-        in: formData
+        in: query
         type: string
         format: date
         required: true
         example: "2025-11-20"
       - name: check_out
-        in: formData
+        in: query
         type: string
         format: date
         required: true
         example: "2025-11-25"
-      - name: total_amount
-        in: formData
-        type: number
-        required: true
-        example: 5000
-      - name: booking_status
-        in: formData
+      - name: type
+        in: query
         type: string
-        enum: ['confirmed','cancelled','completed']
-        required: true
+        required: false
+        example: "Double"
+        description: Тип номера
     responses:
-      201:
-        description: Бронювання успішно створено
+      200:
+        description: Список вільних номерів
+      400:
+        description: Некоректні дати
     """
-    data = request.form
-    conn = get_connection()
-    cur = conn.cursor()
-    sql = """INSERT INTO bookings(client_id, room_id, check_in, check_out, total_amount, booking_status)
-             VALUES (%s, %s, %s, %s, %s, %s)"""
-    cur.execute(sql, (data['client_id'], data['room_id'], data['check_in'], data['check_out'],
-                      data['total_amount'], data['booking_status']))
-    conn.commit()
-    new_id = cur.lastrowid
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Booking created", "id": new_id})
+    if 'check_in' not in request.args or 'check_out' not in request.args:
+        raise ApiError("Потрібно вказати check_in та check_out")
+    check_in, check_out = parse_period(request.args['check_in'], request.args['check_out'])
+    rooms = availability_index.free_rooms(check_in, check_out, request.args.get('type'))
+    return jsonify(rooms)
+
 
-@app.route('/bookings/<int:id>', methods=['PUT'])
-def update_booking(id):
+@app.route('/bookings/<int:id>/check-in', methods=['POST'])
+def check_in(id):
     """
-    Оновити бронювання
+    Заїзд гостя
     ---
     tags:
       - Bookings
-    summary: Оновлює інформацію про бронювання
+    summary: Поселяє гостя однією транзакцією
     description: |
-      Цей метод дозволяє змінити деяку інформацію про бронювання.
-      Потрібно обов'язково вказати id бронювання
-      та заповнити тільки ті поля, які хочете змінити.
+      Переводить бронювання зі статусу confirmed у checked_in, позначає номер
+      як occupied і, якщо передано amount, додає оплату за бронюванням.
+      Бронювання і номер блокуються до кінця транзакції, тож дві стійки
+      не можуть поселити гостей в один номер одночасно.
     parameters:
       - name: id
         in: path
         type: integer
         required: true
-      - name: client_id
-        in: formData
-        type: integer
-      - name: room_id
+      - name: amount
         in: formData
-        type: integer
-      - name: check_in
+        type: number
+        required: false
+        description: Сума оплати при заїзді
+      - name: payment_method
         in: formData
         type: string
-        format: date
-      - name: check_out
+        enum: ['cash', 'card', 'online']
+        required: false
+        description: Спосіб оплати (card)
+      - name: payment_date
         in: formData
         type: string
         format: date
-      - name: total_amount
-        in: formData
-        type: number
-      - name: booking_status
-        in: formData
-        type: string
-        enum: ['confirmed','cancelled']
+        required: false
+        description: Дата оплати (сьогодні)
     responses:
       200:
-        description: Бронювання успішно оновлено
+        description: Нові статуси бронювання і номера, id оплати і залишок до сплати
+      404:
+        description: Бронювання не знайдено
+      409:
+        description: Бронювання не в статусі confirmed або номер ще зайнятий
     """
-    data = request.form
-    conn = get_connection()
-    cur = conn.cursor()
+    return jsonify({"message": "Check-in completed", **front_desk.check_in(id, request_data())})
 
-    fields = []
-    values = []
-    for key in ['client_id', 'room_id', 'check_in', 'check_out', 'total_amount', 'booking_status']:
-        if key in data:
-            fields.append(f"{key}=%s")
-            values.append(data[key])
 
-    if not fields:
-        return jsonify({"message": "Нічого оновлювати"}), 400
-
-    sql = f"UPDATE bookings SET {', '.join(fields)} WHERE booking_id=%s"
-    values.append(id)
-    cur.execute(sql, tuple(values))
-    conn.commit()
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Booking updated"})
-
-@app.route('/bookings/<int:id>', methods=['DELETE'])
-def delete_booking(id):
+@app.route('/bookings/<int:id>/check-out', methods=['POST'])
+def check_out(id):
     """
-    Видалити бронювання
+    Виїзд гостя
     ---
     tags:
       - Bookings
-    summary: Видаляє бронювання з бази даних
+    summary: Закриває бронювання однією транзакцією
     description: |
-      Цей метод дозволяє видалити бронювання.
-      Потрібно вказати лише id бронювання, яке хочете видалити.
+      Переводить бронювання зі статусу checked_in у completed, звільняє номер
+      (available) і додає оплату залишку. Без amount сплачується вся решта
+      (total_amount мінус уже внесені оплати), amount=0 — виїзд без оплати.
     parameters:
       - name: id
         in: path
         type: integer
         required: true
-    responses:
-      204:
-        description: Бронювання успішно видалено
-    """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM bookings WHERE booking_id=%s", (id,))
-    conn.commit()
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Booking deleted"}), 204
-
-
-@app.route('/menuitems', methods=['GET'])
-def get_menu_items():
-    """
-    Отримати всі елементи меню
-    ---
-    tags:
-      - Menu Items
-    summary: Виводить список усіх елементів меню
-    description: |
-      Цей метод дозволяє вивести інформацію про елементи меню.
-    responses:
-      200:
-        description: Список елементів меню
-    """
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM menuitems")
-    data = cur.fetchall()
-    cur.close()
-    conn.close()
-    return jsonify(data)
-
-@app.route('/menuitems', methods=['POST'])
-def add_menu_item():
-    """
-    Додати новий елемент меню
-    ---
-    tags:
-      - Menu Items
-    summary: Додає новий елемент меню до бази даних
-    description: |
-      Цей метод дозволяє створити новий елемент меню.
-      Потрібно вказати назву елемента, категорію, та ціну.
-    parameters:
-      - name: name
-        in: formData
-        type: string
-        required: true
-        example: "Салат Цезар"
-      - name: category
-        in: formData
-        type: string
-        required: true
-        example: "Салати"
-      - name: price
+      - name: amount
         in: formData
         type: number
-        required: true
-        example: 150
-    responses:
-      201:
-        description: Елемент меню успішно створено
-    """
-    data = request.form
-    conn = get_connection()
-    cur = conn.cursor()
-    sql = """INSERT INTO menuitems(name, category, price)
-             VALUES (%s, %s, %s)"""
-    cur.execute(sql, (data['name'], data['category'], data['price']))
-    conn.commit()
-    new_id = cur.lastrowid
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Menu item created", "id": new_id})
-
-@app.route('/menuitems/<int:id>', methods=['PUT'])
-def update_menu_item(id):
-    """
-    Оновити елемент меню
-    ---
-    tags:
-      - Menu Items
-    summary: Оновлює дані елемента меню
-    description: |
-      Цей метод дозволяє змінити інформацію про елемент меню.
-      Потрібно обов'язково вказати id елемента,
-      та заповнити лише ті поля, які хочете змінити.
-    parameters:
-      - name: id
-        in: path
-        type: integer
-        required: true
-      - name: name
+        required: false
+        description: Сума оплати при виїзді (за замовчуванням — увесь залишок)
+      - name: payment_method
         in: formData
         type: string
-      - name: category
+        enum: ['cash', 'card', 'online']
+        required: false
+        description: Спосіб оплати (card)
+      - name: payment_date
         in: formData
         type: string
-      - name: price
-        in: formData
-        type: number
+        format: date
+        required: false
+        description: Дата оплати (сьогодні)
     responses:
       200:
-        description: Елемент меню успішно оновлено
+        description: Нові статуси бронювання і номера, id оплати і залишок до сплати
+      404:
+        description: Бронювання не знайдено
+      409:
+        description: Бронювання не в статусі checked_in
     """
-    data = request.form
-    conn = get_connection()
-    cur = conn.cursor()
+    return jsonify({"message": "Check-out completed", **front_desk.check_out(id, request_data())})
 
-    fields = []
-    values = []
-    for key in ['name', 'category', 'price']:
-        if key in data:
-            fields.append(f"{key}=%s")
-            values.append(data[key])
 
-    if not fields:
-        return jsonify({"message": "Нічого оновлювати"}), 400
-
-    sql = f"UPDATE menuitems SET {', '.join(fields)} WHERE dish_id=%s"
-    values.append(id)
-    cur.execute(sql, tuple(values))
-    conn.commit()
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Menu item updated"})
+def feed_table(table):
+    if table not in changefeed.FEED_TABLES:
+        raise ApiError(f"Журнал змін ведеться лише для {', '.join(changefeed.FEED_TABLES)}", 404)
+    return table
 
-@app.route('/menuitems/<int:id>', methods=['DELETE'])
-def delete_menu_item(id):
+@app.route('/changes/<table>', methods=['GET'])
+def get_changes(table):
     """
-    Видалити елемент меню
+    Зміни таблиці після заданого номера
     ---
     tags:
-      - Menu Items
-    summary: Видаляє елемент меню з бази даних
+      - Changes
+    summary: Виводить вставки, зміни та видалення записів з номером більше since
     description: |
-      Цей метод дозволяє видалити елемент меню.
-      Потрібно вказати лише id елемента меню, що хочете видалити.
+      Журнал змін ведеться для bookings, orders і payments. Кожна зміна має
+      номер seq, що зростає в межах таблиці; row — поточний стан запису
+      (null, якщо його видалено). Наступний запит робиться з since=next_since.
+      З параметром wait сервер тримає запит, доки не з'являться нові зміни
+      (long-poll), але не довше wait секунд. Записи журналу зберігаються
+      CHANGE_FEED_RETENTION_DAYS днів.
     parameters:
-      - name: id
+      - name: table
         in: path
-        type: integer
-        required: true
-    responses:
-      204:
-        description: Елемент меню успішно видалено
-    """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM menuitems WHERE dish_id=%s", (id,))
-    conn.commit()
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Menu item deleted"}), 204
-
-
-@app.route('/orders', methods=['GET'])
-def get_orders():
-    """
-    Отримати всі замовлення
-    ---
-    tags:
-      - Orders
-    summary: Виводить список усіх замовлень.
-    description: |
-      Цей метод дозволяє вивести усю інформацію про замовлення.
-    responses:
-      200:
-        description: Список замовлень
-    """
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM orders")
-    data = cur.fetchall()
-    cur.close()
-    conn.close()
-    return jsonify(data)
-
-@app.route('/orders', methods=['POST'])
-def add_order():
-    """
-    Додати нове замовлення
-    ---
-    tags:
-      - Orders
-    summary: Додає нове замовлення до бази даних
-    description: |
-      Цей метод дозволяє створити нове замовлення.
-      Потрібно вказати id клієнта, id страви,
-      дату замовлення, кількість, ціну за 1,
-      загальну ціну та статус замовлення .
-    parameters:
-      - name: client_id
-        in: formData
-        type: integer
-        required: true
-        example: 1
-      - name: dish_id
-        in: formData
-        type: integer
-        required: true
-        example: 1
-      - name: order_date
-        in: formData
         type: string
-        format: date-time
+        enum: ['bookings', 'orders', 'payments']
         required: true
-        example: "2025-11-16 18:00:00"
-      - name: quantity
-        in: formData
+      - name: since
+        in: query
         type: integer
-        required: true
-        example: 1
-      - name: price
-        in: formData
-        type: number
-        format: float
-        required: true
-        example: 100.00
-      - name: total_amount
-        in: formData
-        type: number
-        format: float
-        required: true
-        example: 1200.00
-      - name: order_status
-        in: formData
-        type: string
-        required: true
-        example: new/completed
-    responses:
-      201:
-        description: Замовлення успішно створено
-    """
-    data = request.form
-    conn = get_connection()
-    cur = conn.cursor()
-    sql = """INSERT INTO orders(client_id, dish_id, order_date, quantity, price, total_amount, order_status)
-             VALUES (%s, %s, %s, %s, %s, %s, %s)"""
-    cur.execute(sql, (data['client_id'], data['dish_id'], data['order_date'], data['quantity'],  data['price'], data['total_amount'],  data['order_status']))
-    conn.commit()
-    new_id = cur.lastrowid
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Order created", "id": new_id})
-
-@app.route('/orders/<int:id>', methods=['PUT'])
-def update_order(id):
-    """
-    Оновити замовлення
-    ---
-    tags:
-      - Orders
-    summary: Оновлює дані замовлення
-    description: |
-      Цей метод дозволяє оновити інформацію про замовлення.
-      Потрібно обов'язково вказати id замовлення,
-      та заповнити лише ті поля, які хочете змінити.
-    parameters:
-      - name: id
-        in: path
-        type: integer
-        required: true
-      - name: client_id
-        in: formData
-        type: integer
-      - name: dish_id
-        in: formData
+        required: false
+        description: Номер останньої отриманої зміни (0 — з початку)
+      - name: limit
+        in: query
         type: integer
-      - name: order_date
-        in: formData
-        type: string
-        format: date-time
-      - name: quantity
-        in: formData
+        required: false
+        description: Максимум змін у відповіді (до 1000, за замовчуванням 100)
+      - name: wait
+        in: query
         type: integer
-      - name: price
-        in: formData
-        type: number
-        format: float
-      - name: total_amount
-        in: formData
-        type: number
-        format: float
-      - name: order_status
-        in: formData
-        type: string
+        required: false
+        description: Скільки секунд чекати нових змін, якщо їх немає (до 30)
     responses:
       200:
-        description: Замовлення успішно оновлено
-    """
-    data = request.form
-    conn = get_connection()
-    cur = conn.cursor()
-
-    fields = []
-    values = []
-    for key in ['client_id', 'dish_id', 'order_date', 'quantity', 'price', 'total_amount', 'order_status']:
-        if key in data:
-            fields.append(f"{key}=%s")
-            values.append(data[key])
-
-    if not fields:
-        return jsonify({"message": "Нічого оновлювати"}), 400
-
-    sql = f"UPDATE orders SET {', '.join(fields)} WHERE order_id=%s"
-    values.append(id)
-    cur.execute(sql, tuple(values))
-    conn.commit()
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Order updated"})
-
-@app.route('/orders/<int:id>', methods=['DELETE'])
-def delete_order(id):
-    """
-    Видалити замовлення
+        description: Список змін і next_since
+      404:
+        description: Для таблиці журнал змін не ведеться
+      410:
+        description: Зміни після since уже видалено з журналу, таблицю треба завантажити заново
+    """
+    table = feed_table(table)
+    since = int_arg('since', 0, minimum=0)
+    limit = int_arg('limit', 100, minimum=1, maximum=changefeed.MAX_LIMIT)
+    wait = int_arg('wait', 0, minimum=0)
+    changes = changefeed.poll(table, since, limit, wait)
+    return jsonify({"changes": changes, "next_since": changes[-1]["seq"] if changes else since})
+
+@app.route('/changes/<table>/stream', methods=['GET'])
+def stream_changes(table):
+    """
+    Потік змін таблиці (Server-Sent Events)
     ---
     tags:
-      - Orders
-    summary: Видаляє замовлення з бази даних
+      - Changes
+    summary: Надсилає зміни таблиці в міру їх появи
     description: |
-      Цей метод дозволяє видалити замовлення.
-      Потрібно вказати id замовлення, яке хочете видалити.
+      Кожна зміна — подія з id рівним seq, типом insert, update або delete
+      і JSON-даними як у GET /changes/{table}. Сервер закриває потік через
+      CHANGE_FEED_STREAM_MAX_DURATION секунд; після цього чи після обриву
+      EventSource сам передає заголовок Last-Event-ID і продовжує з того ж місця.
     parameters:
-      - name: id
+      - name: table
         in: path
-        type: integer
+        type: string
+        enum: ['bookings', 'orders', 'payments']
         required: true
-    responses:
-      204:
-        description: Замовлення видалено
-    """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM orders WHERE order_id=%s", (id,))
-    conn.commit()
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Order deleted"}), 204
-
-
-@app.route('/payments', methods=['GET'])
-def get_payments():
-    """
-    Отримати всі оплати
-    ---
-    tags:
-      - Payments
-    summary: Виводить список усіх оплат
-    description: |
-      Цей метод дозволяє вивести усю інформацію про оплати.
+      - name: since
+        in: query
+        type: integer
+        required: false
+        description: Номер останньої отриманої зміни (якщо немає Last-Event-ID)
+    produces:
+      - text/event-stream
     responses:
       200:
-        description: Список оплат
-    """
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM payments")
-    data = cur.fetchall()
-    cur.close()
-    conn.close()
-    return jsonify(data)
-
-@app.route('/payments', methods=['POST'])
-def add_payment():
-    """
-    Додати нову оплату
+        description: Потік подій text/event-stream
+      404:
+        description: Для таблиці журнал змін не ведеться
+      410:
+        description: Зміни після since уже видалено з журналу, таблицю треба завантажити заново
+    """
+    table = feed_table(table)
+    since = int_arg('since', 0, minimum=0)
+    last_event_id = request.headers.get('Last-Event-ID')
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    changefeed.check_since(table, since)
+    # Генератор працює поза контекстом запиту і сам повертає з'єднання в пул
+    response = Response(changefeed.stream(table, since, app.json.dumps), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+@app.route('/analytics/revenue', methods=['GET'])
+def get_revenue():
+    """
+    Виручка за період
     ---
     tags:
-      - Payments
-    summary: Додає нову оплату до бази даних
+      - Analytics
+    summary: Виводить суму оплат по днях або за способом оплати
     description: |
-      Цей метод дозволяє створити нову оплату.
-      Потрібно вказати id клієнта, id бронювання,
-      id замовлення, дату оплати, суму та спосіб оплати.
+      Цей метод дозволяє отримати виручку за період зі зведеної таблиці
+      revenue_daily, яка оновлюється разом з оплатами.
     parameters:
-      - name: client_id
-        in: formData
-        type: integer
-        required: true
-        example: 1
-      - name: booking_id
-        in: formData
-        type: integer
-        required: false
-        example: 1
-      - name: order_id
-        in: formData
-        type: integer
-        required: false
-        example: 1
-      - name: payment_date
-        in: formData
+      - name: date_from
+        in: query
         type: string
-        format: date-time
-        required: true
-        example: "2025-11-16 18:30:00"
-      - name: amount
-        in: formData
-        type: number
-        format: float
+        format: date
         required: true
-        example: 500.00
-      - name: payment_method
-        in: formData
+        example: "2025-11-01"
+      - name: date_to
+        in: query
         type: string
-        enum: ['cash','card','online']
-        required: true
-    responses:
-      201:
-        description: Оплата успішно додана
-    """
-    data = request.form
-    conn = get_connection()
-    cur = conn.cursor()
-    sql = """INSERT INTO payments(client_id, booking_id, order_id, payment_date, amount, payment_method)
-             VALUES (%s, %s, %s, %s, %s, %s)"""
-    cur.execute(sql, (
-        data['client_id'], data.get('booking_id'), data.get('order_id'), data['payment_date'], data['amount'],
-        data['payment_method']
-    ))
-    conn.commit()
-    new_id = cur.lastrowid
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Payment added", "id": new_id})
-
-@app.route('/payments/<int:id>', methods=['PUT'])
-def update_payment(id):
-    """
-    Оновити оплату
-    ---
-    tags:
-      - Payments
-    summary: Оновлює дані оплати
-    description: |
-      Цей метод дозволяє оновити інформацію про оплату.
-      Потрібно обов'язково вказати id оплати, та заповнити лише ті поля,
-      які хочете змінити.
-    parameters:
-      - name: id
-        in: path
-        type: integer
+        format: date
         required: true
-      - name: client_id
-        in: formData
-        type: integer
-      - name: booking_id
-        in: formData
-        type: integer
-      - name: order_id
-        in: formData
-        type: integer
-      - name: payment_date
-        in: formData
-        type: string
-        format: date-time
-      - name: amount
-        in: formData
-        type: number
-        format: float
-      - name: payment_method
-        in: formData
+        example: "2025-11-30"
+      - name: group
+        in: query
         type: string
+        enum: ['day', 'method']
+        required: false
+        description: Групування — по днях (за замовчуванням) або за способом оплати
     responses:
       200:
-        description: Оплата успішно оновлена
+        description: Виручка за період
     """
-    data = request.form
+    date_from, date_to = date_range_args()
+    group = request.args.get('group', 'day')
+    if group not in ('day', 'method'):
+        raise ApiError("group має бути day або method")
     conn = get_connection()
-    cur = conn.cursor()
-
-    fields = []
-    values = []
-    for key in ['client_id', 'booking_id', 'order_id', 'payment_date', 'amount', 'payment_method']:
-        if key in data:
-            fields.append(f"{key}=%s")
-            values.append(data[key])
-
-    if not fields:
-        return jsonify({"message": "Нічого оновлювати"}), 400
-
-    sql = f"UPDATE payments SET {', '.join(fields)} WHERE payment_id=%s"
-    values.append(id)
-    cur.execute(sql, tuple(values))
-    conn.commit()
+    cur = conn.cursor(dictionary=True)
+    data = analytics.revenue(cur, date_from, date_to, group)
     cur.close()
     conn.close()
-    return jsonify({"message": "Payment updated"})
+    return jsonify(data)
 
-@app.route('/payments/<int:id>', methods=['DELETE'])
-def delete_payment(id):
+@app.route('/analytics/occupancy', methods=['GET'])
+def get_occupancy():
     """
-    Видалити оплату
+    Заповненість номерів за період
     ---
     tags:
-      - Payments
-    summary: Видаляє оплату з бази даних
+      - Analytics
+    summary: Виводить заповненість за типами номерів
     description: |
-      Цей метод дозволяє видалити оплату.
-      Потрібно вказати id оплати, яку хочете видалити.
+      Цей метод дозволяє отримати кількість заброньованих ночей і частку
+      зайнятих номерів кожного типу за період (зведена таблиця occupancy_daily).
     parameters:
-      - name: id
-        in: path
-        type: integer
+      - name: date_from
+        in: query
+        type: string
+        format: date
         required: true
-    responses:
-      204:
-        description: Оплата успішно видалена
-    """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM payments WHERE payment_id=%s", (id,))
-    conn.commit()
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Payment deleted"}), 204
-
-
-@app.route('/rooms', methods=['GET'])
-def get_rooms():
-    """
-    Отримати всі номери готелю
-    ---
-    tags:
-      - Rooms
-    summary: Виводить список усіх номерів готелю
-    description: |
-      Цей метод дозволяє вивести усю інформацію про номери готелю.
+        example: "2025-11-01"
+      - name: date_to
+        in: query
+        type: string
+        format: date
+        required: true
+        example: "2025-11-30"
     responses:
       200:
-        description: Список номерів
+        description: Заповненість за типами номерів
     """
+    date_from, date_to = date_range_args()
     conn = get_connection()
     cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM rooms")
-    data = cur.fetchall()
+    data = analytics.occupancy(cur, date_from, date_to)
     cur.close()
     conn.close()
     return jsonify(data)
 
-@app.route('/rooms', methods=['POST'])
-def add_room():
+@app.route('/analytics/dishes', methods=['GET'])
+def get_dish_sales():
     """
-    Додати новий номер
+    Продажі страв за період
     ---
     tags:
-      - Rooms
-    summary: Додає новий номер до бази даних
+      - Analytics
+    summary: Виводить продажі страв за категоріями
     description: |
-      Цей метод дозволяє створити новий номер.
-      Потрібно вказати № номера, тип, ціну на 1 ніч та статус.
+      Цей метод дозволяє отримати кількість і суму проданих страв
+      за категоріями меню (зведена таблиця dish_sales_daily).
     parameters:
-      - name: room_number
-        in: formData
-        type: integer
-        required: true
-        example: "101"
-      - name: type
-        in: formData
+      - name: date_from
+        in: query
         type: string
+        format: date
         required: true
-        example: "Люкс"
-      - name: price
-        in: formData
-        type: number
-        format: float
-        required: true
-        example: 2000.00
-      - name: room_status
-        in: formData
+        example: "2025-11-01"
+      - name: date_to
+        in: query
         type: string
+        format: date
         required: true
-        example: available/booked/maintenance
+        example: "2025-11-30"
     responses:
-      201:
-        description: Номер успішно додано
+      200:
+        description: Продажі за категоріями
     """
-    data = request.form
+    date_from, date_to = date_range_args()
     conn = get_connection()
-    cur = conn.cursor()
-    sql = """INSERT INTO rooms(room_number, type, price, room_status)
-             VALUES (%s, %s, %s, %s)"""
-    cur.execute(sql, (
-        data['room_number'], data['type'], data['price'], data['room_status']
-    ))
-    conn.commit()
-    new_id = cur.lastrowid
+    cur = conn.cursor(dictionary=True)
+    data = analytics.dish_sales(cur, date_from, date_to)
     cur.close()
     conn.close()
-    return jsonify({"message": "Room added", "id": new_id})
+    return jsonify(data)
 
-@app.route('/rooms/<int:id>', methods=['PUT'])
-def update_room(id):
+@app.route('/analytics/rebuild', methods=['POST'])
+def rebuild_analytics():
     """
-    Оновити номер
+    Перерахувати аналітику
     ---
     tags:
-      - Rooms
-    summary: Оновлює дані номера
+      - Analytics
+    summary: Перераховує зведені таблиці з основних
     description: |
-      Цей метод дозволяє оновити інформацію про номер.
-      Потрібно обов'язково вказати id номера, та заповнити лише ті поля,
-      які хочете змінити.
-    parameters:
-      - name: id
-        in: path
-        type: integer
-        required: true
-      - name: room_number
-        in: formData
-        type: integer
-      - name: type
-        in: formData
-        type: string
-      - name: price
-        in: formData
-        type: number
-        format: float
-      - name: room_status
-        in: formData
-        type: string
+      Цей метод потрібен лише після міграції бази або змін даних
+      в обхід API. Під час звичайної роботи зведені таблиці оновлюються самі.
     responses:
       200:
-        description: Номер успішно оновлено
+        description: Зведені таблиці перераховано
     """
-    data = request.form
     conn = get_connection()
     cur = conn.cursor()
-
-    fields = []
-    values = []
-    for key in ['room_number', 'type', 'price', 'room_status']:
-        if key in data:
-            fields.append(f"{key}=%s")
-            values.append(data[key])
-
-    if not fields:
-        return jsonify({"message": "Нічого оновлювати"}), 400
-
-    sql = f"UPDATE rooms SET {', '.join(fields)} WHERE room_id=%s"
-    values.append(id)
-    cur.execute(sql, tuple(values))
+    analytics.rebuild(cur)
     conn.commit()
     cur.close()
     conn.close()
-    return jsonify({"message": "Room updated"})
+    return jsonify({"message": "Analytics rebuilt"})
+
 
-@app.route('/rooms/<int:id>', methods=['DELETE'])
-def delete_room(id):
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
     """
-    Видалити номер
+    Метрики продуктивності
     ---
     tags:
-      - Rooms
-    summary: Видаляє номер з бази даних
+      - Monitoring
+    summary: Виводить метрики у форматі Prometheus
     description: |
-      Цей метод дозволяє видалити номер.
-      Потрібно обов'язково вказати id номера, який хочете видалити.
-    parameters:
-      - name: id
-        in: path
-        type: integer
-        required: true
+      Цей метод повертає гістограми часу обробки запитів і розміру відповідей
+      за маршрутами, час і кількість рядків SQL-запитів та час очікування
+      з'єднання з пулу. Лічильники ведуться окремо в кожному процесі.
     responses:
-      204:
-        description: Номер успішно видалено
+      200:
+        description: Метрики в текстовому форматі Prometheus
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM rooms WHERE room_id=%s", (id,))
-    conn.commit()
-    cur.close()
-    conn.close()
-    return jsonify({"message": "Room deleted"}), 204
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    if SERVER_MODE == "async":
+        import uvicorn
+        uvicorn.run("asgi:app", host=SERVER_HOST, port=SERVER_PORT)
+    else:
+        app.run(host=SERVER_HOST, port=SERVER_PORT, debug=SERVER_DEBUG)
\ No newline at end of file
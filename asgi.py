@@ -0,0 +1,174 @@
+"""
+ASGI-режим: `uvicorn asgi:app` або `SERVER_MODE=async python app.py`.
+
+Читання колекцій обробляються асинхронно через aiomysql (aiodb.py), тож
+повільні клієнти не займають потік на запит. Пошук вільних номерів
+відповідає з того самого індексу в пам'яті, що й у Flask-застосунку.
+Решта маршрутів (зміни даних, документація, аналітика, потоковий експорт)
+передаються синхронному Flask-застосунку, який виконується в пулі потоків.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from werkzeug.datastructures import MIMEAccept, MultiDict
+from werkzeug.http import parse_accept_header, parse_cookie, parse_etags, quote_etag
+
+import aiodb
+import formats
+import metrics
+from app import app as flask_app, availability_index, parse_period
+from cache import response_cache
+from crud import compress_entry, compressed_entry, page_query, page_result, selected_fields, wants_stream
+from db import PRIMARY_COOKIE, PoolTimeout
+from errors import ApiError
+
+# Скільки потоків обслуговують синхронні маршрути Flask
+SYNC_THREADS = int(os.environ.get("ASGI_SYNC_THREADS", 32))
+
+_sync_executor = ThreadPoolExecutor(max_workers=SYNC_THREADS, thread_name_prefix="wsgi")
+
+
+class _WsgiInstance(WsgiToAsgiInstance):
+    # asgiref за замовчуванням виконує всі WSGI-виклики в одному потоці
+    run_wsgi_app = sync_to_async(WsgiToAsgiInstance.__dict__["run_wsgi_app"].func, thread_sensitive=False,
+                                 executor=_sync_executor)
+
+
+class _WsgiApp(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await _WsgiInstance(self.wsgi_application, self.duplicate_header_limit)(scope, receive, send)
+
+
+wsgi_app = _WsgiApp(flask_app)
+
+
+class Request:
+    def __init__(self, scope):
+        self.path = scope["path"]
+        query = scope["query_string"].decode("latin-1")
+        self.full_path = f"{self.path}?{query}"
+        self.args = MultiDict(parse_qsl(query, keep_blank_values=True))
+        self.headers = {name.decode("latin-1").lower(): value.decode("latin-1")
+                        for name, value in scope["headers"]}
+        self.accept_mimetypes = parse_accept_header(self.headers.get("accept"), MIMEAccept)
+        self.cookies = parse_cookie(self.headers.get("cookie"))
+
+    @property
+    def reads_from_primary(self):
+        # Клієнт нещодавно змінював дані (див. db.pin_to_primary)
+        return PRIMARY_COOKIE in self.cookies
+
+
+def json_body(data):
+    # Той самий JSON-провайдер, що й у jsonify()
+    return flask_app.json.response(data).get_data()
+
+
+async def list_collection(request, table, primary=False):
+    fields = selected_fields(table, request.args)
+    sql, params, column, limit = page_query(table, fields, request.args)
+    data = await aiodb.fetch_all(sql, params, primary=primary or request.reads_from_primary)
+    body, mimetype = formats.encode_collection(page_result(table, data, column, limit), fields,
+                                               request.args, request.accept_mimetypes, flask_app.json.sort_keys)
+    return 200, body, [(b"content-type", mimetype.encode()), (b"vary", b"Accept, Accept-Encoding")]
+
+
+async def cached_collection(request, table):
+    """Аналог cached_collection() з app.py: спільний кеш, ETag і 304."""
+    mimetype = formats.negotiate(request.accept_mimetypes)
+    key = response_cache.key(table, f"{mimetype} {request.full_path}")
+    accept_encoding = request.headers.get("accept-encoding")
+    entry = compressed_entry(key, mimetype, accept_encoding)
+    if entry is None:
+        entry = response_cache.get(key)
+        if entry is None:
+            # Як і в crud.cached_collection, кеш наповнюється з основного сервера
+            _, body, _ = await list_collection(request, table, primary=True)
+            entry = response_cache.set(key, body), body
+        etag, body, encoding = compress_entry(key, *entry, mimetype, accept_encoding)
+    else:
+        etag, body, encoding = entry
+    headers = [(b"content-type", mimetype.encode()), (b"vary", b"Accept, Accept-Encoding"),
+               (b"etag", quote_etag(etag, weak=encoding is not None).encode()), (b"cache-control", b"no-cache")]
+    if parse_etags(request.headers.get("if-none-match")).contains_weak(etag):
+        return 304, b"", headers
+    if encoding is not None:
+        # Тіло вже стиснуте з кешу: send_response не стискатиме його вдруге
+        headers.append((b"content-encoding", encoding.encode()))
+    return 200, body, headers
+
+
+async def available_rooms(request):
+    args = request.args
+    if "check_in" not in args or "check_out" not in args:
+        raise ApiError("Потрібно вказати check_in та check_out")
+    check_in, check_out = parse_period(args["check_in"], args["check_out"])
+    # Як і GET /rooms/available у app.py — з індексу; раз на AVAILABILITY_INDEX_MAX_AGE
+    # він перечитується з бази, тому виклик іде в потоці, а не в циклі подій
+    rooms = await asyncio.to_thread(availability_index.free_rooms, check_in, check_out, args.get("type"))
+    return 200, json_body(rooms), [(b"vary", b"Accept-Encoding")]
+
+
+# Маршрути, які обробляються асинхронно (лише GET)
+ROUTES = {
+    "/clients": lambda request: list_collection(request, "clients"),
+    "/bookings": lambda request: list_collection(request, "bookings"),
+    "/orders": lambda request: list_collection(request, "orders"),
+    "/payments": lambda request: list_collection(request, "payments"),
+    "/menuitems": lambda request: cached_collection(request, "menuitems"),
+    "/rooms": lambda request: cached_collection(request, "rooms"),
+    "/rooms/available": available_rooms,
+}
+
+
+async def send_response(request, send, status, body, headers=()):
+    headers = list(headers)
+    if not any(name == b"content-type" for name, _ in headers):
+        headers.append((b"content-type", b"application/json"))
+    if status != 304:
+        if not any(name == b"content-encoding" for name, _ in headers):
+            mimetype = dict(headers)[b"content-type"].decode()
+            body, encoding = formats.compress(body, mimetype, request.headers.get("accept-encoding"))
+            if encoding is not None:
+                headers.append((b"content-encoding", encoding.encode()))
+                # Як і в Flask: стиснуте тіло отримує слабкий ETag
+                headers = [(name, b"W/" + value if name == b"etag" else value) for name, value in headers]
+        headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await aiodb.close_pool()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    handler = ROUTES.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "GET" else None
+    request = Request(scope) if handler is not None else None
+    if handler is None or wants_stream(request.args, request.accept_mimetypes):
+        return await wsgi_app(scope, receive, send)
+
+    started = time.perf_counter()
+    try:
+        status, body, headers = await handler(request)
+    except ApiError as e:
+        status, body, headers = e.status, json_body({"message": e.message}), []
+    except PoolTimeout as e:
+        status, body, headers = 503, json_body({"message": str(e)}), []
+    await send_response(request, send, status, body, headers)
+    metrics.request_latency.observe(time.perf_counter() - started, request.path, "GET", status)
+    metrics.response_size.observe(len(body), request.path, "GET")
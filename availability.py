@@ -0,0 +1,153 @@
+import bisect
+import os
+import threading
+import time
+from datetime import date, datetime
+
+# Як часто перечитувати індекс з бази (зміни з інших процесів)
+INDEX_MAX_AGE = float(os.environ.get("AVAILABILITY_INDEX_MAX_AGE", 60))
+
+
+def to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+class RoomIntervals:
+    """
+    Бронювання одного номера, відсортовані за датою заїзду.
+
+    max_end[i] — найпізніший виїзд серед перших i+1 інтервалів, тому
+    перевірка перетину з [check_in, check_out) — це один bisect.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.intervals = []
+        self.max_end = []
+
+    def add(self, check_in, check_out, booking_id):
+        i = bisect.bisect_right(self.starts, check_in)
+        self.starts.insert(i, check_in)
+        self.intervals.insert(i, (check_in, check_out, booking_id))
+        self._rebuild_max_end(i)
+
+    def remove(self, booking_id):
+        for i, interval in enumerate(self.intervals):
+            if interval[2] == booking_id:
+                del self.starts[i]
+                del self.intervals[i]
+                del self.max_end[i]
+                self._rebuild_max_end(i)
+                return
+
+    def _rebuild_max_end(self, start):
+        del self.max_end[start:]
+        current = self.max_end[-1] if self.max_end else None
+        for _, check_out, _ in self.intervals[start:]:
+            current = check_out if current is None or check_out > current else current
+            self.max_end.append(current)
+
+    def is_free(self, check_in, check_out):
+        # Інтервали, що починаються до check_out, перетинаються з запитом,
+        # якщо хоч один з них закінчується після check_in
+        i = bisect.bisect_left(self.starts, check_out)
+        return i == 0 or self.max_end[i - 1] <= check_in
+
+
+class AvailabilityIndex:
+    """Індекс зайнятості номерів, побудований з нескасованих бронювань."""
+
+    def __init__(self, connect, max_age=INDEX_MAX_AGE):
+        self._connect = connect
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._rooms = {}
+        self._intervals = {}
+        self._bookings = {}
+        self._loaded_at = None
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_loaded(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self._max_age:
+            return
+        conn = self._connect()
+        cur = conn.cursor(dictionary=True)
+        cur.execute("SELECT room_id, room_number, type, price FROM rooms")
+        rooms = {row["room_id"]: row for row in cur.fetchall()}
+        cur.execute("""SELECT booking_id, room_id, check_in, check_out FROM bookings
+                       WHERE booking_status <> 'cancelled'""")
+        bookings = cur.fetchall()
+        cur.close()
+        conn.close()
+
+        intervals = {room_id: RoomIntervals() for room_id in rooms}
+        by_id = {}
+        for row in bookings:
+            check_in, check_out = to_date(row["check_in"]), to_date(row["check_out"])
+            intervals.setdefault(row["room_id"], RoomIntervals()).add(check_in, check_out, row["booking_id"])
+            by_id[row["booking_id"]] = row["room_id"]
+        self._rooms, self._intervals, self._bookings = rooms, intervals, by_id
+        self._loaded_at = time.monotonic()
+
+    def add_booking(self, booking_id, room_id, check_in, check_out):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove(booking_id)
+            self._intervals.setdefault(room_id, RoomIntervals()).add(
+                to_date(check_in), to_date(check_out), booking_id)
+            self._bookings[booking_id] = room_id
+
+    def remove_booking(self, booking_id):
+        with self._lock:
+            if self._loaded_at is not None:
+                self._remove(booking_id)
+
+    def _remove(self, booking_id):
+        room_id = self._bookings.pop(booking_id, None)
+        if room_id is not None:
+            self._intervals[room_id].remove(booking_id)
+
+    def free_rooms(self, check_in, check_out, room_type=None):
+        with self._lock:
+            self._ensure_loaded()
+            free = []
+            for room_id, room in self._rooms.items():
+                if room_type is not None and room["type"] != room_type:
+                    continue
+                intervals = self._intervals.get(room_id)
+                if intervals is None or intervals.is_free(check_in, check_out):
+                    free.append(room)
+            return free
+
+
+def lock_room(cur, room_id):
+    """
+    Блокує рядок номера до кінця транзакції; False, якщо номера немає.
+
+    Транзакція, яка потім вставляє або змінює бронювання, тримає це
+    блокування, тож два запити не можуть зайняти номер одночасно.
+    """
+    cur.execute("SELECT room_id FROM rooms WHERE room_id=%s FOR UPDATE", (room_id,))
+    return cur.fetchone() is not None
+
+
+def find_conflict(cur, room_id, check_in, check_out, exclude_booking_id=None):
+    """Id бронювання, що перетинається з періодом, або None."""
+    sql = """SELECT booking_id FROM bookings
+             WHERE room_id=%s AND booking_status <> 'cancelled'
+               AND check_in < %s AND check_out > %s"""
+    params = [room_id, check_out, check_in]
+    if exclude_booking_id is not None:
+        sql += " AND booking_id <> %s"
+        params.append(exclude_booking_id)
+    cur.execute(sql + " LIMIT 1", tuple(params))
+    row = cur.fetchone()
+    return None if row is None else row[0]
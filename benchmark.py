@@ -0,0 +1,444 @@
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+SEED_BATCH = 5000
+BOOKING_STATUSES = ['confirmed', 'cancelled', 'completed']
+PAYMENT_METHODS = ['cash', 'card', 'online']
+ROOM_TYPES = ['Single', 'Double', 'Suite']
+CATEGORIES = ['Супи', 'Салати', 'Основні страви', 'Напої']
+BASE_DAY = date(2025, 1, 1)
+
+
+def seed(conn, rows, rooms, dishes, with_analytics=True, progress=print):
+    """
+    Заповнює базу даними у формі course_work.sql.
+
+    rows — кількість клієнтів, бронювань, замовлень і оплат; номери й страви
+    задаються окремо. Бронювання одного номера не перетинаються. Журнал змін
+    і стан відкладеного запису теж очищаються, а кеші процесу — скидаються.
+    """
+    rnd = random.Random(42)
+    cur = conn.cursor()
+    cur.execute("SET FOREIGN_KEY_CHECKS=0")
+    for table in ("payments", "orders", "bookings", "menuitems", "rooms", "clients",
+                  "revenue_daily", "dish_sales_daily", "occupancy_daily", "change_log", "write_behind_state"):
+        cur.execute(f"DELETE FROM {table}")
+        if table in ("payments", "orders", "bookings", "menuitems", "rooms", "clients"):
+            cur.execute(f"ALTER TABLE {table} AUTO_INCREMENT = 1")
+    cur.execute("UPDATE change_seq SET last_seq = 0")
+    conn.commit()
+
+    def insert(table, columns, generate, count):
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        started = time.perf_counter()
+        for start in range(0, count, SEED_BATCH):
+            cur.executemany(sql, [generate(i) for i in range(start, min(start + SEED_BATCH, count))])
+            conn.commit()
+        progress(f"  {table}: {count} рядків за {time.perf_counter() - started:.1f} с")
+
+    prices = {}
+
+    def room(i):
+        prices[i + 1] = rnd.choice([500, 750, 800, 1500, 1600])
+        return (100 + i, ROOM_TYPES[i % len(ROOM_TYPES)], prices[i + 1], 'available')
+
+    def booking(i):
+        room_id = i % rooms + 1
+        check_in = BASE_DAY + timedelta(days=(i // rooms) * 3)
+        return (rnd.randint(1, rows), room_id, check_in, check_in + timedelta(days=2),
+                prices[room_id] * 2, rnd.choice(BOOKING_STATUSES))
+
+    def order(i):
+        quantity, price = rnd.randint(1, 4), rnd.choice([45, 70, 100, 150, 180, 250])
+        return (rnd.randint(1, rows), rnd.randint(1, dishes), BASE_DAY + timedelta(days=rnd.randint(0, 364)),
+                quantity, price, quantity * price, rnd.choice(['new', 'completed']))
+
+    def payment(i):
+        return (rnd.randint(1, rows), i + 1, None, BASE_DAY + timedelta(days=rnd.randint(0, 364)),
+                rnd.choice([500, 1500, 2400, 3200]), rnd.choice(PAYMENT_METHODS))
+
+    insert("clients", ["name", "surname", "phone", "email"],
+           lambda i: (f"Name{i}", f"Surname{i}", f"+380{500000000 + i}", f"client{i}@example.com"), rows)
+    insert("rooms", ["room_number", "type", "price", "room_status"], room, rooms)
+    insert("menuitems", ["name", "category", "price"],
+           lambda i: (f"Dish {i}", CATEGORIES[i % len(CATEGORIES)], rnd.choice([45, 70, 100, 150, 250])), dishes)
+    insert("bookings", ["client_id", "room_id", "check_in", "check_out", "total_amount", "booking_status"],
+           booking, rows)
+    insert("orders", ["client_id", "dish_id", "order_date", "quantity", "price", "total_amount", "order_status"],
+           order, rows)
+    insert("payments", ["client_id", "booking_id", "order_id", "payment_date", "amount", "payment_method"],
+           payment, rows)
+    cur.execute("SET FOREIGN_KEY_CHECKS=1")
+
+    if with_analytics:
+        import analytics
+        started = time.perf_counter()
+        analytics.rebuild(cur)
+        conn.commit()
+        progress(f"  аналітика: {time.perf_counter() - started:.1f} с")
+    cur.close()
+
+    # Індекси в пам'яті й кеш відповідей інакше віддавали б дані з попередньої бази
+    from app import RESOURCES, availability_index, price_index
+    from crud import response_cache
+    availability_index.invalidate()
+    price_index.invalidate()
+    for crud_resource in RESOURCES:
+        response_cache.invalidate(crud_resource.table.name)
+
+
+class Scenario:
+    def __init__(self, name, method, path, body=None, json_body=False, content_type=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.json_body = json_body
+        # Тіло-рядок з цим Content-Type (CSV для імпорту) замість форми чи JSON
+        self.content_type = content_type
+        self.on_response = None
+
+
+def scenarios(rows, rooms):
+    """Запити до кожного маршруту app.py. path і body — функції від номера запиту."""
+    counter = itertools.count()
+    lock = threading.Lock()
+    created = {"clients": [], "bookings": [], "menuitems": [], "orders": [], "payments": [], "rooms": [],
+               "check-in": [], "check-out": [], "orders/bulk": [], "payments/bulk": []}
+
+    def remember(*tables):
+        def callback(response_json):
+            new_id = (response_json or {}).get("id") or (response_json or {}).get("client_id")
+            new_ids = (response_json or {}).get("ids") or ([new_id] if new_id is not None else [])
+            with lock:
+                for table in tables:
+                    created[table].extend(new_ids)
+        return callback
+
+    def checked_in(response_json):
+        with lock:
+            created["check-out"].append(response_json["booking_id"])
+
+    def front_desk(action):
+        # Заїзд — для бронювань з POST /bookings, виїзд — для тих, що вже заселені
+        def path(_):
+            with lock:
+                booking_id = created[action].pop() if created[action] else 0
+            return f"/bookings/{booking_id}/{action}"
+        return path
+
+    def take_bulk(table, count):
+        def body(_):
+            with lock:
+                ids, created[table + "/bulk"][:] = created[table + "/bulk"][:count], created[table + "/bulk"][count:]
+            return {"ids": ids or [0]}
+        return body
+
+    def take(table):
+        def path(_):
+            with lock:
+                new_id = created[table].pop() if created[table] else 0
+            return f"/{table}/{new_id}"
+        return path
+
+    def free_booking(_):
+        # Номер і дати, які не перетинаються з уже створеними
+        k = next(counter)
+        check_in = date(2200, 1, 1) + timedelta(days=(k // rooms) * 2)
+        return {"client_id": 1, "room_id": k % rooms + 1, "check_in": str(check_in),
+                "check_out": str(check_in + timedelta(days=1)), "total_amount": 500,
+                "booking_status": "confirmed"}
+
+    rid = lambda: random.randint(1, rows)
+    order = lambda _: {"client_id": rid(), "dish_id": 1, "order_date": "2025-11-16", "quantity": 2,
+                       "price": 100, "total_amount": 200, "order_status": "new"}
+    payment = lambda _: {"client_id": rid(), "payment_date": "2025-11-16", "amount": 500, "payment_method": "card"}
+    client = lambda _: {"name": "Bench", "surname": "Mark", "phone": "380000000000", "email": "b@example.com"}
+    dish = lambda _: {"name": "Bench dish", "category": "Напої", "price": 10}
+    room = lambda _: {"room_number": 100000 + next(counter), "type": "Single", "price": 100,
+                      "room_status": "available"}
+    clients_csv = lambda _: "name,surname,phone,email\n" + "".join(
+        f"Bench{k},Mark,380000000000,b{k}@example.com\n" for k in range(1000))
+    orders_csv = lambda _: "client_id,dish_id,order_date,quantity,order_status\n" + "".join(
+        f"{rid()},1,2025-11-16,2,new\n" for _ in range(1000))
+
+    fields = {"clients": "name,email", "bookings": "room_id,check_in", "menuitems": "name,price",
+              "orders": "dish_id,quantity", "payments": "amount", "rooms": "room_number,price"}
+    result = []
+    for table in ("clients", "bookings", "menuitems", "orders", "payments", "rooms"):
+        result += [
+            Scenario(f"GET /{table}?limit=100", "GET", lambda _, t=table: f"/{t}?limit=100&after_id={rid()}"),
+            Scenario(f"GET /{table}?fields", "GET", lambda _, t=table: f"/{t}?limit=100&fields={fields[t]}"),
+        ]
+    result += [
+        Scenario("GET /bookings filtered", "GET",
+                 lambda _: "/bookings?booking_status=confirmed&check_in__gte=2025-06-01&limit=100"),
+        Scenario("GET /orders sorted", "GET", lambda _: "/orders?sort=-order_date&limit=100"),
+        Scenario("GET /payments?stream=1 (1k)", "GET", lambda _: f"/payments?stream=1&payment_id__lte={min(rows, 1000)}"),
+        Scenario("GET /clients/<id>/folio", "GET", lambda _: f"/clients/{rid()}/folio"),
+        Scenario("GET /rooms/available", "GET", lambda _: "/rooms/available?check_in=2025-03-01&check_out=2025-03-05"),
+        Scenario("GET /analytics/revenue", "GET", lambda _: "/analytics/revenue?date_from=2025-01-01&date_to=2025-12-31"),
+        Scenario("GET /analytics/occupancy", "GET",
+                 lambda _: "/analytics/occupancy?date_from=2025-01-01&date_to=2025-12-31"),
+        Scenario("GET /analytics/dishes", "GET", lambda _: "/analytics/dishes?date_from=2025-01-01&date_to=2025-12-31"),
+        Scenario("POST /clients", "POST", lambda _: "/clients", client),
+        Scenario("POST /bookings", "POST", lambda _: "/bookings", free_booking),
+        Scenario("POST /menuitems", "POST", lambda _: "/menuitems", dish),
+        Scenario("POST /orders", "POST", lambda _: "/orders", order),
+        Scenario("POST /payments", "POST", lambda _: "/payments", payment),
+        Scenario("POST /rooms", "POST", lambda _: "/rooms", room),
+        Scenario("POST /orders/bulk (20)", "POST", lambda _: "/orders/bulk",
+                 lambda i: [order(i) for _ in range(20)], json_body=True),
+        Scenario("POST /payments/bulk (20)", "POST", lambda _: "/payments/bulk",
+                 lambda i: [payment(i) for _ in range(20)], json_body=True),
+        Scenario("POST /bookings/bulk (5)", "POST", lambda _: "/bookings/bulk",
+                 lambda i: [free_booking(i) for _ in range(5)], json_body=True),
+        Scenario("PUT /clients/<id>", "PUT", lambda _: f"/clients/{rid()}", lambda _: {"phone": "380111111111"}),
+        Scenario("PUT /bookings/<id>", "PUT", lambda _: f"/bookings/{rid()}", lambda _: {"booking_status": "confirmed"}),
+        Scenario("PUT /menuitems/<id>", "PUT", lambda _: "/menuitems/1", lambda _: {"price": 100}),
+        Scenario("PUT /orders/<id>", "PUT", lambda _: f"/orders/{rid()}", lambda _: {"order_status": "completed"}),
+        Scenario("PUT /payments/<id>", "PUT", lambda _: f"/payments/{rid()}", lambda _: {"payment_method": "cash"}),
+        Scenario("PUT /rooms/<id>", "PUT", lambda _: "/rooms/1", lambda _: {"room_status": "available"}),
+        Scenario("POST /bookings/<id>/check-in", "POST", front_desk("check-in"), lambda _: {}, json_body=True),
+        Scenario("POST /bookings/<id>/check-out", "POST", front_desk("check-out"), lambda _: {"amount": 0},
+                 json_body=True),
+        Scenario("GET /changes/bookings?limit=100", "GET", lambda _: "/changes/bookings?since=0&limit=100"),
+        Scenario("GET /changes/payments?since", "GET", lambda _: f"/changes/payments?since={rid()}&limit=100"),
+        Scenario("PATCH /orders/bulk (ids 50)", "PATCH", lambda _: "/orders/bulk",
+                 lambda _: {"ids": [rid() for _ in range(50)], "set": {"order_status": "completed"}}, json_body=True),
+        Scenario("PATCH /payments/bulk (filter)", "PATCH", lambda _: "/payments/bulk",
+                 lambda _: {"filter": {"payment_id__in": [rid() for _ in range(50)]},
+                            "set": {"payment_method": "cash"}}, json_body=True),
+        Scenario("POST /clients/import (1k)", "POST", lambda _: "/clients/import", clients_csv,
+                 content_type="text/csv"),
+        Scenario("POST /orders/import (1k)", "POST", lambda _: "/orders/import", orders_csv,
+                 content_type="text/csv"),
+    ]
+    # Пакетне видалення — лише рядків, створених пакетними POST вище, щоб не збіднювати дані
+    for table in ("payments", "orders"):
+        result.append(Scenario(f"DELETE /{table}/bulk (20)", "DELETE", lambda _, t=table: f"/{t}/bulk",
+                               take_bulk(table, 20), json_body=True))
+    for table in ("payments", "orders", "bookings", "menuitems", "rooms", "clients"):
+        result.append(Scenario(f"DELETE /{table}/<id>", "DELETE", take(table)))
+    result.append(Scenario("GET /metrics", "GET", lambda _: "/metrics"))
+
+    callbacks = {"POST /clients": remember("clients"), "POST /bookings": remember("bookings", "check-in"),
+                 "POST /menuitems": remember("menuitems"), "POST /orders": remember("orders"),
+                 "POST /payments": remember("payments"), "POST /rooms": remember("rooms"),
+                 "POST /orders/bulk (20)": remember("orders/bulk"),
+                 "POST /payments/bulk (20)": remember("payments/bulk"),
+                 "POST /bookings/<id>/check-in": checked_in}
+    for scenario in result:
+        scenario.on_response = callbacks.get(scenario.name)
+    return result
+
+
+class TestClientDriver:
+    """Запити через Flask test client у тому ж процесі (без мережі)."""
+
+    def __init__(self, app):
+        self._app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body, json_body, content_type=None):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self._app.test_client()
+        if content_type:
+            kwargs = {"data": body, "content_type": content_type}
+        else:
+            kwargs = {"json": body} if json_body else {"data": body}
+        response = client.open(path, method=method, **kwargs)
+        data = response.get_data()
+        return response.status_code, data
+
+
+class WSGIDriver:
+    """Запити через HTTP до справжнього багатопотокового WSGI-сервера."""
+
+    def __init__(self, app, host="127.0.0.1"):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self._server = make_server(host, 0, app, threaded=True, request_handler=QuietHandler)
+        self._address = (host, self._server.server_port)
+        self._local = threading.local()
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def request(self, method, path, body, json_body, content_type=None):
+        from urllib.parse import urlencode
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(*self._address)
+        headers = {}
+        payload = None
+        if body is not None:
+            if content_type:
+                payload = body.encode()
+                headers["Content-Type"] = content_type
+            elif json_body:
+                payload = json.dumps(body)
+                headers["Content-Type"] = "application/json"
+            else:
+                payload = urlencode(body)
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+        try:
+            conn.request(method, path, payload, headers)
+            response = conn.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            self._local.conn = None
+            raise
+
+    def close(self):
+        self._server.shutdown()
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (k - lower)
+
+
+def run_scenario(driver, scenario, requests, concurrency):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        body = scenario.body(i) if scenario.body else None
+        path = scenario.path(i)
+        started = time.perf_counter()
+        try:
+            status, data = driver.request(scenario.method, path, body, scenario.json_body, scenario.content_type)
+        except Exception:
+            status, data = 599, b""
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if status >= 400:
+                errors += 1
+        if status < 400 and scenario.on_response is not None and data:
+            scenario.on_response(json.loads(data))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": round(requests / wall, 1) if wall else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def peak_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(usage / 1024, 1) if sys.platform != "darwin" else round(usage / 1024 / 1024, 1)
+
+
+def compare(results, baseline, tolerance):
+    """Список регресій: p95 виріс або пропускна здатність впала більше ніж на tolerance."""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']} -> {current['p95_ms']} мс")
+        if current["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: {base['throughput']} -> {current['throughput']} запитів/с")
+    if results["peak_rss_mb"] > baseline.get("peak_rss_mb", float("inf")) * (1 + tolerance):
+        regressions.append(f"peak RSS: {baseline['peak_rss_mb']} -> {results['peak_rss_mb']} МБ")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Навантажувальне тестування API")
+    parser.add_argument("--seed", action="store_true", help="перезаповнити базу тестовими даними")
+    parser.add_argument("--rows", type=int, default=10000, help="рядків у clients/bookings/orders/payments")
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--dishes", type=int, default=100)
+    parser.add_argument("--no-analytics", action="store_true", help="не перераховувати аналітику після заповнення")
+    parser.add_argument("--driver", choices=["test", "wsgi"], default="test",
+                        help="test — Flask test client, wsgi — HTTP до багатопотокового сервера")
+    parser.add_argument("--requests", type=int, default=200, help="запитів на сценарій")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--only", help="запускати лише сценарії, що містять цей рядок")
+    parser.add_argument("--output", help="зберегти результати в JSON")
+    parser.add_argument("--baseline", help="порівняти з результатами з цього файлу")
+    parser.add_argument("--save-baseline", help="зберегти результати як нову базову лінію")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустиме погіршення (0.2 = 20%%)")
+    parser.add_argument("--sqlite", metavar="PATH",
+                        help="працювати з вбудованою базою SQLite у цьому файлі замість MySQL")
+    args = parser.parse_args(argv)
+
+    if args.sqlite:
+        # До імпорту app: db.py обирає сховище під час імпорту
+        os.environ["DB_BACKEND"] = "sqlite"
+        os.environ["DB_SQLITE_PATH"] = args.sqlite
+    from app import app
+    from db import get_connection
+
+    if args.seed:
+        print(f"Заповнення бази: {args.rows} рядків")
+        with app.app_context():
+            conn = get_connection()
+            seed(conn, args.rows, args.rooms, args.dishes, not args.no_analytics)
+            conn.close()
+
+    driver = TestClientDriver(app) if args.driver == "test" else WSGIDriver(app)
+    results = {"driver": args.driver, "rows": args.rows, "concurrency": args.concurrency, "scenarios": {}}
+    print(f"{'сценарій':<40} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'помилки':>8}")
+    for scenario in scenarios(args.rows, args.rooms):
+        if args.only and args.only not in scenario.name:
+            continue
+        stats = run_scenario(driver, scenario, args.requests, args.concurrency)
+        results["scenarios"][scenario.name] = stats
+        print(f"{scenario.name:<40} {stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} "
+              f"{stats['throughput']:>8} {stats['errors']:>8}")
+    results["peak_rss_mb"] = peak_rss_mb()
+    print(f"Пікова пам'ять процесу: {results['peak_rss_mb']} МБ")
+    if isinstance(driver, WSGIDriver):
+        driver.close()
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Регресії відносно базової лінії:")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print("Регресій немає")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
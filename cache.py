@@ -0,0 +1,131 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")
+CACHE_TTL = float(os.environ.get("CACHE_TTL", 300))
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 256))
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+
+class MemoryBackend:
+    """Кеш у пам'яті процесу з TTL та витісненням найдавніше використаних записів."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self._data = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        """Записує значення, лише якщо ключа ще немає (або він застарів)."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and (item[1] is None or item[1] >= time.monotonic()):
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def _store(self, key, value, ttl):
+        self._data[key] = (value, time.monotonic() + ttl if ttl else None)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def generation(self, name):
+        return self._generations.get(name, 0)
+
+    def bump(self, name):
+        with self._lock:
+            self._generations[name] = self._generations.get(name, 0) + 1
+
+
+class RedisBackend:
+    """Спільний кеш для кількох процесів (потрібен пакет redis)."""
+
+    def __init__(self, url=CACHE_REDIS_URL):
+        import redis
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl=None):
+        self._client.set(key, value, ex=int(ttl) if ttl else None)
+
+    def add(self, key, value, ttl=None):
+        return bool(self._client.set(key, value, ex=int(ttl) if ttl else None, nx=True))
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def generation(self, name):
+        return int(self._client.get(f"gen:{name}") or 0)
+
+    def bump(self, name):
+        self._client.incr(f"gen:{name}")
+
+
+class ResponseCache:
+    """
+    Кеш готових JSON-відповідей колекцій.
+
+    Ключі містять номер покоління таблиці, тож invalidate() лише збільшує
+    його, а старі записи витісняються самі. Ключ треба брати до запиту
+    в базу, щоб дані, прочитані до зміни, не потрапили в нове покоління.
+    """
+
+    def __init__(self, backend, ttl=CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+
+    def key(self, table, name):
+        return f"resp:{table}:{self.backend.generation(table)}:{name}"
+
+    def get(self, key):
+        """Повертає (etag, body) або None."""
+        value = self.backend.get(key)
+        if value is None:
+            return None
+        etag, _, body = value.partition(b"\n")
+        return etag.decode(), body
+
+    def set(self, key, body, etag=None):
+        """Зберігає тіло й повертає ETag; etag передають для стисненого варіанту вже закешованого тіла."""
+        etag = etag or hashlib.sha1(body).hexdigest()
+        self.backend.set(key, etag.encode() + b"\n" + body, self.ttl)
+        return etag
+
+    def invalidate(self, table):
+        self.backend.bump(table)
+
+
+def create_backend(name=CACHE_BACKEND, max_entries=CACHE_MAX_ENTRIES):
+    if name == "redis":
+        return RedisBackend()
+    return MemoryBackend(max_entries)
+
+
+response_cache = ResponseCache(create_backend())
@@ -0,0 +1,229 @@
+"""
+Журнал змін бронювань, замовлень і оплат для інкрементальної синхронізації.
+
+Кожна вставка, зміна чи видалення (зокрема каскадне) записується в change_log
+в тій самій транзакції з номером seq, що зростає окремо для кожної таблиці.
+record() лише запам'ятовує зміни в з'єднанні, а номери видаються з лічильника
+change_seq безпосередньо перед комітом (publish). Рядок лічильника блокується
+лише на час коміту, а не всієї транзакції, і записи все одно стають видимими
+строго в порядку seq: споживач, що читає з since=<останній seq>, нічого
+не пропустить, зокрема й на репліці.
+
+Записи, старші за CHANGE_FEED_RETENTION_DAYS, видаляє фоновий потік (trim).
+Споживач, який відстав більше, отримує 410 і має заново завантажити таблицю.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from db import get_connection
+from errors import ApiError
+from schema import TABLES
+
+FEED_TABLES = ("bookings", "orders", "payments")
+MAX_LIMIT = 1000
+# Як довго GET /changes може чекати нових змін (wait=) і як часто
+# перевіряти базу на зміни з інших процесів під час очікування, секунди
+MAX_WAIT = float(os.environ.get("CHANGE_FEED_MAX_WAIT", 30))
+POLL_INTERVAL = float(os.environ.get("CHANGE_FEED_POLL_INTERVAL", 1))
+# Як часто SSE-потік надсилає коментар, щоб проксі не закрили з'єднання
+HEARTBEAT = float(os.environ.get("CHANGE_FEED_HEARTBEAT", 15))
+# Скільки секунд триває один SSE-потік; потім браузер перепідключається
+# з Last-Event-ID через STREAM_RETRY мілісекунд і продовжує з того ж місця
+STREAM_MAX_DURATION = float(os.environ.get("CHANGE_FEED_STREAM_MAX_DURATION", 300))
+STREAM_RETRY = int(os.environ.get("CHANGE_FEED_STREAM_RETRY", 1000))
+# Скільки днів зберігати записи журналу (0 — не видаляти) і як часто їх чистити, секунди
+RETENTION_DAYS = float(os.environ.get("CHANGE_FEED_RETENTION_DAYS", 7))
+TRIM_INTERVAL = float(os.environ.get("CHANGE_FEED_TRIM_INTERVAL", 3600))
+TRIM_BATCH = 10000
+
+logger = logging.getLogger(__name__)
+
+
+def record(cur, table, op, ids):
+    """Запам'ятовує зміни рядків ids таблиці table (op — insert, update або delete) до коміту."""
+    if table not in FEED_TABLES or not ids:
+        return
+    cur.connection.before_commit(publish).append((table, op, list(ids)))
+
+
+def publish(cur, changes):
+    """Видає номери seq змінам транзакції і записує їх у change_log перед самим комітом."""
+    changed_at = datetime.now().replace(microsecond=0)
+    # Таблиці завжди в одному порядку, щоб транзакції не блокували одна одну навхрест
+    for table in FEED_TABLES:
+        rows = [(row_id, op) for name, op, ids in changes if name == table for row_id in ids]
+        if not rows:
+            continue
+        cur.execute("UPDATE change_seq SET last_seq = last_seq + %s WHERE table_name=%s", (len(rows), table))
+        cur.execute("SELECT last_seq FROM change_seq WHERE table_name=%s", (table,))
+        first = cur.fetchone()[0] - len(rows) + 1
+        cur.executemany("INSERT INTO change_log (table_name, seq, row_id, op, changed_at) VALUES (%s, %s, %s, %s, %s)",
+                        [(table, first + n, row_id, op, changed_at) for n, (row_id, op) in enumerate(rows)])
+
+
+def record_deleted(cur, table, where, params):
+    """Записує видалення рядків table, що відповідають умові (перед каскадним DELETE)."""
+    if table not in FEED_TABLES:
+        return
+    pk = TABLES[table].pk
+    cur.execute(f"SELECT {pk} FROM {table} WHERE {where}", params)
+    record(cur, table, "delete", [row[0] for row in cur.fetchall()])
+
+
+def check_since(table, since):
+    """410, якщо зміни після since вже видалено з журналу (trim) і синхронізацію треба почати заново."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT MIN(seq) FROM change_log WHERE table_name=%s", (table,))
+    oldest = cur.fetchone()[0]
+    if oldest is None:
+        cur.execute("SELECT last_seq FROM change_seq WHERE table_name=%s", (table,))
+        oldest = cur.fetchone()[0] + 1
+    cur.close()
+    conn.close()
+    if since + 1 < oldest:
+        raise ApiError(f"Зміни до seq {oldest} уже видалено з журналу: завантажте таблицю заново "
+                       f"і продовжуйте з since={oldest - 1}", 410)
+
+
+def trim(conn, older_than):
+    """Видаляє записи журналу, старші за older_than, частинами по TRIM_BATCH. Повертає кількість."""
+    cur = conn.cursor()
+    removed = 0
+    for table in FEED_TABLES:
+        while True:
+            # seq зростає разом з changed_at, тож найстаріші записи — на початку індексу
+            cur.execute("SELECT MAX(seq), COUNT(*) FROM (SELECT seq FROM change_log WHERE table_name=%s "
+                        "AND changed_at < %s ORDER BY seq LIMIT %s) t", (table, older_than, TRIM_BATCH))
+            upto, count = cur.fetchone()
+            if not count:
+                break
+            cur.execute("DELETE FROM change_log WHERE table_name=%s AND seq <= %s", (table, upto))
+            conn.commit()
+            removed += count
+    cur.close()
+    return removed
+
+
+def read(table, since, limit):
+    """
+    Зміни з seq > since разом з поточним станом рядка.
+
+    row — None, якщо рядок видалено (зокрема пізнішою зміною).
+    """
+    table_schema = TABLES[table]
+    columns = list(table_schema.columns)
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(f"""SELECT c.seq, c.op, c.row_id, c.changed_at, {', '.join(f't.{c}' for c in columns)}
+                    FROM change_log c LEFT JOIN {table} t ON t.{table_schema.pk} = c.row_id
+                    WHERE c.table_name=%s AND c.seq > %s ORDER BY c.seq LIMIT %s""", (table, since, limit))
+    changes = []
+    for seq, op, row_id, changed_at, *values in cur.fetchall():
+        row = dict(zip(columns, values))
+        changes.append({"seq": seq, "op": op, "id": row_id, "changed_at": changed_at,
+                        "row": row if row[table_schema.pk] is not None else None})
+    cur.close()
+    conn.close()
+    return changes
+
+
+class Notifier:
+    """Будить очікувачів у цьому процесі одразу після коміту змін."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._version = 0
+
+    def notify(self):
+        with self._condition:
+            self._version += 1
+            self._condition.notify_all()
+
+    def wait(self, timeout):
+        """True, якщо за timeout секунд були зміни."""
+        with self._condition:
+            version = self._version
+            return self._condition.wait_for(lambda: self._version != version, timeout)
+
+
+notifier = Notifier()
+
+
+def poll(table, since, limit, wait=0):
+    """Зміни з seq > since; якщо їх немає — чекає до wait секунд на нові."""
+    check_since(table, since)
+    deadline = time.monotonic() + min(wait, MAX_WAIT)
+    while True:
+        changes = read(table, since, limit)
+        remaining = deadline - time.monotonic()
+        if changes or remaining <= 0:
+            return changes
+        notifier.wait(min(remaining, POLL_INTERVAL))
+
+
+def stream(table, since, dumps, max_duration=STREAM_MAX_DURATION):
+    """
+    Потік змін у форматі Server-Sent Events тривалістю до max_duration секунд.
+
+    Обмеження не дає одному клієнтові назавжди зайняти потік сервера:
+    EventSource перепідключається з Last-Event-ID і продовжує з того ж місця.
+    """
+    started = last_sent = time.monotonic()
+    yield f"retry: {STREAM_RETRY}\n\n"
+    while time.monotonic() - started < max_duration:
+        changes = read(table, since, MAX_LIMIT)
+        if changes:
+            yield "".join(f"id: {c['seq']}\nevent: {c['op']}\ndata: {dumps(c)}\n\n" for c in changes)
+            since = changes[-1]["seq"]
+            last_sent = time.monotonic()
+            continue
+        if time.monotonic() - last_sent >= HEARTBEAT:
+            yield ": keepalive\n\n"
+            last_sent = time.monotonic()
+        notifier.wait(min(POLL_INTERVAL, max(max_duration - (time.monotonic() - started), 0)))
+
+
+class Trimmer:
+    """Фоновий потік, що раз на TRIM_INTERVAL секунд видаляє застарілі записи журналу."""
+
+    def __init__(self, retention_days=RETENTION_DAYS, interval=TRIM_INTERVAL):
+        self.retention = timedelta(days=retention_days)
+        self.interval = interval
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Запускає потік у поточному процесі (після fork — заново)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="change-feed-trim", daemon=True).start()
+
+    def _run(self):
+        while True:
+            conn = None
+            try:
+                conn = get_connection()
+                trim(conn, datetime.now() - self.retention)
+            except Exception:
+                logger.exception("Помилка очищення журналу змін")
+            finally:
+                if conn is not None:
+                    conn.close()
+            time.sleep(self.interval)
+
+
+def init_app(app):
+    """Вмикає очищення журналу, якщо CHANGE_FEED_RETENTION_DAYS > 0."""
+    if RETENTION_DAYS <= 0:
+        return None
+    trimmer = Trimmer()
+    app.before_request(trimmer.start)
+    return trimmer
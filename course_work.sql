@@ -1,5 +1,5 @@
 CREATE DATABASE coursework;
-USE cousework;
+USE coursework;
 CREATE TABLE Clients (
     client_id INT PRIMARY KEY AUTO_INCREMENT,
     name VARCHAR(50),
@@ -19,9 +19,9 @@ CREATE TABLE Rooms (
     room_number INT UNIQUE,
     type VARCHAR(50),
     price DECIMAL(8,2),
-    status VARCHAR(20) DEFAULT 'available'
+    room_status VARCHAR(20) DEFAULT 'available'
 );
-INSERT INTO Rooms (room_number, type, price, status) VALUES
+INSERT INTO Rooms (room_number, type, price, room_status) VALUES
 (101, 'Single', 500.00, 'available'),
 (102, 'Double', 750.00, 'occupied'),
 (103, 'Suite', 1500.00, 'available'),
@@ -35,16 +35,16 @@ CREATE TABLE bookings (
     check_in DATE NOT NULL,                              
     check_out DATE NOT NULL,                            
     total_amount DECIMAL(10,2) NOT NULL,               
-    booking_status ENUM('confirmed','cancelled','completed') DEFAULT 'confirmed', 
+    booking_status ENUM('confirmed','checked_in','cancelled','completed') DEFAULT 'confirmed', 
     FOREIGN KEY (client_id) REFERENCES Clients(client_id) ON DELETE CASCADE,
     FOREIGN KEY (room_id) REFERENCES Rooms(room_id) ON DELETE CASCADE
 );
 INSERT INTO bookings (client_id, room_id, check_in, check_out, total_amount, booking_status) VALUES
 (1, 1, '2025-11-20', '2025-11-25', 2500.00, 'confirmed'),
-(2, 1, '2025-11-18', '2025-11-22', 3000.00, 'confirmed'),
-(3, 1, '2025-11-19', '2025-11-23', 6000.00, 'confirmed'),
-(4, 2, '2025-11-21', '2025-11-24', 2400.00, 'confirmed'),
-(5, 2, '2025-11-20', '2025-11-22', 3200.00, 'confirmed');
+(2, 2, '2025-11-18', '2025-11-22', 3000.00, 'confirmed'),
+(3, 3, '2025-11-19', '2025-11-23', 6000.00, 'confirmed'),
+(4, 4, '2025-11-21', '2025-11-24', 2400.00, 'confirmed'),
+(5, 5, '2025-11-20', '2025-11-22', 3200.00, 'confirmed');
 
 CREATE TABLE MenuItems (
     dish_id INT PRIMARY KEY AUTO_INCREMENT,
@@ -68,10 +68,10 @@ CREATE TABLE Orders (
     quantity INT,
     price DECIMAL(8,2),
     total_amount DECIMAL(10,2),
-    status VARCHAR(20) DEFAULT 'new',
+    order_status VARCHAR(20) DEFAULT 'new',
     FOREIGN KEY (client_id) REFERENCES Clients(client_id) ON DELETE CASCADE
 );
-INSERT INTO Orders (client_id, dish_id, order_date, quantity, price, total_amount, status) VALUES
+INSERT INTO Orders (client_id, dish_id, order_date, quantity, price, total_amount, order_status) VALUES
 (1, 6, '2025-11-18', 1, 70.00, 570.00, 'completed'),
 (1, 3, '2025-11-18', 2, 250.00, 570.00, 'completed'),
 (2, 2, '2025-11-18', 1, 150.00, 195.00, 'completed'),
@@ -99,4 +99,85 @@ INSERT INTO Payments (client_id, booking_id, order_id, payment_date, amount, pay
 (2, 2, NULL, '2025-11-18', 3000.00, 'cash'),      
 (1, NULL, 1, '2025-11-18', 570.00, 'card'),        
 (2, NULL, 2, '2025-11-18', 195.00, 'cash'),        
-(5, 5, 9, '2025-11-18', 3700.00, 'online'); 
\ No newline at end of file
+(5, 5, 9, '2025-11-18', 3700.00, 'online');
+
+-- Індекси для рахунку клієнта (GET /clients/<id>/folio):
+-- вибірка за client_id одразу впорядкована за датою
+CREATE INDEX idx_bookings_client_checkin ON bookings (client_id, check_in);
+CREATE INDEX idx_orders_client_date ON Orders (client_id, order_date);
+CREATE INDEX idx_payments_client_date ON Payments (client_id, payment_date);
+
+-- Індекси для фільтрів і сортування в GET-запитах
+CREATE INDEX idx_clients_surname ON Clients (surname);
+CREATE INDEX idx_clients_phone ON Clients (phone);
+CREATE INDEX idx_clients_email ON Clients (email);
+CREATE INDEX idx_bookings_status_checkin ON bookings (booking_status, check_in);
+CREATE INDEX idx_bookings_room_checkin ON bookings (room_id, check_in);
+CREATE INDEX idx_bookings_checkin ON bookings (check_in);
+CREATE INDEX idx_bookings_checkout ON bookings (check_out);
+CREATE INDEX idx_bookings_amount ON bookings (total_amount);
+CREATE INDEX idx_menuitems_category_price ON MenuItems (category, price);
+CREATE INDEX idx_menuitems_price ON MenuItems (price);
+CREATE INDEX idx_orders_status_date ON Orders (order_status, order_date);
+CREATE INDEX idx_orders_date ON Orders (order_date);
+CREATE INDEX idx_orders_dish ON Orders (dish_id);
+CREATE INDEX idx_orders_amount ON Orders (total_amount);
+CREATE INDEX idx_payments_method_date ON Payments (payment_method, payment_date);
+CREATE INDEX idx_payments_date ON Payments (payment_date);
+CREATE INDEX idx_payments_amount ON Payments (amount);
+CREATE INDEX idx_rooms_type_price ON Rooms (type, price);
+CREATE INDEX idx_rooms_status ON Rooms (room_status);
+CREATE INDEX idx_rooms_price ON Rooms (price);
+
+-- Зведені таблиці для аналітики (оновлюються застосунком разом з основними)
+CREATE TABLE revenue_daily (
+    day DATE NOT NULL,
+    payment_method VARCHAR(20) NOT NULL,
+    amount DECIMAL(14,2) NOT NULL DEFAULT 0,
+    payments INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, payment_method)
+);
+
+CREATE TABLE dish_sales_daily (
+    day DATE NOT NULL,
+    dish_id INT NOT NULL,
+    quantity INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    orders INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, dish_id)
+);
+
+CREATE TABLE occupancy_daily (
+    day DATE NOT NULL,
+    room_type VARCHAR(50) NOT NULL,
+    room_nights INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, room_type)
+);
+
+-- Після завантаження тестових даних зведені таблиці заповнюються
+-- викликом POST /analytics/rebuild
+
+-- Стан відкладеного запису замовлень (writebehind.py): номер останнього
+-- перенесеного в Orders запису для кожного локального журналу
+CREATE TABLE write_behind_state (
+    name VARCHAR(100) PRIMARY KEY,
+    last_seq BIGINT NOT NULL DEFAULT 0
+);
+
+-- Журнал змін для інкрементальної синхронізації (GET /changes/<table>):
+-- seq зростає окремо для кожної таблиці, лічильники — в change_seq
+CREATE TABLE change_seq (
+    table_name VARCHAR(20) PRIMARY KEY,
+    last_seq BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO change_seq (table_name, last_seq) VALUES ('bookings', 0), ('orders', 0), ('payments', 0);
+
+CREATE TABLE change_log (
+    table_name VARCHAR(20) NOT NULL,
+    seq BIGINT NOT NULL,
+    row_id INT NOT NULL,
+    op ENUM('insert', 'update', 'delete') NOT NULL,
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (table_name, seq)
+);
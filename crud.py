@@ -0,0 +1,872 @@
+"""
+Табличні CRUD-маршрути.
+
+Кожна таблиця описується в schema.py (колонки, типи, фільтри), а Resource
+генерує для неї GET/POST/PUT/DELETE, пакетне додавання, зміну й видалення
+з документацією Swagger, тож пагінація, кешування, фільтри та bulk працюють
+однаково для всіх.
+"""
+import os
+from decimal import Decimal
+
+from flasgger import swag_from
+from flask import Response, current_app, jsonify, request, stream_with_context
+from werkzeug.datastructures import MultiDict
+
+import changefeed
+import formats
+from availability import to_date
+from cache import response_cache
+from db import DatabaseError, get_connection
+from errors import ApiError
+from query import compile_filters, decode_cursor, encode_cursor, keyset_clause, order_by, parse_sort
+from schema import TABLES
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+BULK_MAX_ROWS = 1000
+# Скільки рядків змінює або видаляє одна транзакція пакетного PATCH/DELETE
+BULK_CHUNK_SIZE = int(os.environ.get("BULK_CHUNK_SIZE", 500))
+
+
+def int_arg(name, default=None, minimum=None, maximum=None, args=None):
+    value = (request.args if args is None else args).get(name)
+    if value is None or value == "":
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ApiError(f"Параметр {name} має бути цілим числом")
+    if minimum is not None and value < minimum:
+        raise ApiError(f"Параметр {name} має бути не менше {minimum}")
+    if maximum is not None and value > maximum:
+        value = maximum
+    return value
+
+
+def selected_fields(table, args=None):
+    """Колонки з параметра fields=; первинний ключ додається завжди."""
+    pk, columns = TABLES[table].pk, list(TABLES[table].columns)
+    fields = (request.args if args is None else args).get("fields")
+    if not fields:
+        return columns
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in columns]
+    if unknown:
+        raise ApiError(f"Невідомі поля: {', '.join(unknown)}")
+    if pk not in selected:
+        selected.insert(0, pk)
+    return selected
+
+
+def collection_query(table, fields, args=None):
+    """
+    SELECT колекції з фільтрами, сортуванням і keyset-умовою з параметрів запиту.
+
+    args — параметри запиту (за замовчуванням request.args).
+    Повертає (sql, params, колонка сортування).
+    """
+    pk = TABLES[table].pk
+    if args is None:
+        args = request.args
+    clauses, params = compile_filters(table, args)
+    column, descending = parse_sort(table, pk, args)
+
+    after = None
+    if args.get("cursor"):
+        after = decode_cursor(table, column, args["cursor"])
+    else:
+        after_id = int_arg("after_id", args=args)
+        if after_id is not None:
+            if column != pk:
+                raise ApiError("after_id працює лише з сортуванням за id, використовуйте cursor")
+            after = (after_id, after_id)
+    if after is not None:
+        clause, extra = keyset_clause(column, pk, descending, after)
+        clauses.append(clause)
+        params.extend(extra)
+
+    sql = f"SELECT {', '.join(fields)} FROM {table}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY " + order_by(column, pk, descending)
+    return sql, params, column
+
+
+def page_query(table, fields, args=None):
+    """
+    collection_query() з LIMIT, якщо запитано пагінацію (limit, after_id або cursor).
+
+    Може додати колонку сортування до fields. Повертає (sql, params,
+    колонка сортування, limit або None без пагінації).
+    """
+    if args is None:
+        args = request.args
+    sql, params, column = collection_query(table, fields, args)
+    if not any(name in args for name in ("limit", "after_id", "cursor")):
+        return sql, params, column, None
+    if column not in fields:
+        fields.append(column)
+        sql, params, column = collection_query(table, fields, args)
+    limit = int_arg("limit", DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE, args)
+    sql += " LIMIT %s"
+    params.append(limit + 1)
+    return sql, params, column, limit
+
+
+def page_result(table, data, column, limit):
+    """Тіло відповіді для рядків, вибраних запитом з page_query()."""
+    if limit is None:
+        return data
+    pk = TABLES[table].pk
+    next_cursor = None
+    if len(data) > limit:
+        data = data[:limit]
+        last = data[-1]
+        next_cursor = last[pk] if column == pk else encode_cursor(last[column], last[pk])
+    return {"items": data, "next_cursor": next_cursor}
+
+
+def list_collection(table, primary=False):
+    """
+    Вибірка колекції з фільтрами і keyset-пагінацією.
+
+    Без limit/after_id/cursor повертає весь список, як і раніше;
+    з ними — {"items": [...], "next_cursor": ...}. При сортуванні за id
+    next_cursor — це id для after_id, інакше — рядок для cursor.
+    primary=True — читати з основного сервера, навіть якщо є репліки.
+    """
+    fields = selected_fields(table)
+    if wants_stream():
+        return stream_collection(table, fields)
+    sql, params, column, limit = page_query(table, fields)
+
+    conn = get_connection(primary)
+    cur = conn.cursor(dictionary=True)
+    cur.execute(sql, tuple(params))
+    data = cur.fetchall()
+    cur.close()
+    conn.close()
+    body, mimetype = formats.encode_collection(page_result(table, data, column, limit), fields,
+                                               request.args, request.accept_mimetypes, current_app.json.sort_keys)
+    response = Response(body, mimetype=mimetype)
+    response.vary.add("Accept")
+    return response
+
+
+def cached_collection(table):
+    """
+    list_collection() з кешуванням готової відповіді та підтримкою ETag.
+
+    Якщо If-None-Match збігається з ETag, повертається 304 без тіла.
+    """
+    if wants_stream():
+        return list_collection(table)
+    mimetype = formats.negotiate(request.accept_mimetypes)
+    key = response_cache.key(table, f"{mimetype} {request.full_path}")
+    accept_encoding = request.headers.get("Accept-Encoding")
+    entry = compressed_entry(key, mimetype, accept_encoding)
+    if entry is None:
+        entry = response_cache.get(key)
+        if entry is None:
+            # Кеш скидається при записі в цьому процесі, тож наповнюється лише з
+            # основного сервера: відстала репліка закешувала б старі дані на CACHE_TTL
+            body = list_collection(table, primary=True).get_data()
+            entry = response_cache.set(key, body), body
+        etag, body, encoding = compress_entry(key, *entry, mimetype, accept_encoding)
+    else:
+        etag, body, encoding = entry
+    response = Response(body, mimetype=mimetype)
+    response.vary.add("Accept")
+    # Стиснуте тіло відрізняється від нестиснутого побайтно, але не за змістом
+    response.set_etag(etag, weak=encoding is not None)
+    response.headers["Cache-Control"] = "no-cache"
+    response = response.make_conditional(request)
+    if encoding is not None and response.status_code == 200:
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def compressed_entry(key, mimetype, accept_encoding):
+    """(etag, стиснуте тіло, Content-Encoding) з кешу відповідей або None."""
+    encoding = formats.choose_encoding(accept_encoding, mimetype)
+    if encoding is None:
+        return None
+    entry = response_cache.get(f"{key} {encoding}")
+    return None if entry is None else (*entry, encoding)
+
+
+def compress_entry(key, etag, body, mimetype, accept_encoding):
+    """
+    Стискає закешоване тіло за Accept-Encoding і кешує результат поруч з ним,
+    щоб наступні влучання не стискали його знову. Повертає (etag, тіло, Content-Encoding або None).
+    """
+    body, encoding = formats.compress(body, mimetype, accept_encoding)
+    if encoding is not None:
+        response_cache.set(f"{key} {encoding}", body, etag)
+    return etag, body, encoding
+
+
+def wants_stream(args=None, accept=None):
+    args = request.args if args is None else args
+    accept = request.accept_mimetypes if accept is None else accept
+    return args.get("stream") in ("1", "true") or accept.best == "application/x-ndjson"
+
+
+def stream_collection(table, fields):
+    """
+    Потоковий експорт таблиці (з тими ж фільтрами) без завантаження її в пам'ять.
+
+    Рядки читаються небуферизованим курсором пачками по STREAM_BATCH_SIZE
+    і віддаються як NDJSON (Accept: application/x-ndjson або format=ndjson)
+    або як один JSON-масив.
+    """
+    ndjson = (request.args.get("format") == "ndjson"
+              or request.accept_mimetypes.best == "application/x-ndjson")
+    sql, params, _ = collection_query(table, fields)
+
+    conn = get_connection()
+    cur = conn.cursor(dictionary=True, buffered=False)
+    cur.execute(sql, tuple(params))
+
+    def generate():
+        first = True
+        if not ndjson:
+            yield "["
+        try:
+            while True:
+                rows = cur.fetchmany(STREAM_BATCH_SIZE)
+                if not rows:
+                    break
+                chunk = []
+                for row in rows:
+                    if ndjson:
+                        chunk.append(current_app.json.dumps(row) + "\n")
+                    else:
+                        chunk.append(("" if first else ",") + current_app.json.dumps(row))
+                        first = False
+                yield "".join(chunk)
+            cur.close()
+        finally:
+            # Якщо клієнт відключився посеред вибірки, пул сам відкине
+            # з'єднання з непрочитаним результатом
+            conn.close()
+        if not ndjson:
+            yield "]"
+
+    mimetype = "application/x-ndjson" if ndjson else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+def request_data():
+    """Поля запиту: JSON-об'єкт або formData."""
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise ApiError("Очікується JSON-об'єкт")
+        return data
+    return request.form
+
+
+def in_ids(where, count):
+    """Умову каскаду для одного id ("column=%s") перетворює на умову для count id."""
+    return where.replace("=%s", f" IN ({', '.join(['%s'] * count)})")
+
+
+def swagger_type(convert):
+    if convert is int:
+        return {"type": "integer"}
+    if convert is Decimal:
+        return {"type": "number"}
+    if convert is to_date:
+        return {"type": "string", "format": "date"}
+    if hasattr(convert, "choices"):
+        return {"type": "string", "enum": list(convert.choices)}
+    return {"type": "string"}
+
+
+LIST_PARAMETERS = [
+    {"name": "limit", "in": "query", "type": "integer", "required": False,
+     "description": "Розмір сторінки (до 1000). Вмикає пагінацію"},
+    {"name": "after_id", "in": "query", "type": "integer", "required": False,
+     "description": "Курсор — next_cursor з попередньої сторінки"},
+    {"name": "fields", "in": "query", "type": "string", "required": False,
+     "description": "Список колонок через кому"},
+    {"name": "stream", "in": "query", "type": "integer", "required": False, "enum": [0, 1],
+     "description": "Потокова видача всієї таблиці (або Accept application/x-ndjson)"},
+    {"name": "format", "in": "query", "type": "string", "required": False, "enum": ["json", "ndjson"],
+     "description": "Формат потокової видачі"},
+    {"name": "sort", "in": "query", "type": "string", "required": False,
+     "description": 'Колонка сортування, з "-" — за спаданням'},
+    {"name": "cursor", "in": "query", "type": "string", "required": False,
+     "description": "next_cursor з попередньої сторінки при сортуванні не за id"},
+    {"name": "shape", "in": "query", "type": "string", "required": False, "enum": ["rows", "columns"],
+     "description": "columns — імена колонок один раз (columns) і масиви значень (rows)"},
+]
+
+IDEMPOTENCY_PARAMETER = {"name": "Idempotency-Key", "in": "header", "type": "string", "required": False,
+                         "description": "Унікальний ключ запиту: повтор з тим самим ключем поверне першу відповідь"}
+
+
+class Resource:
+    """
+    CRUD-маршрути для однієї таблиці з schema.TABLES.
+
+    docs — заголовки операцій для Swagger (list, create, bulk, bulk_update,
+    bulk_delete, update, delete) і повідомлення not_found. cached — відповіді GET кешуються з ETag.
+
+    summary — функція з analytics, яка оновлює зведені таблиці для рядків
+    цієї таблиці; cascade — трійки (таблиця, функція, умова за id) для
+    залежних рядків, що видаляються разом із записом (ON DELETE CASCADE).
+    Зміни таблиць з changefeed.FEED_TABLES, зокрема каскадні видалення,
+    записуються в журнал змін у тій самій транзакції. dependents — трійки
+    (колонки, функція, умова за id) для зведених таблиць, у які ці колонки
+    копіюються з залежних рядків (тип номера в occupancy_daily): при їх зміні
+    залежні рядки віднімаються перед UPDATE і додаються після нього.
+
+    check(cur, id, row) викликається в транзакції перед записом з повним
+    рядком після зміни (id — None для нового), on_write(op, id, row) — після
+    коміту; op — insert, update, delete або bulk (тоді id — список).
+
+    compute(row, changes) повертає значення обчислюваних колонок
+    (schema.Table.computed) для повного рядка; changes — поля, передані
+    в запиті (при створенні — увесь рядок).
+
+    queue — черга відкладеного запису (writebehind.py): якщо задана, POST
+    лише перевіряє рядок, кладе його в чергу і відповідає 202.
+    """
+
+    def __init__(self, table, label, tag, docs, cached=False, summary=None, cascade=(), dependents=(),
+                 check=None, on_write=None, compute=None):
+        self.table = TABLES[table]
+        self.label = label
+        self.tag = tag
+        self.docs = docs
+        self.cached = cached
+        self.summary = summary
+        self.cascade = cascade
+        self.dependents = dependents
+        self.check = check
+        self.on_write = on_write
+        self.compute = compute
+        self.queue = None
+
+        name, pk = self.table.name, self.table.pk
+        self.where = f"{pk}=%s"
+        self._select_current = f"SELECT {', '.join(self.table.columns)} FROM {name} WHERE {pk}=%s FOR UPDATE"
+        self._delete = f"DELETE FROM {name} WHERE {pk}=%s"
+        # INSERT і UPDATE залежать від набору переданих колонок; кожен варіант
+        # будується один раз
+        self._statements = {}
+
+    def statement(self, kind, columns):
+        sql = self._statements.get((kind, columns))
+        if sql is None:
+            name, pk = self.table.name, self.table.pk
+            if kind == "insert":
+                sql = f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+            else:
+                sql = f"UPDATE {name} SET {', '.join(f'{c}=%s' for c in columns)} WHERE {pk}=%s"
+            self._statements[(kind, columns)] = sql
+        return sql
+
+    def insert_many(self, cur, columns, values):
+        """
+        Вставляє рядки одним багаторядковим INSERT у поточній транзакції.
+
+        Якщо база відхиляє пакет, рядки повторюються по одному під SAVEPOINT,
+        тож один поганий рядок не зупиняє решту. Повертає (ids, errors): id для
+        кожного рядка (None — відхилений) і {позиція: текст помилки}.
+        """
+        if not values:
+            return [], {}
+        sql = self.statement("insert", columns)
+        try:
+            cur.execute("SAVEPOINT insert_many")
+            cur.executemany(sql, values)
+            # Для багаторядкової вставки InnoDB видає послідовні id, починаючи з lastrowid
+            return [cur.lastrowid + n for n in range(len(values))], {}
+        except DatabaseError:
+            cur.execute("ROLLBACK TO SAVEPOINT insert_many")
+        ids, errors = [], {}
+        for i, row_values in enumerate(values):
+            cur.execute("SAVEPOINT insert_many_row")
+            try:
+                cur.execute(sql, row_values)
+                ids.append(cur.lastrowid)
+            except DatabaseError as e:
+                cur.execute("ROLLBACK TO SAVEPOINT insert_many_row")
+                ids.append(None)
+                errors[i] = str(e)
+        return ids, errors
+
+    def apply_dependents(self, cur, changes, ids, sign):
+        for columns, apply, where in self.dependents:
+            if not columns.isdisjoint(changes):
+                apply(cur, in_ids(where, len(ids)), tuple(ids), sign)
+
+    def written(self, op, id, row):
+        if self.table.name in changefeed.FEED_TABLES or (op == "delete" and self.cascade):
+            changefeed.notifier.notify()
+        if self.cached:
+            response_cache.invalidate(self.table.name)
+        if self.on_write is not None:
+            self.on_write(op, id, row)
+
+    def complete(self, row, changes=None):
+        """Додає до рядка обчислювані колонки."""
+        if self.compute is not None:
+            computed = self.compute(row, row if changes is None else changes)
+            row.update(computed)
+            if changes is not None:
+                changes.update(computed)
+        return row
+
+    def list(self):
+        if self.cached:
+            return cached_collection(self.table.name)
+        return list_collection(self.table.name)
+
+    def create(self):
+        pk = self.table.pk
+        row = self.complete(self.table.coerce(request_data()))
+        if self.queue is not None:
+            seq = self.queue.enqueue(row)
+            return jsonify({"message": f"{self.label} queued", "seq": seq}), 202
+        conn = get_connection()
+        cur = conn.cursor()
+        if self.check is not None:
+            self.check(cur, None, row)
+        cur.execute(self.statement("insert", tuple(row)), tuple(row.values()))
+        new_id = cur.lastrowid
+        if self.summary is not None:
+            self.summary(cur, self.where, (new_id,))
+        changefeed.record(cur, self.table.name, "insert", [new_id])
+        conn.commit()
+        cur.close()
+        conn.close()
+        self.written("insert", new_id, row)
+        return jsonify({"message": f"{self.label} created", "id": new_id, pk: new_id}), 201
+
+    def update(self, id):
+        changes = self.table.coerce(request_data(), partial=True)
+        if not changes:
+            return jsonify({"message": "Нічого оновлювати"}), 400
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(self._select_current, (id,))
+        current = cur.fetchone()
+        if current is None:
+            raise ApiError(self.docs["not_found"], 404)
+        row = dict(zip(self.table.columns, current))
+        row.update(changes)
+        self.complete(row, changes)
+        if self.check is not None:
+            self.check(cur, id, row)
+
+        if self.summary is not None:
+            self.summary(cur, self.where, (id,), -1)
+        self.apply_dependents(cur, changes, (id,), -1)
+        cur.execute(self.statement("update", tuple(changes)), (*changes.values(), id))
+        self.apply_dependents(cur, changes, (id,), 1)
+        if self.summary is not None:
+            self.summary(cur, self.where, (id,))
+        changefeed.record(cur, self.table.name, "update", [id])
+        conn.commit()
+        cur.close()
+        conn.close()
+        self.written("update", id, row)
+        return jsonify({"message": f"{self.label} updated"})
+
+    def delete(self, id):
+        conn = get_connection()
+        cur = conn.cursor()
+        for table, apply, where in self.cascade:
+            apply(cur, where, (id,), -1)
+            changefeed.record_deleted(cur, table, where, (id,))
+        if self.summary is not None:
+            self.summary(cur, self.where, (id,), -1)
+        cur.execute(self._delete, (id,))
+        if cur.rowcount == 0:
+            raise ApiError(self.docs["not_found"], 404)
+        changefeed.record(cur, self.table.name, "delete", [id])
+        conn.commit()
+        cur.close()
+        conn.close()
+        self.written("delete", id, None)
+        return jsonify({"message": f"{self.label} deleted"}), 204
+
+    def bulk_create(self):
+        """
+        Пакетне додавання рядків з JSON-масиву в одній транзакції.
+
+        mode=atomic (за замовчуванням) — усе або нічого;
+        mode=partial — вставляються коректні рядки, про решту повертаються помилки.
+        """
+        rows = request.get_json(silent=True)
+        if isinstance(rows, dict):
+            rows = rows.get("items")
+        if not isinstance(rows, list) or not rows:
+            raise ApiError("Очікується непорожній JSON-масив")
+        if len(rows) > BULK_MAX_ROWS:
+            raise ApiError(f"Не більше {BULK_MAX_ROWS} рядків за один запит", 413)
+        mode = request.args.get("mode", "atomic")
+        if mode not in ("atomic", "partial"):
+            raise ApiError("mode має бути atomic або partial")
+
+        columns = tuple(self.table.writable)
+        errors = []
+        positions = []
+        prepared = []
+        values = []
+        for i, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors.append({"index": i, "message": "Рядок має бути об'єктом"})
+                continue
+            try:
+                row = self.complete(self.table.coerce(row))
+            except ApiError as e:
+                errors.append({"index": i, "message": e.message})
+                continue
+            positions.append(i)
+            prepared.append(row)
+            values.append(tuple(row.get(c) for c in columns))
+
+        if errors and mode == "atomic":
+            return jsonify({"message": "Жоден рядок не додано", "errors": errors}), 400
+
+        sql = self.statement("insert", columns)
+        ids = [None] * len(rows)
+        conn = get_connection()
+        cur = conn.cursor()
+        if self.check is not None:
+            # Перевірка (зайнятість номера) має бачити рядки, вставлені перед нею,
+            # тому кожен рядок перевіряється й вставляється окремо під SAVEPOINT
+            for i, row, row_values in zip(positions, prepared, values):
+                cur.execute("SAVEPOINT bulk_row")
+                try:
+                    self.check(cur, None, row)
+                    cur.execute(sql, row_values)
+                    ids[i] = cur.lastrowid
+                except (ApiError, DatabaseError) as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT bulk_row")
+                    error = {"index": i, "message": e.message if isinstance(e, ApiError) else str(e)}
+                    if mode == "atomic":
+                        conn.rollback()
+                        status = e.status if isinstance(e, ApiError) else 400
+                        return jsonify({"message": "Жоден рядок не додано", "errors": [error]}), status
+                    errors.append(error)
+        else:
+            try:
+                # executemany збирає все в один багаторядковий INSERT; для такої
+                # вставки InnoDB видає послідовні id, починаючи з lastrowid
+                cur.executemany(sql, values)
+                for n, i in enumerate(positions):
+                    ids[i] = cur.lastrowid + n
+            except DatabaseError as e:
+                conn.rollback()
+                if mode == "atomic":
+                    return jsonify({"message": "Жоден рядок не додано",
+                                    "errors": [{"index": None, "message": str(e)}]}), 400
+                # У режимі partial повторюємо по одному рядку, щоб знайти помилкові
+                for i, row_values in zip(positions, values):
+                    cur.execute("SAVEPOINT bulk_row")
+                    try:
+                        cur.execute(sql, row_values)
+                        ids[i] = cur.lastrowid
+                    except DatabaseError as row_error:
+                        cur.execute("ROLLBACK TO SAVEPOINT bulk_row")
+                        errors.append({"index": i, "message": str(row_error)})
+        created = [i for i in ids if i is not None]
+        if self.summary is not None and created:
+            self.summary(cur, f"{self.table.pk} IN ({', '.join(['%s'] * len(created))})", tuple(created))
+        changefeed.record(cur, self.table.name, "insert", created)
+        conn.commit()
+        cur.close()
+        conn.close()
+        if created:
+            self.written("bulk", created, None)
+
+        errors.sort(key=lambda e: e["index"])
+        return jsonify({"message": f"Created {len(created)} rows", "ids": ids,
+                        "errors": errors}), 207 if errors else 201
+
+    def bulk_target(self, body):
+        """
+        Умови WHERE для пакетної зміни: ids — масив id, filter — об'єкт
+        у форматі фільтрів GET (колонка або колонка__op → значення).
+        Повертає (умови, параметри, ids або None).
+        """
+        clauses, params = [], []
+        ids = body.get("ids")
+        if ids is not None:
+            if not isinstance(ids, list) or not ids:
+                raise ApiError("ids має бути непорожнім масивом")
+            if len(ids) > BULK_MAX_ROWS:
+                raise ApiError(f"Не більше {BULK_MAX_ROWS} id за один запит", 413)
+            try:
+                ids = sorted({int(i) for i in ids})
+            except (TypeError, ValueError):
+                raise ApiError("ids мають бути цілими числами")
+            clauses.append(f"{self.table.pk} IN ({', '.join(['%s'] * len(ids))})")
+            params.extend(ids)
+        filters = body.get("filter")
+        if filters is not None:
+            if not isinstance(filters, dict) or not filters:
+                raise ApiError("filter має бути непорожнім об'єктом")
+            args = MultiDict([(name, ",".join(map(str, value)) if isinstance(value, list) else str(value))
+                              for name, value in filters.items()])
+            filter_clauses, filter_params = compile_filters(self.table.name, args)
+            clauses.extend(filter_clauses)
+            params.extend(filter_params)
+        if not clauses:
+            raise ApiError("Потрібно вказати ids або filter")
+        return clauses, params, ids
+
+    def each_chunk(self, body, apply):
+        """
+        Викликає apply(cur, rows) для рядків, що відповідають ids/filter,
+        частинами по BULK_CHUNK_SIZE: кожна частина — окрема коротка транзакція
+        з блокуванням лише своїх рядків. Якщо частина не вдалася, вона
+        відкочується, а обробка зупиняється; попередні частини лишаються
+        збереженими. Повертає (оброблені id, кількість частин, ApiError або None).
+        """
+        clauses, params, _ = self.bulk_target(body)
+        name, pk, columns = self.table.name, self.table.pk, list(self.table.columns)
+        select = (f"SELECT {', '.join(columns)} FROM {name} WHERE {' AND '.join(clauses)} AND {pk} > %s "
+                  f"ORDER BY {pk} LIMIT %s FOR UPDATE")
+        done, chunks, last, error = [], 0, 0, None
+        conn = get_connection()
+        cur = conn.cursor()
+        while True:
+            cur.execute(select, (*params, last, BULK_CHUNK_SIZE))
+            rows = [dict(zip(columns, values)) for values in cur.fetchall()]
+            if not rows:
+                conn.rollback()
+                break
+            try:
+                after_commit = apply(cur, rows)
+                conn.commit()
+            except ApiError as e:
+                conn.rollback()
+                error = e
+                break
+            except DatabaseError as e:
+                conn.rollback()
+                error = ApiError(str(e), 409)
+                break
+            for args in after_commit:
+                self.written(*args)
+            ids = [row[pk] for row in rows]
+            done.extend(ids)
+            chunks += 1
+            last = ids[-1]
+            if len(rows) < BULK_CHUNK_SIZE:
+                break
+        cur.close()
+        conn.close()
+        return done, chunks, error
+
+    def bulk_result(self, body, verb, done, chunks, error):
+        if error is not None:
+            # Частини до помилки вже збережено: повідомляємо, які саме
+            return jsonify({"message": f"{error.message} (уже збережено рядків: {len(done)})",
+                            "affected": len(done), "chunks": chunks, "ids": done}), error.status
+        result = {"message": f"{verb} {len(done)} rows", "affected": len(done), "chunks": chunks}
+        if body.get("ids") is not None:
+            affected = set(done)
+            result["missing"] = sorted({int(i) for i in body["ids"]} - affected)
+        return jsonify(result)
+
+    def bulk_update(self):
+        """
+        Пакетна зміна рядків за ids або filter.
+
+        Рядки частини, для яких зміни (разом з обчислюваними колонками)
+        однакові, оновлюються одним UPDATE ... WHERE id IN (...). Для таблиць
+        з check кожен рядок перевіряється й оновлюється по черзі, щоб перевірка
+        бачила попередні зміни в тій самій частині.
+        """
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise ApiError("Очікується JSON-об'єкт")
+        changes = self.table.coerce(body.get("set") or {}, partial=True)
+        if not changes:
+            raise ApiError("Нічого оновлювати: передайте поля в set")
+        name, pk = self.table.name, self.table.pk
+
+        def apply(cur, rows):
+            ids = [row[pk] for row in rows]
+            where = f"{pk} IN ({', '.join(['%s'] * len(ids))})"
+            if self.summary is not None:
+                self.summary(cur, where, tuple(ids), -1)
+            self.apply_dependents(cur, changes, ids, -1)
+            groups = {}
+            written = []
+            for row in rows:
+                row_changes = dict(changes)
+                row.update(row_changes)
+                self.complete(row, row_changes)
+                if self.check is not None:
+                    self.check(cur, row[pk], row)
+                    cur.execute(self.statement("update", tuple(row_changes)), (*row_changes.values(), row[pk]))
+                else:
+                    groups.setdefault(tuple(row_changes.items()), []).append(row[pk])
+                written.append(("update", row[pk], row))
+            for items, group_ids in groups.items():
+                cur.execute(f"UPDATE {name} SET {', '.join(f'{c}=%s' for c, _ in items)} "
+                            f"WHERE {pk} IN ({', '.join(['%s'] * len(group_ids))})",
+                            (*(value for _, value in items), *group_ids))
+            self.apply_dependents(cur, changes, ids, 1)
+            if self.summary is not None:
+                self.summary(cur, where, tuple(ids))
+            changefeed.record(cur, name, "update", ids)
+            return written
+
+        return self.bulk_result(body, "Updated", *self.each_chunk(body, apply))
+
+    def bulk_delete(self):
+        """Пакетне видалення рядків за ids або filter разом з каскадними записами."""
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise ApiError("Очікується JSON-об'єкт")
+        name, pk = self.table.name, self.table.pk
+
+        def apply(cur, rows):
+            ids = tuple(row[pk] for row in rows)
+            for table, cascade_apply, where in self.cascade:
+                where = in_ids(where, len(ids))
+                cascade_apply(cur, where, ids, -1)
+                changefeed.record_deleted(cur, table, where, ids)
+            where = f"{pk} IN ({', '.join(['%s'] * len(ids))})"
+            if self.summary is not None:
+                self.summary(cur, where, ids, -1)
+            cur.execute(f"DELETE FROM {name} WHERE {where}", ids)
+            changefeed.record(cur, name, "delete", list(ids))
+            return [("delete", id, None) for id in ids]
+
+        return self.bulk_result(body, "Deleted", *self.each_chunk(body, apply))
+
+    def specs(self):
+        """Документація Swagger для кожної операції."""
+        table = self.table
+        tags = [self.tag]
+        id_parameter = {"name": "id", "in": "path", "type": "integer", "required": True}
+
+        def form_parameters(required):
+            return [{"name": column, "in": "formData", **swagger_type(table.columns[column]),
+                     "required": required and column in table.required,
+                     **({"example": table.examples[column]} if column in table.examples else {})}
+                    for column in table.writable if column not in table.computed]
+
+        # Приклад для set — перше поле з фільтрів таблиці, яке можна змінювати
+        bulk_example = next(({c: table.examples[c]} for c in table.filters
+                             if c in table.examples and c not in table.computed), {})
+
+        list_responses = {200: {"description": "Список записів"}}
+        if self.cached:
+            list_responses[304] = {"description": "Дані не змінилися (If-None-Match збігається з ETag)"}
+        return {
+            "list": {
+                "tags": tags, "summary": self.docs["list"],
+                "description": "Фільтри: колонка=значення або колонка__op=значення\n"
+                               "(op: eq, ne, gt, gte, lt, lte, in — значення через кому).\n"
+                               f"Доступні колонки: {', '.join(table.filters)}.",
+                "parameters": LIST_PARAMETERS,
+                "produces": ["application/json", "application/msgpack", "application/x-ndjson"],
+                "responses": list_responses,
+            },
+            "create": {
+                "tags": tags, "summary": self.docs["create"],
+                "parameters": [IDEMPOTENCY_PARAMETER] + form_parameters(True),
+                "responses": {201: {"description": "Запис створено"},
+                              202: {"description": "Запис прийнято в чергу відкладеного запису"},
+                              400: {"description": "Відсутні або некоректні поля"}},
+            },
+            "bulk": {
+                "tags": tags, "summary": self.docs["bulk"],
+                "description": f"Тіло запиту — JSON-масив об'єктів з тими ж полями, що й у POST /{table.name}.\n"
+                               "Усі рядки вставляються в одній транзакції.",
+                "parameters": [
+                    IDEMPOTENCY_PARAMETER,
+                    {"name": "mode", "in": "query", "type": "string", "enum": ["atomic", "partial"],
+                     "required": False,
+                     "description": "atomic — усе або нічого, partial — пропустити помилкові рядки"},
+                    {"name": "body", "in": "body", "required": True,
+                     "schema": {"type": "array", "items": {"type": "object"}, "example": [table.examples]}},
+                ],
+                "responses": {201: {"description": "Усі записи додано, ids у порядку рядків запиту"},
+                              207: {"description": "Частину записів додано (mode=partial), див. errors"},
+                              400: {"description": "Жоден запис не додано"},
+                              409: {"description": "Рядок не пройшов перевірку (mode=atomic), жоден запис не додано"}},
+            },
+            "bulk_update": {
+                "tags": tags, "summary": self.docs["bulk_update"],
+                "description": f"Змінює всі записи з ids та/або за filter (фільтри як у GET /{table.name}).\n"
+                               f"Записи обробляються частинами до {BULK_CHUNK_SIZE} рядків, кожна частина — "
+                               "окрема транзакція.",
+                "parameters": [
+                    {"name": "body", "in": "body", "required": True,
+                     "schema": {"type": "object", "properties": {
+                         "ids": {"type": "array", "items": {"type": "integer"}},
+                         "filter": {"type": "object"},
+                         "set": {"type": "object"}},
+                         "example": {"ids": [1, 2, 3], "set": bulk_example}}},
+                ],
+                "responses": {200: {"description": "Кількість змінених записів (affected) і id, яких не знайдено (missing)"},
+                              400: {"description": "Некоректні ids, filter або set"},
+                              409: {"description": "Зміна порушує обмеження; попередні частини вже збережено, "
+                                                   "їх кількість (affected) і id (ids) — у відповіді"}},
+            },
+            "bulk_delete": {
+                "tags": tags, "summary": self.docs["bulk_delete"],
+                "description": f"Видаляє всі записи з ids та/або за filter разом із залежними записами.\n"
+                               f"Записи обробляються частинами до {BULK_CHUNK_SIZE} рядків.",
+                "parameters": [
+                    {"name": "body", "in": "body", "required": True,
+                     "schema": {"type": "object", "properties": {
+                         "ids": {"type": "array", "items": {"type": "integer"}},
+                         "filter": {"type": "object"}},
+                         "example": {"ids": [1, 2, 3]}}},
+                ],
+                "responses": {200: {"description": "Кількість видалених записів (affected) і id, яких не знайдено (missing)"},
+                              400: {"description": "Некоректні ids або filter"},
+                              409: {"description": "Видалення порушує обмеження; попередні частини вже збережено, "
+                                                   "їх кількість (affected) і id (ids) — у відповіді"}},
+            },
+            "update": {
+                "tags": tags, "summary": self.docs["update"],
+                "description": "Потрібно вказати id і лише ті поля, які треба змінити.",
+                "parameters": [id_parameter] + form_parameters(False),
+                "responses": {200: {"description": "Запис оновлено"},
+                              400: {"description": "Нічого оновлювати або некоректні поля"},
+                              404: {"description": self.docs["not_found"]}},
+            },
+            "delete": {
+                "tags": tags, "summary": self.docs["delete"],
+                "parameters": [id_parameter],
+                "responses": {204: {"description": "Запис видалено"},
+                              404: {"description": self.docs["not_found"]}},
+            },
+        }
+
+    def register(self, app):
+        name = self.table.name
+        specs = self.specs()
+        routes = [
+            ("list", f"/{name}", "GET", self.list),
+            ("create", f"/{name}", "POST", self.create),
+            ("bulk", f"/{name}/bulk", "POST", self.bulk_create),
+            ("bulk_update", f"/{name}/bulk", "PATCH", self.bulk_update),
+            ("bulk_delete", f"/{name}/bulk", "DELETE", self.bulk_delete),
+            ("update", f"/{name}/<int:id>", "PUT", self.update),
+            ("delete", f"/{name}/<int:id>", "DELETE", self.delete),
+        ]
+        for op, rule, method, handler in routes:
+            # swag_from зберігає специфікацію в атрибуті функції, тож кожному
+            # маршруту потрібна власна функція, а не зв'язаний метод
+            def view(handler=handler, **kwargs):
+                return handler(**kwargs)
+            view.__name__ = f"{name}_{op}"
+            app.add_url_rule(rule, view.__name__, swag_from(specs[op])(view), methods=[method])
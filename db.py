@@ -1,9 +1,361 @@
-import mysql.connector
-
-def get_connection():
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="Dhdkedrcrheke74",
-        database="coursework"
-    )
\ No newline at end of file
+import itertools
+import os
+import queue
+import threading
+import time
+
+from flask import g, has_app_context, has_request_context, jsonify, request
+
+import metrics
+import storage
+
+DB_CONFIG = {
+    "host": os.environ.get("DB_HOST", "localhost"),
+    "user": os.environ.get("DB_USER", "root"),
+    "password": os.environ.get("DB_PASSWORD", "Dhdkedrcrheke74"),
+    "database": os.environ.get("DB_NAME", "coursework"),
+}
+
+# Сховище: mysql (сервер з DB_CONFIG) або sqlite (вбудована база у файлі DB_SQLITE_PATH)
+DB_BACKEND = os.environ.get("DB_BACKEND", "mysql")
+DB_SQLITE_PATH = os.environ.get("DB_SQLITE_PATH",
+                                os.path.join(os.path.dirname(os.path.abspath(__file__)), "coursework.sqlite"))
+
+BACKEND = storage.create_backend(DB_BACKEND, DB_CONFIG, DB_SQLITE_PATH)
+DatabaseError = BACKEND.Error
+
+# Налаштування пулу з'єднань
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+POOL_MAX_OVERFLOW = int(os.environ.get("DB_POOL_MAX_OVERFLOW", 10))
+POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+POOL_PING_AFTER = float(os.environ.get("DB_POOL_PING_AFTER", 30))
+
+# Репліки для читання: "host" або "host:port" через кому (користувач, пароль
+# і база — з DB_CONFIG). Без них усі запити йдуть на основний сервер.
+DB_REPLICAS = [host.strip() for host in os.environ.get("DB_REPLICAS", "").split(",") if host.strip()]
+# Скільки секунд після запису клієнт читає з основного сервера (read-your-writes)
+READ_YOUR_WRITES = int(os.environ.get("DB_READ_YOUR_WRITES", 5))
+# Скільки секунд не звертатися до репліки після помилки або відставання
+REPLICA_RETRY_AFTER = float(os.environ.get("DB_REPLICA_RETRY_AFTER", 10))
+# Максимальне відставання репліки, секунди (0 — не перевіряти) і як часто перевіряти
+REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", 0))
+REPLICA_CHECK_INTERVAL = float(os.environ.get("DB_REPLICA_CHECK_INTERVAL", 5))
+PRIMARY_COOKIE = "db_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+replica_up = metrics.Gauge("db_replica_up", "Чи використовується репліка для читання (1/0)", ("replica",))
+connections = metrics.Counter("db_connections_total", "Видані з'єднання за сервером", ("target",))
+metrics.REGISTRY.extend([replica_up, connections])
+
+
+class PoolTimeout(Exception):
+    """Не вдалося отримати з'єднання з пулу за відведений час."""
+
+
+class PooledConnection:
+    """Обгортка над з'єднанням: close() повертає його в пул, а не закриває."""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._before_commit = {}
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise DatabaseError("Connection already returned to pool")
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        return metrics.TimedCursor(self.__getattr__("cursor")(*args, **kwargs), connection=self)
+
+    def before_commit(self, callback):
+        """
+        Список, з яким callback(cur, items) буде викликано в поточній транзакції
+        безпосередньо перед комітом. Повторні виклики з тим самим callback
+        повертають той самий список; після коміту чи відкату він скидається.
+        """
+        return self._before_commit.setdefault(callback, [])
+
+    def commit(self):
+        hooks, self._before_commit = self._before_commit, {}
+        if hooks:
+            cur = self.cursor()
+            for callback, items in hooks.items():
+                callback(cur, items)
+            cur.close()
+        self.__getattr__("commit")()
+
+    def rollback(self):
+        self._before_commit = {}
+        self.__getattr__("rollback")()
+
+    @property
+    def closed(self):
+        return self._raw is None
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw)
+
+
+class ConnectionPool:
+    """
+    Пул з'єднань з базою (MySQL або SQLite, див. storage.py).
+
+    Тримає до `size` простоюючих з'єднань і дозволяє відкрити ще `max_overflow`
+    тимчасових. Якщо всі зайняті, acquire() чекає до `timeout` секунд.
+    """
+
+    def __init__(self, factory, size=POOL_SIZE, max_overflow=POOL_MAX_OVERFLOW,
+                 timeout=POOL_TIMEOUT, ping_after=POOL_PING_AFTER):
+        self._factory = factory
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._size = size
+        self._max_overflow = max_overflow
+        self._timeout = timeout
+        self._ping_after = ping_after
+
+    def acquire(self):
+        deadline = time.monotonic() + self._timeout
+        while True:
+            try:
+                raw, returned_at = self._idle.get_nowait()
+            except queue.Empty:
+                raw = self._open_or_wait(deadline)
+                if raw is None:
+                    continue
+                return PooledConnection(self, raw)
+
+            if self._is_alive(raw, returned_at):
+                return PooledConnection(self, raw)
+            self._discard(raw)
+
+    def fill(self, count):
+        """Заздалегідь відкриває до `count` з'єднань (не більше розміру пулу)."""
+        connections = []
+        try:
+            while len(connections) < min(count, self._size):
+                connections.append(self.acquire())
+        finally:
+            for conn in connections:
+                conn.close()
+
+    def release(self, raw):
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+            healthy = raw.is_connected()
+        except DatabaseError:
+            healthy = False
+
+        if not healthy:
+            self._discard(raw)
+            return
+
+        with self._lock:
+            keep = self._idle.qsize() < self._size
+        if keep:
+            self._idle.put((raw, time.monotonic()))
+        else:
+            self._discard(raw)
+
+    def _open_or_wait(self, deadline):
+        with self._lock:
+            can_open = self._opened < self._size + self._max_overflow
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                return self._factory()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise PoolTimeout("Немає вільних з'єднань з базою даних")
+        try:
+            raw, returned_at = self._idle.get(timeout=remaining)
+        except queue.Empty:
+            raise PoolTimeout("Немає вільних з'єднань з базою даних")
+        # Повертаємо з'єднання назад, щоб acquire() перевірив його стан
+        self._idle.put((raw, returned_at))
+        return None
+
+    def _is_alive(self, raw, returned_at):
+        if time.monotonic() - returned_at < self._ping_after:
+            return True
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except DatabaseError:
+            return False
+
+    def _discard(self, raw):
+        with self._lock:
+            self._opened -= 1
+        try:
+            raw.close()
+        except DatabaseError:
+            pass
+
+
+def _connect():
+    return BACKEND.connect()
+
+
+def replica_config(address):
+    host, _, port = address.partition(":")
+    config = {**DB_CONFIG, "host": host}
+    if port:
+        config["port"] = int(port)
+    return config
+
+
+class ReplicaLagging(Exception):
+    """Репліка відстала від основного сервера більше, ніж дозволено."""
+
+
+class ReplicaSet:
+    """
+    Пули з'єднань реплік для читання.
+
+    Репліки обираються по черзі; репліка, до якої не вдалося підключитися
+    або яка відстала більше ніж на REPLICA_MAX_LAG секунд, пропускається
+    REPLICA_RETRY_AFTER секунд. Якщо жодна не доступна, acquire() повертає None.
+    """
+
+    def __init__(self, addresses, retry_after=REPLICA_RETRY_AFTER, max_lag=REPLICA_MAX_LAG,
+                 check_interval=REPLICA_CHECK_INTERVAL):
+        self.addresses = addresses
+        self._pools = [ConnectionPool(storage.MySQLBackend(replica_config(address)).connect)
+                       for address in addresses]
+        self._next = itertools.count()
+        self._down_until = [0.0] * len(addresses)
+        self._checked_at = [0.0] * len(addresses)
+        self._retry_after = retry_after
+        self._max_lag = max_lag
+        self._check_interval = check_interval
+        for address in addresses:
+            replica_up.set(1, address)
+
+    def acquire(self):
+        start = next(self._next)
+        for n in range(len(self._pools)):
+            index = (start + n) % len(self._pools)
+            now = time.monotonic()
+            if self._down_until[index] > now:
+                continue
+            try:
+                conn = self._pools[index].acquire()
+            except (DatabaseError, PoolTimeout):
+                self._mark_down(index)
+                continue
+            if self._max_lag and now - self._checked_at[index] >= self._check_interval:
+                self._checked_at[index] = now
+                try:
+                    self._check_lag(conn)
+                except (DatabaseError, ReplicaLagging):
+                    conn.close()
+                    self._mark_down(index)
+                    continue
+            replica_up.set(1, self.addresses[index])
+            return conn
+        return None
+
+    def _check_lag(self, conn):
+        cur = conn.cursor(dictionary=True)
+        cur.execute("SHOW REPLICA STATUS")
+        status = cur.fetchone()
+        cur.close()
+        lag = status and status.get("Seconds_Behind_Source")
+        if lag is None or lag > self._max_lag:
+            raise ReplicaLagging(f"Репліка відстає: {lag}")
+
+    def _mark_down(self, index):
+        self._down_until[index] = time.monotonic() + self._retry_after
+        replica_up.set(0, self.addresses[index])
+
+
+_pool = None
+_replicas = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(_connect)
+    return _pool
+
+
+def get_replicas():
+    global _replicas
+    if _replicas is None and DB_REPLICAS:
+        with _pool_lock:
+            if _replicas is None:
+                _replicas = ReplicaSet(DB_REPLICAS)
+    return _replicas
+
+
+def reads_from_primary():
+    """
+    True, якщо поточний запит має читати з основного сервера.
+
+    Це всі запити поза обробкою HTTP, усі запити, що змінюють дані, і читання
+    клієнта, який сам щойно щось змінив (cookie PRIMARY_COOKIE).
+    """
+    return (not DB_REPLICAS or not has_request_context() or request.method not in SAFE_METHODS
+            or PRIMARY_COOKIE in request.cookies)
+
+
+def get_connection(primary=False):
+    """
+    З'єднання з базою, яке повертається в пул наприкінці запиту.
+
+    GET-запити отримують з'єднання з репліки, якщо їх налаштовано;
+    primary=True — завжди основний сервер (для кешів у пам'яті процесу,
+    які не повинні бачити застарілих даних).
+    """
+    started = time.perf_counter()
+    conn = None
+    if not primary and not reads_from_primary():
+        conn = get_replicas().acquire()
+    connections.inc(1, "primary" if conn is None else "replica")
+    if conn is None:
+        conn = get_pool().acquire()
+    metrics.observe_acquire(time.perf_counter() - started)
+    if has_app_context():
+        g.setdefault("db_connections", []).append(conn)
+    return conn
+
+
+def primary_connection():
+    return get_connection(primary=True)
+
+
+def release_connections(exc=None):
+    for conn in g.pop("db_connections", []):
+        conn.close()
+
+
+def pin_to_primary(response):
+    """Після запиту, що змінює дані, клієнт READ_YOUR_WRITES секунд читає з основного сервера."""
+    if DB_REPLICAS and request.method not in SAFE_METHODS and response.status_code < 400:
+        response.set_cookie(PRIMARY_COOKIE, "1", max_age=READ_YOUR_WRITES, httponly=True, samesite="Lax")
+    return response
+
+
+def init_app(app):
+    app.teardown_appcontext(release_connections)
+    app.after_request(pin_to_primary)
+
+    @app.errorhandler(PoolTimeout)
+    def pool_timeout(e):
+        return jsonify({"message": str(e)}), 503
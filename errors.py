@@ -0,0 +1,7 @@
+class ApiError(Exception):
+    """Помилка запиту, яка повертається клієнту як {"message": ...}."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
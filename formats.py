@@ -0,0 +1,172 @@
+"""
+Формати і стиснення відповідей.
+
+- JSON кодується через orjson (якщо встановлено): словники, списки й числа
+  серіалізуються в C, Python-код викликається лише для Decimal і дат.
+  Формат той самий, що й у стандартного провайдера Flask: дати — HTTP-датою
+  (Thu, 20 Nov 2025 00:00:00 GMT), Decimal — рядком.
+- Колекції можна отримати в колонковому вигляді (shape=columns): імена
+  колонок один раз і масиви значень замість об'єкта на кожен рядок,
+  а з заголовком Accept: application/msgpack — у форматі MessagePack.
+- Відповіді від COMPRESS_MIN_SIZE байт стискаються за Accept-Encoding:
+  zstd, br (потрібні пакети zstandard і brotli) або gzip. Кешовані колекції
+  зберігають стиснені варіанти в кеші (crud.compressed_entry), тож при
+  влученні тіло не стискається вдруге.
+- Ключі об'єктів сортуються за налаштуванням sort_keys провайдера Flask
+  (за замовчуванням так) — однаково з orjson і без нього.
+"""
+import gzip
+import json
+import os
+from datetime import date, time
+from decimal import Decimal
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.datastructures import Accept
+from werkzeug.http import http_date, parse_accept_header
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# orjson сам кодує дати в ISO 8601; PASSTHROUGH передає їх у _default
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME if orjson is not None else 0
+
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+COMPRESSIBLE = ("application/json", "application/msgpack", "application/x-ndjson", "text/plain", "text/html")
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, time):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON-провайдер Flask на orjson; без нього — стандартний json з тими ж правилами."""
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return dump_bytes(obj, kwargs.get("sort_keys", self.sort_keys)).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dump_bytes(obj, self.sort_keys), mimetype=self.mimetype)
+
+
+def dump_bytes(obj, sort_keys=True):
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+    return json.dumps(obj, default=_default, ensure_ascii=False, sort_keys=sort_keys,
+                      separators=(",", ":")).encode()
+
+
+def columnar(result, fields):
+    """Колекцію (список рядків або сторінку з items) перетворює на columns + rows."""
+    items = result["items"] if isinstance(result, dict) else result
+    shaped = {"columns": fields, "rows": [[row[f] for f in fields] for row in items]}
+    if isinstance(result, dict):
+        shaped["next_cursor"] = result["next_cursor"]
+    return shaped
+
+
+def negotiate(accept):
+    """Формат відповіді з заголовка Accept: MSGPACK, якщо клієнт його просить і є пакет msgpack."""
+    if msgpack is None:
+        return JSON
+    return JSON if accept.best_match([JSON, MSGPACK, "application/x-msgpack"], JSON) == JSON else MSGPACK
+
+
+def encode_collection(result, fields, args, accept, sort_keys=True):
+    """
+    Тіло відповіді для колекції з урахуванням shape= і Accept. Повертає (bytes, mimetype).
+    sort_keys — налаштування JSON-провайдера застосунку (app.json.sort_keys).
+    """
+    if args.get("shape") == "columns":
+        result = columnar(result, fields)
+    mimetype = negotiate(accept)
+    if mimetype == MSGPACK:
+        return msgpack.packb(result, default=_default), MSGPACK
+    return dump_bytes(result, sort_keys), JSON
+
+
+def _gzip(body):
+    return gzip.compress(body, compresslevel=5, mtime=0)
+
+
+ENCODERS = {"gzip": _gzip}
+try:
+    import brotli
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=4)
+except ImportError:
+    pass
+try:
+    import zstandard
+    ENCODERS["zstd"] = lambda body: zstandard.ZstdCompressor(level=3).compress(body)
+except ImportError:
+    pass
+# Порядок переваги при однаковій вазі в Accept-Encoding
+PREFERENCE = [name for name in ("zstd", "br", "gzip") if name in ENCODERS]
+
+
+def choose_encoding(accept_encoding, mimetype=None):
+    """Content-Encoding, який прийме клієнт, або None; з mimetype — лише для форматів, які варто стискати."""
+    if not accept_encoding or (mimetype is not None and mimetype not in COMPRESSIBLE):
+        return None
+    accepted = parse_accept_header(accept_encoding, Accept)
+    encoding = accepted.best_match(PREFERENCE)
+    return encoding if encoding is not None and accepted.quality(encoding) > 0 else None
+
+
+def compress(body, mimetype, accept_encoding):
+    """(стиснуте тіло, Content-Encoding) або (body, None), якщо стискати не варто."""
+    if len(body) < COMPRESS_MIN_SIZE:
+        return body, None
+    encoding = choose_encoding(accept_encoding, mimetype)
+    if encoding is None:
+        return body, None
+    return ENCODERS[encoding](body), encoding
+
+
+def init_app(app):
+    app.json = FastJSONProvider(app)
+
+    @app.after_request
+    def compress_response(response):
+        response.vary.add("Accept-Encoding")
+        if (response.is_streamed or response.direct_passthrough or response.status_code < 200
+                or response.status_code in (204, 304) or "Content-Encoding" in response.headers):
+            return response
+        body, encoding = compress(response.get_data(), response.mimetype, request.headers.get("Accept-Encoding"))
+        if encoding is None:
+            return response
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        # Стиснуте тіло відрізняється від нестиснутого побайтно, але не за змістом
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,105 @@
+"""
+Заїзд і виїзд гостя.
+
+Кожна операція — одна коротка транзакція: бронювання і номер блокуються
+(SELECT ... FOR UPDATE) в тому ж порядку, що й при зміні бронювання через
+PUT, статуси змінюються разом, а оплата додається в тій самій транзакції.
+Дві стійки реєстрації не можуть одночасно поселити гостей в один номер
+чи двічі закрити одне бронювання.
+"""
+from datetime import date
+from decimal import Decimal
+
+import changefeed
+from db import get_connection
+from errors import ApiError
+
+# Статуси бронювання і номера до та після операції
+CHECK_IN = ("confirmed", "checked_in", "occupied")
+CHECK_OUT = ("checked_in", "completed", "available")
+
+
+class FrontDesk:
+    """bookings, rooms, payments — crud.Resource відповідних таблиць (для хуків після коміту)."""
+
+    def __init__(self, bookings, rooms, payments):
+        self.bookings = bookings
+        self.rooms = rooms
+        self.payments = payments
+        columns = bookings.table.columns
+        self._select_booking = f"SELECT {', '.join(columns)} FROM bookings WHERE booking_id=%s FOR UPDATE"
+
+    def check_in(self, booking_id, data):
+        """Бронювання → checked_in, номер → occupied; оплата, якщо передано amount."""
+        return self._run(booking_id, data, CHECK_IN, lambda booking, paid: data.get("amount"))
+
+    def check_out(self, booking_id, data):
+        """
+        Бронювання → completed, номер → available.
+
+        Без amount гість сплачує залишок за бронюванням (total_amount мінус
+        уже внесені оплати); amount=0 — виїзд без оплати.
+        """
+        return self._run(booking_id, data, CHECK_OUT,
+                         lambda booking, paid: data.get("amount", max(booking["total_amount"] - paid, 0)))
+
+    def _run(self, booking_id, data, transition, amount_due):
+        status_from, status_to, room_status = transition
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(self._select_booking, (booking_id,))
+        current = cur.fetchone()
+        if current is None:
+            raise ApiError(self.bookings.docs["not_found"], 404)
+        booking = dict(zip(self.bookings.table.columns, current))
+        booking["total_amount"] = Decimal(str(booking["total_amount"]))
+        if booking["booking_status"] != status_from:
+            raise ApiError(f"Бронювання має статус {booking['booking_status']}, очікується {status_from}", 409)
+
+        room_id = booking["room_id"]
+        cur.execute("SELECT room_status FROM rooms WHERE room_id=%s FOR UPDATE", (room_id,))
+        room = cur.fetchone()
+        if room is None:
+            raise ApiError("Номер не знайдено", 404)
+        if room_status == "occupied" and room[0] == "occupied":
+            raise ApiError("Номер ще зайнятий попереднім гостем", 409)
+
+        cur.execute("SELECT COALESCE(SUM(amount), 0) FROM payments WHERE booking_id=%s", (booking_id,))
+        paid = Decimal(str(cur.fetchone()[0]))
+        payment = self._payment(booking, data, amount_due(booking, paid))
+        payment_id = None
+        if payment is not None:
+            cur.execute(self.payments.statement("insert", tuple(payment)), tuple(payment.values()))
+            payment_id = cur.lastrowid
+            self.payments.summary(cur, self.payments.where, (payment_id,))
+            changefeed.record(cur, "payments", "insert", [payment_id])
+            paid += payment["amount"]
+
+        # Заповненість в analytics рахується для всіх нескасованих бронювань,
+        # тож зміна статусу на checked_in чи completed її не змінює
+        cur.execute("UPDATE bookings SET booking_status=%s WHERE booking_id=%s", (status_to, booking_id))
+        cur.execute("UPDATE rooms SET room_status=%s WHERE room_id=%s", (room_status, room_id))
+        changefeed.record(cur, "bookings", "update", [booking_id])
+        conn.commit()
+        cur.close()
+        conn.close()
+
+        booking["booking_status"] = status_to
+        self.bookings.written("update", booking_id, booking)
+        self.rooms.written("update", room_id, {"room_status": room_status})
+        if payment is not None:
+            self.payments.written("insert", payment_id, payment)
+        return {"booking_id": booking_id, "booking_status": status_to, "room_id": room_id,
+                "room_status": room_status, "payment_id": payment_id,
+                "balance": booking["total_amount"] - paid}
+
+    def _payment(self, booking, data, amount):
+        if amount in (None, ""):
+            return None
+        row = self.payments.table.coerce({
+            "client_id": booking["client_id"], "booking_id": booking["booking_id"],
+            "payment_date": data.get("payment_date") or date.today().isoformat(), "amount": amount,
+            "payment_method": data.get("payment_method") or "card"})
+        if row["amount"] < 0:
+            raise ApiError("Сума оплати не може бути від'ємною")
+        return row if row["amount"] > 0 else None
@@ -0,0 +1,112 @@
+import hashlib
+import os
+
+from flask import Response, g, jsonify, request
+
+from cache import CACHE_BACKEND, create_backend
+
+# Скільки зберігати відповіді на POST з заголовком Idempotency-Key
+IDEMPOTENCY_TTL = float(os.environ.get("IDEMPOTENCY_TTL", 86400))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get("IDEMPOTENCY_MAX_KEYS", 10000))
+# Скільки може тривати перший запит, поки повтори отримують 409
+IDEMPOTENCY_LOCK_TTL = float(os.environ.get("IDEMPOTENCY_LOCK_TTL", 60))
+MAX_KEY_LENGTH = 255
+
+HEADER = "Idempotency-Key"
+
+
+class IdempotencyStore:
+    """
+    Збережені відповіді на POST-запити за ключем Idempotency-Key.
+
+    Перший запит із ключем займає його записом "pending"; після відповіді
+    там зберігаються статус і тіло. Повтор з тим самим ключем і тілом
+    отримує збережену відповідь без звернення до бази, з іншим тілом — 422,
+    а поки перший ще обробляється — 409.
+    """
+
+    def __init__(self, backend, ttl=IDEMPOTENCY_TTL, lock_ttl=IDEMPOTENCY_LOCK_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+
+    def claim(self, key, fingerprint):
+        """None, якщо ключ зайнято цим запитом, інакше збережене значення."""
+        if self.backend.add(key, b"pending\n" + fingerprint.encode(), self.lock_ttl):
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            # Запис щойно застарів або був витіснений — пробуємо ще раз
+            return self.claim(key, fingerprint)
+        state, _, rest = value.partition(b"\n")
+        stored_fingerprint, _, rest = rest.partition(b"\n")
+        if stored_fingerprint.decode() != fingerprint:
+            return "mismatch"
+        if state == b"pending":
+            return "pending"
+        status, _, rest = rest.partition(b"\n")
+        mimetype, _, body = rest.partition(b"\n")
+        return int(status), mimetype.decode(), body
+
+    def save(self, key, fingerprint, status, mimetype, body):
+        header = f"done\n{fingerprint}\n{status}\n{mimetype}\n".encode()
+        self.backend.set(key, header + body, self.ttl)
+
+    def release(self, key):
+        self.backend.delete(key)
+
+
+def _fingerprint():
+    digest = hashlib.sha1()
+    digest.update(request.full_path.encode())
+    digest.update(b"\n")
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def init_app(app):
+    @app.before_request
+    def replay():
+        key = request.headers.get(HEADER)
+        if request.method != "POST" or not key:
+            return None
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({"message": f"{HEADER} довший за {MAX_KEY_LENGTH} символів"}), 400
+        storage_key = f"idem:{request.path}:{key}"
+        fingerprint = _fingerprint()
+        stored = idempotency_store.claim(storage_key, fingerprint)
+        if stored is None:
+            g.idempotency = (storage_key, fingerprint)
+            return None
+        if stored == "mismatch":
+            return jsonify({"message": f"{HEADER} уже використано з іншим тілом запиту"}), 422
+        if stored == "pending":
+            return jsonify({"message": "Запит з цим ключем ще обробляється"}), 409
+        status, mimetype, body = stored
+        response = Response(body, status=status, mimetype=mimetype)
+        response.headers["Idempotent-Replayed"] = "true"
+        return response
+
+    @app.after_request
+    def remember(response):
+        claimed = g.pop("idempotency", None)
+        if claimed is None:
+            return response
+        storage_key, fingerprint = claimed
+        # Після 5xx клієнт має змогу повторити запит по-справжньому; потокову
+        # відповідь (імпорт CSV) не можна зберегти, не прочитавши її тут
+        if response.status_code >= 500 or response.is_streamed:
+            idempotency_store.release(storage_key)
+        else:
+            idempotency_store.save(storage_key, fingerprint, response.status_code, response.mimetype,
+                                   response.get_data())
+        return response
+
+    @app.teardown_request
+    def release(exc=None):
+        claimed = g.pop("idempotency", None)
+        if claimed is not None:
+            idempotency_store.release(claimed[0])
+
+
+idempotency_store = IdempotencyStore(create_backend(CACHE_BACKEND, IDEMPOTENCY_MAX_KEYS))
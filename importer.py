@@ -0,0 +1,259 @@
+"""
+Потоковий імпорт CSV: `POST /<таблиця>/import` або
+`python importer.py <таблиця> <файл.csv>`.
+
+Перший рядок файлу — назви колонок таблиці (як у course_work.sql).
+Файл читається частинами по IMPORT_CHUNK_SIZE рядків і ніколи не
+тримається в пам'яті цілим: кожна частина перевіряється за schema.TABLES
+і вставляється одним багаторядковим INSERT в окремій транзакції разом з
+оновленням аналітики й журналу змін. Некоректні рядки пропускаються й
+повертаються з номером рядка файлу і причиною. Якщо ж відкочується вся частина
+(помилка бази, зіпсований файл), імпорт зупиняється подією з "error" —
+попередні частини лишаються збереженими.
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from flasgger import swag_from
+from flask import Response, request, stream_with_context
+
+import changefeed
+from crud import int_arg
+from db import DatabaseError, get_connection
+from errors import ApiError
+
+CHUNK_SIZE = int(os.environ.get("IMPORT_CHUNK_SIZE", 1000))
+MAX_CHUNK_SIZE = 10000
+
+logger = logging.getLogger(__name__)
+
+
+class CsvImport:
+    """
+    Імпорт одного CSV-потоку в таблицю resource (crud.Resource).
+
+    Обчислювані колонки (наприклад, total_amount бронювання) беруться з файлу,
+    якщо вони там є, — для історичних даних, — і рахуються сервером, якщо ні.
+    Для таблиць з check (бронювання) кожен рядок перевіряється й вставляється
+    окремо під SAVEPOINT, щоб перевірка бачила рядки, вставлені перед ним.
+    """
+
+    def __init__(self, resource, stream, chunk_size=CHUNK_SIZE):
+        self.resource = resource
+        self.table = table = resource.table
+        self.chunk_size = chunk_size
+        # utf-8-sig — файли з Excel починаються з BOM
+        self.reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+        try:
+            # Перше читання декодує цілий буфер, тож зіпсоване кодування невеликого
+            # файлу виявляється вже тут
+            header = self.reader.fieldnames
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise ApiError(f"Некоректний CSV-файл: {e}")
+        if not header:
+            raise ApiError("Порожній файл: очікується рядок з назвами колонок")
+        unknown = [c for c in header if c not in table.writable]
+        if unknown:
+            raise ApiError(f"Невідомі колонки: {', '.join(unknown)}")
+        missing = [c for c in table.required if c not in header]
+        if missing:
+            raise ApiError(f"Відсутні колонки: {', '.join(missing)}")
+        self.given_computed = [c for c in table.computed if c in header]
+        self.columns = tuple(table.writable)
+        self.processed = self.inserted = self.rejected = 0
+
+    def prepare(self, data):
+        """Рядок CSV → рядок таблиці з перетвореними значеннями."""
+        if None in data:
+            raise ApiError("Значень більше, ніж колонок")
+        row = self.table.coerce(data)
+        given = {c: self.table.convert(c, data[c]) for c in self.given_computed if data[c] not in (None, "")}
+        if len(given) < len(self.table.computed):
+            self.resource.complete(row)
+        row.update(given)
+        return row
+
+    def run(self):
+        """
+        Генератор повідомлень про прогрес: одне після кожної частини і підсумок
+        з "done": true. Якщо частину не вдалося зберегти, останнім іде повідомлення
+        з "done": false, "error" і "line" — першим рядком файлу, який не імпортовано.
+        """
+        started = time.perf_counter()
+        chunk = []
+        try:
+            for data in self.reader:
+                chunk.append((self.reader.line_num, data))
+                if len(chunk) >= self.chunk_size:
+                    yield self.load(chunk)
+                    chunk = []
+            if chunk:
+                yield self.load(chunk)
+        except Exception as e:
+            if isinstance(e, ApiError):
+                message = e.message
+            elif isinstance(e, (DatabaseError, csv.Error, UnicodeDecodeError)):
+                message = str(e)
+            else:
+                logger.exception("Помилка імпорту в %s", self.table.name)
+                message = "Внутрішня помилка сервера"
+            yield {"done": False, "error": message, "line": chunk[0][0] if chunk else self.reader.line_num,
+                   **self.totals(started)}
+            return
+        yield {"done": True, **self.totals(started)}
+
+    def totals(self, started):
+        return {"processed": self.processed, "inserted": self.inserted, "rejected": self.rejected,
+                "seconds": round(time.perf_counter() - started, 3)}
+
+    def load(self, chunk):
+        errors = []
+        rows = []
+        for line, data in chunk:
+            try:
+                rows.append((line, self.prepare(data)))
+            except ApiError as e:
+                errors.append({"line": line, "message": e.message})
+
+        resource = self.resource
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            if resource.check is None:
+                values = [tuple(row.get(c) for c in self.columns) for _, row in rows]
+                ids, failures = resource.insert_many(cur, self.columns, values)
+                errors.extend({"line": rows[i][0], "message": message} for i, message in failures.items())
+            else:
+                ids = [self.insert_checked(cur, line, row, errors) for line, row in rows]
+            ids = [id for id in ids if id is not None]
+            if ids and resource.summary is not None:
+                resource.summary(cur, f"{self.table.pk} IN ({', '.join(['%s'] * len(ids))})", tuple(ids))
+            changefeed.record(cur, self.table.name, "insert", ids)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+        if ids:
+            resource.written("bulk", ids, None)
+
+        errors.sort(key=lambda e: e["line"])
+        self.processed += len(chunk)
+        self.inserted += len(ids)
+        self.rejected += len(errors)
+        return {"processed": self.processed, "inserted": self.inserted, "rejected": self.rejected,
+                "errors": errors}
+
+    def insert_checked(self, cur, line, row, errors):
+        cur.execute("SAVEPOINT import_row")
+        try:
+            self.resource.check(cur, None, row)
+            cur.execute(self.resource.statement("insert", tuple(row)), tuple(row.values()))
+            return cur.lastrowid
+        except (ApiError, DatabaseError) as e:
+            cur.execute("ROLLBACK TO SAVEPOINT import_row")
+            errors.append({"line": line, "message": e.message if isinstance(e, ApiError) else str(e)})
+            return None
+
+
+def upload_stream():
+    """Файл з multipart-поля file або тіло запиту з Content-Type text/csv."""
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("file")
+        if upload is None:
+            raise ApiError("Очікується файл у полі file")
+        # Flask закриває request.files одразу після повернення з view, ще до
+        # потокової відповіді, тож файл копіюється у власний тимчасовий файл на диску
+        stream = tempfile.TemporaryFile()
+        shutil.copyfileobj(upload.stream, stream)
+        stream.seek(0)
+        return stream
+    return request.stream
+
+
+def import_spec(resource):
+    table = resource.table
+    return {
+        "tags": [resource.tag], "summary": f"Імпорт CSV у {table.name}",
+        "description": "Перший рядок — назви колонок: " + ", ".join(table.writable) + ".\n"
+                       f"Обов'язкові: {', '.join(table.required)}. Файл обробляється частинами "
+                       f"по {CHUNK_SIZE} рядків; відповідь — NDJSON з прогресом після кожної частини\n"
+                       "і підсумком (done: true) наприкінці. errors — номери рядків файлу й причини відхилення.\n"
+                       "Якщо частину не вдалося зберегти, потік закінчується повідомленням з done: false,\n"
+                       "error і line — першим рядком, який не імпортовано (попередні частини збережено).",
+        "consumes": ["multipart/form-data", "text/csv"],
+        "produces": ["application/x-ndjson"],
+        "parameters": [{"name": "file", "in": "formData", "type": "file", "required": True},
+                       {"name": "chunk_size", "in": "query", "type": "integer", "required": False,
+                        "description": f"Рядків в одній транзакції ({CHUNK_SIZE}, не більше {MAX_CHUNK_SIZE})"}],
+        "responses": {200: {"description": "Потік повідомлень про прогрес"},
+                      400: {"description": "Некоректний заголовок файлу"}},
+    }
+
+
+def init_app(app, resources):
+    """Маршрути POST /<таблиця>/import для кожного resource."""
+    for resource in resources:
+        def view(resource=resource):
+            chunk_size = int_arg("chunk_size", CHUNK_SIZE, minimum=1, maximum=MAX_CHUNK_SIZE)
+            stream = upload_stream()
+            job = CsvImport(resource, stream, chunk_size)
+            lines = (app.json.dumps(event) + "\n" for event in job.run())
+            response = Response(stream_with_context(lines), mimetype="application/x-ndjson")
+            response.call_on_close(stream.close)
+            return response
+        view.__name__ = f"{resource.table.name}_import"
+        app.add_url_rule(f"/{resource.table.name}/import", view.__name__, swag_from(import_spec(resource))(view),
+                         methods=["POST"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Імпорт CSV у таблицю бази даних")
+    parser.add_argument("table", help="таблиця: clients, menuitems, bookings, ...")
+    parser.add_argument("file", help="CSV-файл з рядком назв колонок; - — стандартний вхід")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="рядків в одній транзакції")
+    parser.add_argument("--rejected", help="записати відхилені рядки (номер рядка і причина) у цей файл")
+    args = parser.parse_args(argv)
+
+    from app import RESOURCES, app
+
+    resources = {resource.table.name: resource for resource in RESOURCES}
+    if args.table not in resources:
+        parser.error(f"невідома таблиця {args.table}")
+    stream = sys.stdin.buffer if args.file == "-" else open(args.file, "rb")
+    rejected = open(args.rejected, "w", encoding="utf-8") if args.rejected else None
+    try:
+        with app.app_context():
+            try:
+                job = CsvImport(resources[args.table], stream, args.chunk_size)
+            except ApiError as e:
+                print(e.message, file=sys.stderr)
+                return 1
+            for event in job.run():
+                if rejected is not None:
+                    for error in event.get("errors", ()):
+                        rejected.write(json.dumps(error, ensure_ascii=False) + "\n")
+                print(f"оброблено {event['processed']}, додано {event['inserted']}, "
+                      f"відхилено {event['rejected']}", file=sys.stderr)
+                if "error" in event:
+                    print(f"імпорт зупинено на рядку {event['line']}: {event['error']}", file=sys.stderr)
+                    return 1
+    finally:
+        stream.close()
+        if rejected is not None:
+            rejected.close()
+    return 0 if job.rejected == 0 else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,244 @@
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, has_request_context, request
+
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "0") == "1"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    """Гістограма у форматі Prometheus: лічильники по кошиках, сума і кількість."""
+
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            i = bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            items = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in items]
+        for label_values, (counts, total, count) in items:
+            labels = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="+Inf"}} {count}')
+            lines.append(f"{_series(self.name + '_sum', labels)} {total}")
+            lines.append(f"{_series(self.name + '_count', labels)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{_series(self.name, _labels(self.labels, label_values))} {value}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{_series(self.name, _labels(self.labels, label_values))} {value}")
+        return lines
+
+
+def _labels(names, values):
+    return ",".join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+
+
+def _series(name, labels):
+    return f"{name}{{{labels}}}" if labels else name
+
+
+request_latency = Histogram("http_request_duration_seconds", "Час обробки запиту",
+                            ("endpoint", "method", "status"), LATENCY_BUCKETS)
+response_size = Histogram("http_response_size_bytes", "Розмір тіла відповіді",
+                          ("endpoint", "method"), SIZE_BUCKETS)
+query_latency = Histogram("db_query_duration_seconds", "Час виконання SQL-запиту",
+                          ("statement",), LATENCY_BUCKETS)
+query_rows = Counter("db_query_rows_total", "Кількість прочитаних або змінених рядків", ("statement",))
+pool_acquire = Histogram("db_pool_acquire_seconds", "Час очікування з'єднання з пулу", (), LATENCY_BUCKETS)
+startup = Gauge("process_startup_seconds", "Тривалість етапів холодного старту процесу", ("phase",))
+
+REGISTRY = [request_latency, response_size, query_latency, query_rows, pool_acquire, startup]
+
+_STATEMENT_RE = re.compile(r"^\s*(\w+)(?:.*?\b(?:FROM|INTO|UPDATE)\s+`?(\w+))?", re.IGNORECASE | re.DOTALL)
+
+
+def statement_label(sql):
+    """Коротка мітка запиту ("SELECT clients"), щоб кількість серій не росла з кожним SQL."""
+    match = _STATEMENT_RE.match(sql)
+    if match is None:
+        return "OTHER"
+    verb, table = match.group(1).upper(), match.group(2)
+    if verb == "UPDATE":
+        table = sql.split()[1]
+    return f"{verb} {table.lower()}" if table else verb
+
+
+def _request_stats():
+    if not has_request_context():
+        return None
+    stats = g.get("db_stats")
+    if stats is None:
+        stats = g.db_stats = {"queries": 0, "db": 0.0, "acquire": 0.0}
+    return stats
+
+
+def observe_query(sql, seconds):
+    label = statement_label(sql)
+    query_latency.observe(seconds, label)
+    stats = _request_stats()
+    if stats is not None:
+        stats["queries"] += 1
+        stats["db"] += seconds
+    return label
+
+
+def observe_rows(label, rows):
+    if rows > 0:
+        query_rows.inc(rows, label)
+
+
+def observe_acquire(seconds):
+    pool_acquire.observe(seconds)
+    stats = _request_stats()
+    if stats is not None:
+        stats["acquire"] += seconds
+
+
+class TimedCursor:
+    """
+    Обгортка курсора, яка міряє час кожного запиту і рахує рядки.
+
+    connection — з'єднання пулу, з якого взято курсор (для db.PooledConnection.before_commit).
+    """
+
+    def __init__(self, cursor, connection=None):
+        self._cursor = cursor
+        self._label = None
+        self.connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            observe_rows(self._label, 1)
+            yield row
+
+    def execute(self, sql, params=()):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, params)
+        finally:
+            self._label = observe_query(sql, time.perf_counter() - started)
+            if sql.lstrip()[:6].upper() != "SELECT":
+                observe_rows(self._label, max(self._cursor.rowcount or 0, 0))
+
+    def executemany(self, sql, seq_params):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seq_params)
+        finally:
+            self._label = observe_query(sql, time.perf_counter() - started)
+            observe_rows(self._label, max(self._cursor.rowcount or 0, 0))
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            observe_rows(self._label, 1)
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._cursor.fetchmany(size)
+        observe_rows(self._label, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        observe_rows(self._label, len(rows))
+        return rows
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def init_app(app):
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop("request_started", None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        request_latency.observe(elapsed, endpoint, request.method, response.status_code)
+        if not response.is_streamed:
+            response_size.observe(response.calculate_content_length() or 0, endpoint, request.method)
+
+        if SERVER_TIMING:
+            stats = g.get("db_stats") or {"queries": 0, "db": 0.0, "acquire": 0.0}
+            response.headers["Server-Timing"] = (
+                f'app;dur={elapsed * 1000:.2f}, '
+                f'db;dur={stats["db"] * 1000:.2f};desc="{stats["queries"]} queries", '
+                f'pool;dur={stats["acquire"] * 1000:.2f}')
+        return response
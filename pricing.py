@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+from decimal import Decimal
+
+from availability import to_date
+from errors import ApiError
+
+# Як часто перечитувати ціни з бази (зміни з інших процесів)
+INDEX_MAX_AGE = float(os.environ.get("PRICE_INDEX_MAX_AGE", 60))
+
+CENT = Decimal("0.01")
+
+
+def _money(value):
+    return Decimal(str(value)).quantize(CENT)
+
+
+class PriceIndex:
+    """
+    Ціни страв і номерів у пам'яті процесу.
+
+    Сервер сам рахує price і total_amount замовлення та total_amount
+    бронювання, тож клієнту достатньо передати id і кількість. Після змін
+    меню чи номерів через API індекс оновлюється одразу (written), зміни з
+    інших процесів підхоплюються не пізніше ніж за PRICE_INDEX_MAX_AGE секунд.
+    """
+
+    def __init__(self, connect, max_age=INDEX_MAX_AGE):
+        self._connect = connect
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._prices = {"dish": {}, "room": {}}
+        self._loaded_at = None
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _load(self):
+        conn = self._connect()
+        cur = conn.cursor()
+        cur.execute("SELECT dish_id, price FROM menuitems")
+        dishes = {dish_id: _money(price) for dish_id, price in cur.fetchall()}
+        cur.execute("SELECT room_id, price FROM rooms")
+        rooms = {room_id: _money(price) for room_id, price in cur.fetchall()}
+        cur.close()
+        conn.close()
+        self._prices = {"dish": dishes, "room": rooms}
+        self._loaded_at = time.monotonic()
+
+    def price(self, kind, id):
+        """Ціна страви (kind="dish") або номера за ніч (kind="room"); None, якщо такого немає."""
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self._max_age:
+                self._load()
+            price = self._prices[kind].get(id)
+            if price is None and time.monotonic() - self._loaded_at > 1:
+                # Можливо, запис щойно додано в іншому процесі
+                self._load()
+                price = self._prices[kind].get(id)
+            return price
+
+    def written(self, kind, op, id, row):
+        """Оновлює індекс після зміни страви чи номера (аргументи як у Resource.on_write)."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            if op == "bulk":
+                self._loaded_at = None
+            elif op == "delete":
+                self._prices[kind].pop(id, None)
+            elif row.get("price") is not None:
+                self._prices[kind][id] = _money(row["price"])
+
+    def price_order(self, row, changes):
+        """
+        price — ціна страви на момент замовлення, total_amount — price × quantity.
+
+        При зміні лише кількості ціна замовлення не перераховується за новим меню.
+        """
+        if "dish_id" not in changes and "quantity" not in changes:
+            return {}
+        if "dish_id" in changes or row.get("price") is None:
+            price = self.price("dish", row["dish_id"])
+            if price is None:
+                raise ApiError("Страву не знайдено", 404)
+        else:
+            price = _money(row["price"])
+        quantity = row.get("quantity")
+        if quantity is None or quantity < 1:
+            raise ApiError("Кількість має бути не менше 1")
+        return {"price": price, "total_amount": price * quantity}
+
+    def price_booking(self, row, changes):
+        """total_amount бронювання — кількість ночей × ціна номера."""
+        if not {"room_id", "check_in", "check_out"} & set(changes):
+            return {}
+        price = self.price("room", row["room_id"])
+        if price is None:
+            raise ApiError("Номер не знайдено", 404)
+        nights = (to_date(row["check_out"]) - to_date(row["check_in"])).days
+        if nights < 1:
+            raise ApiError("Дата виїзду має бути пізніше дати заїзду")
+        return {"total_amount": price * nights}
@@ -0,0 +1,106 @@
+import base64
+import json
+from datetime import date
+from decimal import Decimal
+
+from errors import ApiError
+from schema import TABLES
+
+# Параметри, які не є фільтрами
+RESERVED_ARGS = {"limit", "after_id", "cursor", "fields", "stream", "format", "sort", "shape"}
+
+OPERATORS = {"eq": "=", "ne": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "in": "IN"}
+MAX_IN_VALUES = 100
+
+
+# Колонки, за якими дозволено фільтрувати й сортувати, та їхні типи.
+# Для кожної є індекс у course_work.sql.
+FILTERS = {name: {column: table.columns[column] for column in table.filters}
+           for name, table in TABLES.items()}
+
+
+def _convert(table, column, value):
+    return TABLES[table].convert(column, value)
+
+
+def compile_filters(table, args):
+    """
+    Перетворює параметри запиту на умови WHERE з плейсхолдерами.
+
+    Формат: column=value, column__op=value, де op — eq, ne, gt, gte, lt, lte
+    або in (значення через кому). Повертає (список умов, список параметрів).
+    """
+    clauses = []
+    params = []
+    for name, values in args.lists():
+        if name in RESERVED_ARGS:
+            continue
+        column, _, op = name.partition("__")
+        op = op or "eq"
+        if column not in FILTERS[table] or op not in OPERATORS:
+            raise ApiError(f"Невідомий фільтр: {name}")
+        for value in values:
+            if op == "in":
+                items = [v for v in value.split(",") if v != ""]
+                if not items or len(items) > MAX_IN_VALUES:
+                    raise ApiError(f"{name}: від 1 до {MAX_IN_VALUES} значень")
+                clauses.append(f"{column} IN ({', '.join(['%s'] * len(items))})")
+                params.extend(_convert(table, column, v) for v in items)
+            else:
+                clauses.append(f"{column} {OPERATORS[op]} %s")
+                params.append(_convert(table, column, value))
+    return clauses, params
+
+
+def parse_sort(table, pk, args):
+    """sort=column або sort=-column (за спаданням). Повертає (column, descending)."""
+    sort = args.get("sort", "")
+    descending = sort.startswith("-")
+    column = sort.lstrip("-") or pk
+    if column != pk and column not in FILTERS[table]:
+        raise ApiError(f"Сортування за {column} не підтримується")
+    return column, descending
+
+
+def order_by(column, pk, descending):
+    direction = " DESC" if descending else ""
+    if column == pk:
+        return f"{pk}{direction}"
+    return f"{column}{direction}, {pk}{direction}"
+
+
+def keyset_clause(column, pk, descending, after):
+    """
+    Умова "після рядка after" для keyset-пагінації з порядком order_by().
+
+    MySQL і SQLite ставлять NULL перед усіма значеннями, тож за зростанням
+    рядки з NULL ідуть першими, а за спаданням — останніми.
+    """
+    sign = "<" if descending else ">"
+    if column == pk:
+        return f"{pk} {sign} %s", [after[1]]
+    value, pk_value = after
+    if value is None:
+        if descending:
+            return f"({column} IS NULL AND {pk} < %s)", [pk_value]
+        return f"(({column} IS NULL AND {pk} > %s) OR {column} IS NOT NULL)", [pk_value]
+    clause = f"{column} {sign} %s OR ({column} = %s AND {pk} {sign} %s)"
+    if descending:
+        clause += f" OR {column} IS NULL"
+    return f"({clause})", [value, value, pk_value]
+
+
+def encode_cursor(value, pk_value):
+    if isinstance(value, (date, Decimal)):
+        value = str(value)
+    raw = json.dumps([value, pk_value]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(table, column, token):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        value, pk_value = json.loads(raw)
+        return None if value is None else _convert(table, column, value), int(pk_value)
+    except (ValueError, TypeError):
+        raise ApiError("Некоректний cursor")
@@ -0,0 +1,101 @@
+from decimal import Decimal, InvalidOperation
+
+from availability import to_date
+from errors import ApiError
+
+
+def choice(*values):
+    """Перетворювач для ENUM-колонок: пропускає лише дозволені значення."""
+    def convert(value):
+        if value not in values:
+            raise ValueError(value)
+        return value
+    convert.choices = values
+    return convert
+
+
+class Table:
+    """
+    Опис таблиці для CRUD-маршрутів.
+
+    columns — колонки з перетворювачами типів (порядок як у SELECT),
+    filters — колонки, за якими дозволено фільтрувати й сортувати (з індексами),
+    required — обов'язкові поля при створенні, examples — приклади для Swagger,
+    computed — колонки, які рахує сервер (значення з запиту ігноруються).
+    """
+
+    def __init__(self, name, pk, columns, filters, required, examples=None, computed=()):
+        self.name = name
+        self.pk = pk
+        self.columns = columns
+        self.filters = filters
+        self.required = required
+        self.writable = [c for c in columns if c != pk]
+        self.examples = examples or {}
+        self.computed = computed
+
+    def convert(self, column, value):
+        try:
+            return self.columns[column](value)
+        except (ValueError, TypeError, InvalidOperation):
+            raise ApiError(f"Некоректне значення для {column}: {value}")
+
+    def coerce(self, data, partial=False):
+        """
+        Перевіряє і перетворює поля запиту на значення для запису в базу.
+
+        Невідомі й обчислювані поля ігноруються, порожні необов'язкові стають NULL.
+        Без partial перевіряється наявність обов'язкових полів.
+        """
+        if not partial:
+            missing = [c for c in self.required if data.get(c) in (None, "")]
+            if missing:
+                raise ApiError(f"Відсутні поля: {', '.join(missing)}")
+        row = {}
+        for column in self.writable:
+            if column not in data or column in self.computed:
+                continue
+            value = data[column]
+            row[column] = None if value in (None, "") else self.convert(column, value)
+        return row
+
+
+TABLES = {table.name: table for table in (
+    Table("clients", "client_id",
+          {"client_id": int, "name": str, "surname": str, "phone": str, "email": str},
+          ["client_id", "surname", "phone", "email"],
+          ["name", "surname", "phone", "email"],
+          {"name": "Анастасія", "surname": "Мельник", "phone": "380501234567", "email": "test@example.com"}),
+    Table("bookings", "booking_id",
+          {"booking_id": int, "client_id": int, "room_id": int, "check_in": to_date, "check_out": to_date,
+           "total_amount": Decimal, "booking_status": choice("confirmed", "checked_in", "cancelled", "completed")},
+          ["booking_id", "client_id", "room_id", "check_in", "check_out", "total_amount", "booking_status"],
+          ["client_id", "room_id", "check_in", "check_out", "booking_status"],
+          {"client_id": 1, "room_id": 1, "check_in": "2025-11-20", "check_out": "2025-11-25",
+           "booking_status": "confirmed"},
+          computed=("total_amount",)),
+    Table("menuitems", "dish_id",
+          {"dish_id": int, "name": str, "category": str, "price": Decimal},
+          ["dish_id", "category", "price"],
+          ["name", "category", "price"],
+          {"name": "Салат Цезар", "category": "Салати", "price": 150}),
+    Table("orders", "order_id",
+          {"order_id": int, "client_id": int, "dish_id": int, "order_date": to_date, "quantity": int,
+           "price": Decimal, "total_amount": Decimal, "order_status": str},
+          ["order_id", "client_id", "dish_id", "order_date", "total_amount", "order_status"],
+          ["client_id", "dish_id", "order_date", "quantity", "order_status"],
+          {"client_id": 1, "dish_id": 1, "order_date": "2025-11-16", "quantity": 2, "order_status": "new"},
+          computed=("price", "total_amount")),
+    Table("payments", "payment_id",
+          {"payment_id": int, "client_id": int, "booking_id": int, "order_id": int, "payment_date": to_date,
+           "amount": Decimal, "payment_method": choice("cash", "card", "online")},
+          ["payment_id", "client_id", "booking_id", "order_id", "payment_date", "amount", "payment_method"],
+          ["client_id", "payment_date", "amount", "payment_method"],
+          {"client_id": 1, "booking_id": 1, "payment_date": "2025-11-16", "amount": 500,
+           "payment_method": "card"}),
+    Table("rooms", "room_id",
+          {"room_id": int, "room_number": int, "type": str, "price": Decimal, "room_status": str},
+          ["room_id", "room_number", "type", "price", "room_status"],
+          ["room_number", "type", "price", "room_status"],
+          {"room_number": 101, "type": "Single", "price": 500, "room_status": "available"}),
+)}
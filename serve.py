@@ -0,0 +1,250 @@
+"""
+Запуск у продакшені: `python serve.py`.
+
+Головний процес відкриває сокет і запускає SERVER_WORKERS робочих процесів
+(fork), які приймають з'єднання з цього сокета. Пули з'єднань з базою
+створюються вже в кожному процесі після fork.
+
+Сигнали головному процесу:
+- SIGHUP — плавне перезавантаження: запускаються нові процеси, і лише коли
+  вони готові, старі перестають приймати з'єднання й дообробляють поточні запити;
+- SIGTERM, SIGINT — плавна зупинка.
+
+Кожен процес повідомляє, скільки тривав його холодний старт (імпорт,
+прогрів, загалом); ці ж значення є в /metrics як process_startup_seconds.
+"""
+import json
+import os
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+SERVER_MODE = os.environ.get("SERVER_MODE", "sync")
+SERVER_HOST = os.environ.get("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("SERVER_PORT", 5000))
+WORKERS = int(os.environ.get("SERVER_WORKERS", os.cpu_count() or 1))
+# 1 — імпортувати застосунок і зібрати специфікацію Swagger один раз
+# у головному процесі до fork; 0 — у кожному процесі окремо (тоді SIGHUP
+# підхоплює нову версію коду)
+PRELOAD = os.environ.get("SERVER_PRELOAD", "1") == "1"
+GRACEFUL_TIMEOUT = float(os.environ.get("SERVER_GRACEFUL_TIMEOUT", 30))
+# Скільки з'єднань з базою відкрити в кожному процесі до початку роботи
+WARM_CONNECTIONS = int(os.environ.get("SERVER_WARM_CONNECTIONS", 1))
+
+
+def log(message):
+    print(f"[{os.getpid()}] {message}", file=sys.stderr, flush=True)
+
+
+def load_app():
+    """Імпортує застосунок і будує специфікацію Swagger. Повертає (app, секунди)."""
+    started = time.monotonic()
+    import apispec
+    import app as module
+    if not apispec.PRECOMPILED:
+        with module.app.test_request_context():
+            module.swagger.get_apispecs()
+    return module.app, time.monotonic() - started
+
+
+def warm_up():
+    """Прогрів, який має відбутися вже після fork: пул з'єднань з базою."""
+    import db
+    started = time.monotonic()
+    if WARM_CONNECTIONS > 0:
+        try:
+            db.get_pool().fill(WARM_CONNECTIONS)
+        except Exception as e:
+            log(f"не вдалося відкрити з'єднання з базою: {e}")
+    return time.monotonic() - started
+
+
+class TrackingHandler(WSGIRequestHandler):
+    """Рахує з'єднання в обробці, щоб процес при зупинці дочекався їх завершення."""
+
+    active = 0
+    lock = threading.Lock()
+
+    def handle(self):
+        with TrackingHandler.lock:
+            TrackingHandler.active += 1
+        try:
+            super().handle()
+        finally:
+            with TrackingHandler.lock:
+                TrackingHandler.active -= 1
+
+
+def run_worker(sock, ready_fd, preloaded, forked_at):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    import_seconds = 0.0
+    if preloaded is None:
+        preloaded, import_seconds = load_app()
+    warmup_seconds = warm_up()
+
+    import metrics
+    phases = {"import": import_seconds, "warmup": warmup_seconds, "total": time.monotonic() - forked_at}
+    for phase, seconds in phases.items():
+        metrics.startup.set(seconds, phase)
+    ready = json.dumps(phases).encode()
+
+    if SERVER_MODE == "async":
+        import uvicorn
+        server = uvicorn.Server(uvicorn.Config("asgi:app", lifespan="on", log_level="warning"))
+        os.write(ready_fd, ready)
+        os.close(ready_fd)
+        # uvicorn сам завершує поточні запити після SIGTERM
+        server.run(sockets=[sock])
+        return
+
+    server = make_server(SERVER_HOST, SERVER_PORT, preloaded, threaded=True,
+                         request_handler=TrackingHandler, fd=sock.fileno())
+
+    def stop(signum, frame):
+        # shutdown() чекає на вихід із serve_forever, тому з іншого потоку
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    os.write(ready_fd, ready)
+    os.close(ready_fd)
+    server.serve_forever()
+
+    deadline = time.monotonic() + GRACEFUL_TIMEOUT
+    while TrackingHandler.active and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if TrackingHandler.active:
+        log(f"зупинка з {TrackingHandler.active} незавершеними з'єднаннями")
+
+
+class Worker:
+    def __init__(self, pid, ready_fd, generation, forked_at):
+        self.pid = pid
+        self.ready_fd = ready_fd
+        self.generation = generation
+        self.forked_at = forked_at
+        self.ready = False
+        self.stopping = False
+
+
+class Master:
+    def __init__(self):
+        self.sock = socket.create_server((SERVER_HOST, SERVER_PORT), backlog=2048)
+        self.sock.set_inheritable(True)
+        self.preloaded = None
+        self.workers = {}
+        self.generation = 0
+        self.signals = []
+
+    def spawn(self):
+        read_fd, write_fd = os.pipe()
+        forked_at = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            code = 0
+            try:
+                run_worker(self.sock, write_fd, self.preloaded, forked_at)
+            except BaseException as e:
+                log(f"робочий процес завершився з помилкою: {e!r}")
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(write_fd)
+        self.workers[pid] = Worker(pid, read_fd, self.generation, forked_at)
+
+    def stop(self, worker):
+        if not worker.stopping:
+            worker.stopping = True
+            try:
+                os.kill(worker.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        if PRELOAD:
+            self.preloaded, seconds = load_app()
+            log(f"застосунок завантажено за {seconds * 1000:.0f} мс")
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: self.signals.append(signum))
+        for _ in range(WORKERS):
+            self.spawn()
+        log(f"слухає http://{SERVER_HOST}:{SERVER_PORT}, процесів: {WORKERS}, режим: {SERVER_MODE}")
+
+        while True:
+            while self.signals:
+                signum = self.signals.pop(0)
+                if signum == signal.SIGHUP:
+                    log("перезавантаження")
+                    self.generation += 1
+                    for _ in range(WORKERS):
+                        self.spawn()
+                else:
+                    log("зупинка")
+                    for worker in self.workers.values():
+                        self.stop(worker)
+                    self.shutdown()
+                    return
+            self.check_ready()
+            self.reap()
+
+    def check_ready(self):
+        pending = {w.ready_fd: w for w in self.workers.values() if not w.ready}
+        if not pending:
+            time.sleep(0.2)
+            return
+        readable, _, _ = select.select(list(pending), [], [], 0.2)
+        for fd in readable:
+            worker = pending[fd]
+            message = os.read(fd, 1024)
+            os.close(fd)
+            worker.ready = True
+            if not message:
+                continue
+            phases = json.loads(message)
+            log(f"процес {worker.pid} готовий за {phases['total'] * 1000:.0f} мс "
+                f"(імпорт {phases['import'] * 1000:.0f} мс, прогрів {phases['warmup'] * 1000:.0f} мс)")
+
+        # Старе покоління зупиняємо, коли все нове вже приймає з'єднання
+        current = [w for w in self.workers.values() if w.generation == self.generation]
+        if all(w.ready for w in current):
+            for worker in self.workers.values():
+                if worker.generation < self.generation:
+                    self.stop(worker)
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            if not worker.ready:
+                os.close(worker.ready_fd)
+            if not worker.stopping and worker.generation == self.generation:
+                log(f"процес {pid} несподівано завершився (код {os.waitstatus_to_exitcode(status)}), перезапуск")
+                time.sleep(1)
+                self.spawn()
+
+    def shutdown(self):
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for worker in self.workers.values():
+            os.kill(worker.pid, signal.SIGKILL)
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    Master().run()
@@ -0,0 +1,404 @@
+"""
+Сховища даних для db.py: MySQL і вбудований SQLite.
+
+Решта коду пише SQL у діалекті MySQL (параметри %s, FOR UPDATE,
+ON DUPLICATE KEY UPDATE) і працює з курсором у стилі mysql.connector
+(dictionary=True, lastrowid після executemany). SQLiteBackend перекладає
+запити й схему з course_work.sql на SQLite, тож застосунок, тести й
+benchmark.py можна запускати без сервера MySQL.
+"""
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "course_work.sql")
+
+
+class MySQLBackend:
+    name = "mysql"
+
+    def __init__(self, config):
+        import mysql.connector
+        self._connector = mysql.connector
+        self.config = config
+        self.Error = mysql.connector.Error
+
+    def connect(self):
+        return self._connector.connect(**self.config)
+
+
+# --- SQLite ---
+
+CENT = Decimal("0.01")
+
+
+def _money_columns(path):
+    """Колонки DECIMAL(p,2) з course_work.sql: грошові суми."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return frozenset(re.findall(r"^\s*(\w+)\s+DECIMAL\(\d+,\s*2\)", f.read(), re.IGNORECASE | re.MULTILINE))
+    except OSError:
+        return frozenset()
+
+
+# SQLite зберігає DECIMAL як REAL. Значення колонок перетворюються на Decimal
+# за типом колонки, а результати виразів (SUM, множення, UNION) — за списком
+# колонок, який translate() знаходить у SELECT
+MONEY_COLUMNS = _money_columns(SCHEMA_FILE)
+MONEY = "money"
+NUMBER = "number"
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+# Типи колонок після translate_schema(): DECIMAL(p,2) стає DECIMAL
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()[:10]))
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter("DECIMAL", lambda value: Decimal(value.decode()).quantize(CENT))
+
+_WRITE_VERBS = {"INSERT", "UPDATE", "DELETE", "REPLACE", "SAVEPOINT"}
+_FOR_UPDATE_RE = re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE)
+_UPSERT_RE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_VALUES_RE = re.compile(r"\bVALUES\((\w+)\)", re.IGNORECASE)
+_FK_CHECKS_RE = re.compile(r"^\s*SET\s+FOREIGN_KEY_CHECKS\s*=\s*(\d)\s*$", re.IGNORECASE)
+_AUTO_INCREMENT_RE = re.compile(r"^\s*ALTER\s+TABLE\s+(\w+)\s+AUTO_INCREMENT\s*=\s*\d+\s*$", re.IGNORECASE)
+_MONEY_RE = re.compile(r"\b(?:" + "|".join(sorted(MONEY_COLUMNS) or ["$^"]) + r")\b", re.IGNORECASE)
+_SUM_RE = re.compile(r"\bSUM\s*\(", re.IGNORECASE)
+_UNION_RE = re.compile(r"\bUNION(?:\s+ALL)?\b", re.IGNORECASE)
+_SELECT_RE = re.compile(r"\bSELECT(?:\s+DISTINCT)?\s", re.IGNORECASE)
+_FROM_RE = re.compile(r"\bFROM\b", re.IGNORECASE)
+_ALIAS_RE = re.compile(r"\s+AS\s+\S+\s*$", re.IGNORECASE)
+_ASSIGN_RE = re.compile(r"(\w+)\s*=\s*")
+
+
+def _mask(sql, nested=True):
+    """
+    Копія запиту тієї ж довжини, у якій рядкові літерали (і, якщо nested,
+    вміст дужок) замінено пробілами: ключові слова й коми в ній — лише верхнього рівня.
+    """
+    out, depth, quote = [], 0, None
+    for ch in sql:
+        if quote is not None:
+            out.append(" ")
+            if ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+            out.append(" ")
+        elif ch == "(":
+            depth += 1
+            out.append(" " if nested and depth > 1 else ch)
+        elif ch == ")":
+            depth -= 1
+            out.append(" " if nested and depth > 0 else ch)
+        else:
+            out.append(" " if nested and depth > 0 else ch)
+    return "".join(out)
+
+
+def _split(sql, masked, separator):
+    """Частини sql між входженнями separator у masked."""
+    parts, start = [], 0
+    for match in separator.finditer(masked):
+        parts.append((sql[start:match.start()], masked[start:match.start()]))
+        start = match.end()
+    parts.append((sql[start:], masked[start:]))
+    return parts
+
+
+def _column_kind(item):
+    expr = _ALIAS_RE.sub("", item).strip()
+    plain = _mask(expr, nested=False)
+    if _MONEY_RE.search(plain) and not plain.upper().startswith("COUNT"):
+        return MONEY
+    if _SUM_RE.search(plain):
+        # Як у MySQL: SUM цілих чисел повертає DECIMAL
+        return NUMBER
+    return None
+
+
+def result_kinds(sql):
+    """
+    Грошові (MONEY) і десяткові (NUMBER) колонки результату SELECT:
+    {позиція: тип}. Для UNION колонка грошова, якщо вона грошова в будь-якій частині.
+    """
+    masked = _mask(sql)
+    kinds = {}
+    for branch, masked_branch in _split(sql, masked, _UNION_RE):
+        select = _SELECT_RE.search(masked_branch)
+        if select is None:
+            continue
+        end = _FROM_RE.search(masked_branch, select.end())
+        end = end.start() if end else len(branch)
+        columns = _split(branch[select.end():end], masked_branch[select.end():end], re.compile(","))
+        for position, (item, masked_item) in enumerate(columns):
+            if masked_item.strip() == "*" or masked_item.strip().endswith(".*"):
+                # Після * позиції колонок невідомі; справжні колонки перетворюються за типом
+                break
+            kind = _column_kind(item)
+            if kind is not None and kinds.get(position) != MONEY:
+                kinds[position] = kind
+    return kinds
+
+
+def _money_sums(sql):
+    """SUM(...) від грошових виразів → MONEY_SUM(...): точна десяткова сума."""
+    plain = _mask(sql, nested=False)
+    for match in reversed(list(_SUM_RE.finditer(plain))):
+        depth = 0
+        for end in range(match.end() - 1, len(plain)):
+            depth += {"(": 1, ")": -1}.get(plain[end], 0)
+            if depth == 0:
+                break
+        if _MONEY_RE.search(plain, match.end(), end):
+            sql = sql[:match.start()] + "MONEY_" + sql[match.start():]
+    return sql
+
+
+def _round_money(assignments):
+    """c = вираз → c = ROUND(вираз, 2) для грошових колонок у SET після ON CONFLICT."""
+    masked = _mask(assignments)
+    parts = []
+    for item, _ in _split(assignments, masked, re.compile(",")):
+        match = _ASSIGN_RE.match(item.strip())
+        if match and match.group(1) in MONEY_COLUMNS:
+            item = f" {match.group(1)} = ROUND({item.strip()[match.end():]}, 2)"
+        parts.append(item)
+    return ",".join(parts)
+
+
+@lru_cache(maxsize=1024)
+def translate(sql):
+    """
+    Запит у діалекті MySQL → (запит SQLite, чи потрібне блокування на запис,
+    result_kinds() для SELECT).
+
+    FOR UPDATE прибирається: замість блокування рядків транзакція одразу
+    бере блокування бази на запис (BEGIN IMMEDIATE). Суми грошових колонок
+    рахуються точно (MONEY_SUM), а накопичення в зведених таблицях
+    (ON DUPLICATE KEY UPDATE) округлюється до копійки.
+    """
+    match = _FK_CHECKS_RE.match(sql)
+    if match:
+        return f"PRAGMA foreign_keys={'ON' if match.group(1) == '1' else 'OFF'}", False, {}
+    match = _AUTO_INCREMENT_RE.match(sql)
+    if match:
+        return f"DELETE FROM sqlite_sequence WHERE name = '{match.group(1)}' COLLATE NOCASE", True, {}
+
+    locking = _FOR_UPDATE_RE.search(sql) is not None
+    sql = _FOR_UPDATE_RE.sub("", sql).replace("%s", "?")
+    upsert = _UPSERT_RE.search(sql)
+    if upsert:
+        sql = (sql[:upsert.start()] + "ON CONFLICT DO UPDATE SET"
+               + _round_money(_VALUES_RE.sub(r"excluded.\1", sql[upsert.end():])))
+    verb = sql.lstrip().split(None, 1)[0].upper()
+    if verb != "SELECT":
+        return sql, locking or verb in _WRITE_VERBS, {}
+    return _money_sums(sql), locking, result_kinds(sql)
+
+
+def to_decimal(value, kind):
+    if value is None or kind is None:
+        return value
+    value = value if isinstance(value, Decimal) else Decimal(str(value))
+    return value.quantize(CENT) if kind == MONEY else value
+
+
+class MoneySum:
+    """Агрегат MONEY_SUM: сума в Decimal, кожен доданок — з точністю до копійки."""
+
+    def __init__(self):
+        self.total = None
+
+    def step(self, value):
+        if value is not None:
+            value = Decimal(str(value)).quantize(CENT)
+            self.total = value if self.total is None else self.total + value
+
+    def finalize(self):
+        if self.total is None:
+            return None
+        # sqlite3 не повертає Decimal; float з двома знаками після коми
+        # перетворюється назад у той самий Decimal через str()
+        return int(self.total) if self.total == self.total.to_integral_value() else float(self.total)
+
+
+_SCHEMA_RULES = [
+    (re.compile(r"^\s*(CREATE\s+DATABASE|USE)\b[^;]*;", re.IGNORECASE | re.MULTILINE), ""),
+    (re.compile(r"\bINT\s+(?:PRIMARY\s+KEY\s+AUTO_INCREMENT|AUTO_INCREMENT\s+PRIMARY\s+KEY)\b", re.IGNORECASE),
+     "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\b(\w+)\s+ENUM\(([^)]*)\)", re.IGNORECASE), r"\1 TEXT CHECK (\1 IN (\2))"),
+    (re.compile(r"\bDECIMAL\(\d+,\s*\d+\)", re.IGNORECASE), "DECIMAL"),
+]
+
+
+def translate_schema(script):
+    """Перекладає course_work.sql на SQLite. Повертає список окремих інструкцій."""
+    for pattern, replacement in _SCHEMA_RULES:
+        script = pattern.sub(replacement, script)
+    statements, current = [], ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            if current.strip():
+                statements.append(current.strip())
+            current = ""
+    return statements
+
+
+class SQLiteCursor:
+    """Курсор SQLite з інтерфейсом mysql.connector, який використовує застосунок."""
+
+    def __init__(self, conn, dictionary=False, buffered=True):
+        self._conn = conn
+        self._cursor = conn.raw.cursor()
+        self._dictionary = dictionary
+        self._lastrowid = None
+        self._kinds = {}
+
+    def _prepare(self, sql):
+        sql, locking, self._kinds = translate(sql)
+        if locking and not self._conn.raw.in_transaction:
+            self._conn.raw.execute("BEGIN IMMEDIATE")
+        return sql
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(self._prepare(sql), tuple(params or ()))
+        self._lastrowid = self._cursor.lastrowid
+
+    def executemany(self, sql, seq_params):
+        sql = self._prepare(sql)
+        self._cursor.executemany(sql, [tuple(params) for params in seq_params])
+        if sql.lstrip()[:6].upper() == "INSERT" and self._cursor.rowcount > 0:
+            # Як у MySQL: id першого рядка; в одній транзакції id ідуть підряд
+            last = self._conn.raw.execute("SELECT last_insert_rowid()").fetchone()[0]
+            self._lastrowid = last - self._cursor.rowcount + 1
+
+    def _row(self, row):
+        if row is None:
+            return row
+        if self._kinds:
+            row = tuple(to_decimal(value, self._kinds.get(i)) for i, value in enumerate(row))
+        if not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        for row in self._cursor:
+            yield self._row(row)
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self, dictionary=False, buffered=True):
+        return SQLiteCursor(self, dictionary, buffered)
+
+    @property
+    def in_transaction(self):
+        return self.raw.in_transaction
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def is_connected(self):
+        return True
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self.raw.execute("SELECT 1")
+
+    def close(self):
+        self.raw.close()
+
+
+class SQLiteBackend:
+    """
+    Вбудована база SQLite у режимі WAL: читачі не блокують запис і навпаки.
+
+    При першому підключенні до порожнього файлу створюється схема з
+    course_work.sql (разом з тестовими даними). Транзакції, що змінюють
+    дані, виконуються по одній (BEGIN IMMEDIATE), очікування — до timeout секунд.
+    """
+
+    name = "sqlite"
+    Error = sqlite3.Error
+
+    def __init__(self, path, schema_file=SCHEMA_FILE, timeout=30, statement_cache=512):
+        self.path = path
+        self.schema_file = schema_file
+        self.timeout = timeout
+        self.statement_cache = statement_cache
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def connect(self):
+        # isolation_level=None: транзакції відкриває SQLiteCursor, а не модуль sqlite3
+        raw = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                              detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False,
+                              cached_statements=self.statement_cache)
+        raw.execute("PRAGMA synchronous=NORMAL")
+        raw.execute("PRAGMA foreign_keys=ON")
+        raw.create_aggregate("MONEY_SUM", 1, MoneySum)
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    self._create_schema(raw)
+                    self._initialized = True
+        return SQLiteConnection(raw)
+
+    def _create_schema(self, raw):
+        raw.execute("PRAGMA journal_mode=WAL")
+        raw.execute("BEGIN IMMEDIATE")
+        try:
+            if raw.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='table'").fetchone()[0] == 0:
+                with open(self.schema_file, encoding="utf-8") as f:
+                    for statement in translate_schema(f.read()):
+                        raw.execute(statement)
+            raw.execute("COMMIT")
+        except BaseException:
+            raw.execute("ROLLBACK")
+            raise
+
+
+def create_backend(name, mysql_config, sqlite_path):
+    if name == "sqlite":
+        return SQLiteBackend(sqlite_path)
+    if name == "mysql":
+        return MySQLBackend(mysql_config)
+    raise ValueError(f"Невідоме сховище DB_BACKEND={name}")
@@ -0,0 +1,55 @@
+"""
+Тести запускаються на вбудованій базі SQLite (storage.py) з даними з
+course_work.sql; перед кожним тестом схема створюється заново.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ["DB_BACKEND"] = "sqlite"
+os.environ["DB_SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="coursework-tests-"), "coursework.sqlite")
+os.environ["DB_REPLICAS"] = ""
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["ORDERS_WRITE_BEHIND"] = "0"
+os.environ["CHANGE_FEED_RETENTION_DAYS"] = "0"
+
+
+def reset_database():
+    import db
+    import storage
+
+    raw = db.BACKEND.connect().raw
+    raw.execute("PRAGMA foreign_keys=OFF")
+    raw.execute("BEGIN IMMEDIATE")
+    tables = [name for (name,) in raw.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+    for name in tables:
+        raw.execute(f"DROP TABLE {name}")
+    with open(storage.SCHEMA_FILE, encoding="utf-8") as f:
+        for statement in storage.translate_schema(f.read()):
+            raw.execute(statement)
+    raw.execute("COMMIT")
+    raw.close()
+
+
+@pytest.fixture
+def app():
+    import app as application
+    from crud import response_cache
+
+    reset_database()
+    application.availability_index.invalidate()
+    application.price_index.invalidate()
+    for resource in application.RESOURCES:
+        response_cache.invalidate(resource.table.name)
+    return application.app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
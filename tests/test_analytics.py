@@ -0,0 +1,38 @@
+PERIOD = "date_from=2025-11-01&date_to=2025-11-30"
+
+
+def occupancy(client):
+    return {row["room_type"]: (row["rooms"], row["room_nights"])
+            for row in client.get(f"/analytics/occupancy?{PERIOD}").json}
+
+
+def rebuilt_occupancy(client):
+    client.post("/analytics/rebuild")
+    return occupancy(client)
+
+
+def test_room_type_change_moves_nights(client):
+    client.post("/analytics/rebuild")
+    assert client.put("/rooms/1", json={"type": "Suite"}).status_code == 200
+    assert occupancy(client) == rebuilt_occupancy(client)
+
+    assert client.delete("/bookings/1").status_code == 204
+    after = occupancy(client)
+    assert after == rebuilt_occupancy(client)
+    assert "Single" not in after
+
+
+def test_bulk_room_type_change_moves_nights(client):
+    client.post("/analytics/rebuild")
+    r = client.patch("/rooms/bulk", json={"filter": {"type": "Double"}, "set": {"type": "Single"}})
+    assert r.json["affected"] == 2
+    assert occupancy(client) == rebuilt_occupancy(client)
+
+
+def test_booking_changes_keep_summaries_consistent(client):
+    client.post("/analytics/rebuild")
+    client.put("/bookings/2", json={"check_out": "2025-11-28"})
+    client.post("/bookings", json={"client_id": 1, "room_id": 3, "check_in": "2025-11-24",
+                                   "check_out": "2025-11-26", "booking_status": "confirmed"})
+    client.delete("/bookings/4")
+    assert occupancy(client) == rebuilt_occupancy(client)
@@ -0,0 +1,65 @@
+import json
+import os
+import subprocess
+import sys
+
+import flasgger
+import pytest
+
+import apispec
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def precompile(app, tmp_path, monkeypatch):
+    """Вмикає SWAGGER_PRECOMPILED для app; обробник flasgger повертається після тесту."""
+    path = tmp_path / "apispec.json"
+    monkeypatch.setattr(apispec, "PRECOMPILED", True)
+    monkeypatch.setattr(apispec, "SPEC_FILE", str(path))
+    monkeypatch.setitem(app.view_functions, apispec.SPEC_ENDPOINT, app.view_functions[apispec.SPEC_ENDPOINT])
+    return path
+
+
+def test_precompiled_spec_matches_live(app, client, precompile, monkeypatch):
+    from app import swagger
+
+    live = client.get("/apispec_1.json")
+    assert live.status_code == 200
+    size = apispec.build(app, swagger, str(precompile))
+    assert size == precompile.stat().st_size
+    apispec.init_app(app)
+
+    def fail(self, *args, **kwargs):
+        pytest.fail("готова специфікація не повинна розбирати docstring-и")
+    monkeypatch.setattr(flasgger.Swagger, "get_apispecs", fail)
+    response = client.get("/apispec_1.json")
+    assert response.status_code == 200
+    assert response.get_data() == precompile.read_bytes()
+    assert json.loads(response.get_data()) == live.json
+    assert response.headers["Cache-Control"] == f"public, max-age={apispec.MAX_AGE}"
+
+    response = client.get("/apispec_1.json", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+
+
+def test_missing_file(app, precompile):
+    with pytest.raises(RuntimeError, match="python apispec.py"):
+        apispec.init_app(app)
+
+
+def test_disabled_keeps_flasgger_view(app, precompile, monkeypatch):
+    monkeypatch.setattr(apispec, "PRECOMPILED", False)
+    view = app.view_functions[apispec.SPEC_ENDPOINT]
+    apispec.init_app(app)
+    assert app.view_functions[apispec.SPEC_ENDPOINT] is view
+
+
+def test_cli_builds_from_docstrings(app, tmp_path):
+    # Навіть з SWAGGER_PRECOMPILED=1 в оточенні, коли файлу ще немає
+    path = tmp_path / "spec.json"
+    env = {**os.environ, "SWAGGER_PRECOMPILED": "1", "SWAGGER_SPEC_FILE": str(tmp_path / "missing.json")}
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "apispec.py"), str(path)], cwd=ROOT, env=env,
+                            capture_output=True, text=True, encoding="utf-8", timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(path.read_bytes())["paths"]
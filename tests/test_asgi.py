@@ -0,0 +1,68 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip("asgiref")
+
+
+def asgi_request(path, query="", headers=()):
+    """(статус, заголовки, тіло) відповіді асинхронного застосунку на GET."""
+    import asgi
+
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": query.encode(),
+             "headers": [(name.encode(), value.encode()) for name, value in headers]}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    response_headers = {name.decode(): value.decode() for name, value in messages[0]["headers"]}
+    return messages[0]["status"], response_headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+
+def asgi_get(path, query=""):
+    status, _, body = asgi_request(path, query)
+    return status, json.loads(body)
+
+
+def test_available_rooms_same_as_flask(client):
+    query = "check_in=2025-11-21&check_out=2025-11-23"
+    assert asgi_get("/rooms/available", query) == (200, client.get(f"/rooms/available?{query}").json)
+
+    client.post("/bookings", json={"client_id": 1, "room_id": 3, "check_in": "2025-11-23",
+                                   "check_out": "2025-11-24", "booking_status": "confirmed"})
+    query = "check_in=2025-11-23&check_out=2025-11-24&type=Suite"
+    status, rooms = asgi_get("/rooms/available", query)
+    assert (status, rooms) == (200, client.get(f"/rooms/available?{query}").json)
+    assert 3 not in {room["room_id"] for room in rooms}
+
+
+def test_available_rooms_validates_dates(client):
+    assert asgi_get("/rooms/available", "check_in=2025-11-23&check_out=2025-11-21")[0] == 400
+
+
+def test_cached_collection_is_compressed_once(client, monkeypatch):
+    import formats
+
+    calls = []
+    encode = formats.ENCODERS["gzip"]
+    monkeypatch.setitem(formats.ENCODERS, "gzip", lambda body: calls.append(body) or encode(body))
+    monkeypatch.setattr(formats, "COMPRESS_MIN_SIZE", 0)
+    _, plain_headers, plain = asgi_request("/menuitems")
+    assert plain == client.get("/menuitems").get_data()
+    for _ in range(2):
+        status, headers, body = asgi_request("/menuitems", headers=[("accept-encoding", "gzip")])
+        assert status == 200 and headers["content-encoding"] == "gzip"
+        assert gzip.decompress(body) == plain
+        assert headers["etag"] == f"W/{plain_headers['etag']}" and headers["content-length"] == str(len(body))
+    assert len(calls) == 1
+
+    status, headers, body = asgi_request("/menuitems", headers=[("accept-encoding", "gzip"),
+                                                               ("if-none-match", headers["etag"])])
+    assert (status, body) == (304, b"") and "content-encoding" not in headers
@@ -0,0 +1,86 @@
+from datetime import date
+
+import pytest
+
+from availability import AvailabilityIndex, RoomIntervals
+
+
+def d(day):
+    return date(2025, 11, day)
+
+
+@pytest.fixture
+def room():
+    intervals = RoomIntervals()
+    intervals.add(d(10), d(15), 1)
+    return intervals
+
+
+@pytest.mark.parametrize("check_in, check_out, free", [
+    (d(5), d(10), True),    # виїзд у день заїзду наступного гостя
+    (d(15), d(20), True),   # заїзд у день виїзду попереднього
+    (d(5), d(11), False),
+    (d(14), d(20), False),
+    (d(9), d(16), False),   # охоплює бронювання
+    (d(11), d(12), False),  # всередині бронювання
+    (d(10), d(15), False),  # ті самі дати
+    (d(1), d(2), True),
+    (d(20), d(21), True),
+])
+def test_boundaries(room, check_in, check_out, free):
+    assert room.is_free(check_in, check_out) is free
+
+
+def test_empty_room_is_free():
+    assert RoomIntervals().is_free(d(1), d(30))
+
+
+def test_long_earlier_booking_covers_later_gap():
+    intervals = RoomIntervals()
+    intervals.add(d(1), d(20), 1)
+    intervals.add(d(5), d(6), 2)
+    # Проміжок після 6-го зайнятий першим бронюванням, хоча останнє за заїздом закінчилося
+    assert not intervals.is_free(d(10), d(12))
+    assert intervals.is_free(d(20), d(22))
+
+
+def test_gap_between_bookings():
+    intervals = RoomIntervals()
+    intervals.add(d(15), d(18), 2)
+    intervals.add(d(1), d(5), 1)
+    assert intervals.is_free(d(5), d(15))
+    assert not intervals.is_free(d(4), d(15))
+    assert not intervals.is_free(d(5), d(16))
+
+
+def test_remove_frees_dates(room):
+    room.add(d(20), d(25), 2)
+    room.remove(1)
+    assert room.is_free(d(10), d(15))
+    assert not room.is_free(d(24), d(26))
+    room.remove(99)
+    assert room.starts == [d(20)]
+
+
+def test_same_check_in_twice():
+    intervals = RoomIntervals()
+    intervals.add(d(10), d(11), 1)
+    intervals.add(d(10), d(20), 2)
+    intervals.remove(2)
+    assert intervals.is_free(d(11), d(20))
+
+
+def test_index_loads_and_tracks_bookings(app):
+    from db import primary_connection
+
+    index = AvailabilityIndex(primary_connection)
+    # Бронювання 1: номер 1 з 2025-11-20 по 2025-11-25
+    free = {room["room_id"] for room in index.free_rooms(d(21), d(22))}
+    assert 1 not in free
+    assert 1 in {room["room_id"] for room in index.free_rooms(d(25), d(26))}
+
+    index.remove_booking(1)
+    assert 1 in {room["room_id"] for room in index.free_rooms(d(21), d(22))}
+    index.add_booking(10, 1, "2025-11-25", "2025-11-27")
+    assert 1 not in {room["room_id"] for room in index.free_rooms(d(26), d(27))}
+    assert {room["type"] for room in index.free_rooms(d(1), d(2), room_type="Suite")} == {"Suite"}
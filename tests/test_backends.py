@@ -0,0 +1,98 @@
+"""
+Однакові відповіді API на MySQL і SQLite.
+
+Сценарій виконується в окремому процесі для кожного сховища (DB_BACKEND
+читається при імпорті app). Для MySQL потрібна змінна TEST_MYSQL=1: база
+з course_work.sql створюється заново на сервері з DB_HOST/DB_USER/DB_PASSWORD.
+"""
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+REQUESTS = [
+    ("POST", "/payments", {"client_id": 3, "payment_date": "2030-01-01", "amount": "0.10", "payment_method": "card"}),
+    ("POST", "/payments", {"client_id": 3, "payment_date": "2030-01-01", "amount": "0.20", "payment_method": "card"}),
+    ("POST", "/orders", {"client_id": 3, "dish_id": 5, "order_date": "2030-01-01", "quantity": 3,
+                         "order_status": "new"}),
+    ("GET", "/clients/1/folio", None),
+    ("GET", "/clients/3/folio", None),
+    ("GET", "/analytics/revenue?date_from=2025-01-01&date_to=2030-12-31", None),
+    ("GET", "/analytics/revenue?date_from=2025-01-01&date_to=2030-12-31&group=method", None),
+    ("GET", "/analytics/dishes?date_from=2025-01-01&date_to=2030-12-31", None),
+    ("GET", "/analytics/occupancy?date_from=2025-11-01&date_to=2025-11-30", None),
+    ("GET", "/rooms?fields=room_id,price", None),
+]
+
+
+def reset_mysql():
+    import mysql.connector
+
+    import db
+
+    config = {key: value for key, value in db.DB_CONFIG.items() if key != "database"}
+    conn = mysql.connector.connect(**config)
+    cur = conn.cursor()
+    cur.execute(f"DROP DATABASE IF EXISTS {db.DB_CONFIG['database']}")
+    statement = ""
+    with open(os.path.join(ROOT, "course_work.sql"), encoding="utf-8") as f:
+        for line in f:
+            statement += line
+            if sqlite3.complete_statement(statement):
+                if statement.strip():
+                    cur.execute(statement)
+                statement = ""
+    conn.commit()
+    conn.close()
+
+
+def scenario():
+    sys.path.insert(0, ROOT)
+    if os.environ["DB_BACKEND"] == "mysql":
+        reset_mysql()
+    from app import app
+
+    client = app.test_client()
+    client.post("/analytics/rebuild")
+    responses = []
+    for method, url, body in REQUESTS:
+        response = client.open(url, method=method, json=body)
+        responses.append([method, url, response.status_code, response.get_json()])
+    return responses
+
+
+def run(backend, tmp_path):
+    env = {**os.environ, "DB_BACKEND": backend, "DB_SQLITE_PATH": str(tmp_path / f"{backend}.sqlite"),
+           "DB_REPLICAS": "", "CACHE_BACKEND": "memory", "ORDERS_WRITE_BEHIND": "0"}
+    result = subprocess.run([sys.executable, __file__], env=env, capture_output=True, text=True, cwd=ROOT)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+def test_sqlite_money_wire_format(tmp_path):
+    responses = {url: body for _, url, _, body in run("sqlite", tmp_path)}
+    folio = responses["/clients/1/folio"]
+    assert {(o["price"], o["line_total"]) for o in folio["orders"]} == {("70.00", "70.00"), ("250.00", "500.00")}
+    assert folio["total_charged"] == "3070.00" and folio["balance"] == "0.00"
+    assert responses["/clients/3/folio"]["payments"][-2:][0]["amount"] == "0.10"
+
+    revenue = responses["/analytics/revenue?date_from=2025-01-01&date_to=2030-12-31"]
+    assert revenue[-1] == {"day": "Tue, 01 Jan 2030 00:00:00 GMT", "amount": "0.30", "payments": "2"}
+    dishes = responses["/analytics/dishes?date_from=2025-01-01&date_to=2030-12-31"]
+    drinks = next(category for category in dishes if category["category"] == "Напої")
+    assert drinks["revenue"] == "435.00"
+
+
+@pytest.mark.skipif(os.environ.get("TEST_MYSQL") != "1", reason="потрібен сервер MySQL (TEST_MYSQL=1)")
+def test_backends_return_same_responses(tmp_path):
+    assert run("sqlite", tmp_path) == run("mysql", tmp_path)
+
+
+if __name__ == "__main__":
+    print(json.dumps(scenario()))
@@ -0,0 +1,64 @@
+BOOKING = {"client_id": 2, "room_id": 1, "booking_status": "confirmed"}
+
+
+def booking(check_in, check_out, **fields):
+    return {**BOOKING, "check_in": check_in, "check_out": check_out, **fields}
+
+
+def room_bookings(client, room_id):
+    return [b for b in client.get("/bookings").json if b["room_id"] == room_id]
+
+
+def test_create_rejects_overlap(client):
+    # Бронювання 1: номер 1 з 2025-11-20 по 2025-11-25
+    r = client.post("/bookings", json=booking("2025-11-24", "2025-11-26"))
+    assert r.status_code == 409
+
+
+def test_create_allows_adjacent_stays(client):
+    assert client.post("/bookings", json=booking("2025-11-25", "2025-11-27")).status_code == 201
+    assert client.post("/bookings", json=booking("2025-11-18", "2025-11-20")).status_code == 201
+
+
+def test_bulk_create_atomic_rejects_overlap(client):
+    r = client.post("/bookings/bulk", json=[booking("2025-11-26", "2025-11-28"),
+                                            booking("2025-11-21", "2025-11-23")])
+    assert r.status_code == 409
+    assert r.json["errors"][0]["index"] == 1
+    assert len(room_bookings(client, 1)) == 1
+
+
+def test_bulk_create_checks_rows_against_each_other(client):
+    r = client.post("/bookings/bulk", json=[booking("2025-12-01", "2025-12-05"),
+                                            booking("2025-12-04", "2025-12-06")])
+    assert r.status_code == 409
+    assert len(room_bookings(client, 1)) == 1
+
+
+def test_bulk_create_partial_reports_overlap(client):
+    r = client.post("/bookings/bulk?mode=partial", json=[booking("2025-12-01", "2025-12-05"),
+                                                         booking("2025-12-04", "2025-12-06"),
+                                                         booking("2025-12-05", "2025-12-07")])
+    assert r.status_code == 207
+    assert [e["index"] for e in r.json["errors"]] == [1]
+    assert r.json["ids"][1] is None and None not in (r.json["ids"][0], r.json["ids"][2])
+    assert len(room_bookings(client, 1)) == 3
+
+
+def test_bulk_create_cancelled_booking_skips_overlap(client):
+    r = client.post("/bookings/bulk", json=[booking("2025-11-21", "2025-11-23", booking_status="cancelled")])
+    assert r.status_code == 201
+
+
+def test_bulk_create_unknown_room(client):
+    r = client.post("/bookings/bulk?mode=partial", json=[booking("2025-12-01", "2025-12-02", room_id=999)])
+    assert r.status_code == 207
+    assert r.json["errors"][0]["message"] == "Номер не знайдено"
+
+
+def test_available_rooms_after_bulk_create(client):
+    free = {r["room_id"] for r in client.get("/rooms/available?check_in=2025-12-01&check_out=2025-12-03").json}
+    assert 1 in free
+    client.post("/bookings/bulk", json=[booking("2025-12-01", "2025-12-03")])
+    free = {r["room_id"] for r in client.get("/rooms/available?check_in=2025-12-02&check_out=2025-12-04").json}
+    assert 1 not in free
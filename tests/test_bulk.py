@@ -0,0 +1,59 @@
+import pytest
+
+import crud
+
+
+def row(client, table, pk, id):
+    rows = client.get(f"/{table}?{pk}={id}").json
+    return rows[0] if rows else None
+
+
+@pytest.fixture
+def chunk_of_one(monkeypatch):
+    # Кожен рядок — окрема частина, щоб перевірити збій посеред серії
+    monkeypatch.setattr(crud, "BULK_CHUNK_SIZE", 1)
+
+
+def test_bulk_update_and_delete(client):
+    response = client.patch("/orders/bulk", json={"ids": [1, 2, 99], "set": {"order_status": "new"}})
+    assert response.status_code == 200
+    assert response.json["affected"] == 2 and response.json["missing"] == [99]
+    assert {row(client, "orders", "order_id", i)["order_status"] for i in (1, 2)} == {"new"}
+
+    response = client.delete("/payments/bulk", json={"filter": {"payment_method": "cash"}})
+    assert response.status_code == 200
+    assert client.get("/payments?payment_method=cash").json == []
+
+
+def test_update_stops_at_failed_chunk(client, chunk_of_one):
+    # Бронювання 2 у номері 2 перетинається з бронюванням 1 у номері 1
+    response = client.patch("/bookings/bulk", json={"ids": [1, 2, 3], "set": {"room_id": 1}})
+    assert response.status_code == 409
+    assert response.json["affected"] == 1 and response.json["ids"] == [1]
+    assert response.json["chunks"] == 1
+    assert [row(client, "bookings", "booking_id", i)["room_id"] for i in (1, 2, 3)] == [1, 2, 3]
+
+
+def test_database_error_is_partial_409(client, chunk_of_one):
+    # room_number унікальний: перша частина проходить, друга порушує UNIQUE
+    response = client.patch("/rooms/bulk", json={"ids": [1, 2], "set": {"room_number": 999}})
+    assert response.status_code == 409
+    assert response.json["ids"] == [1]
+    assert row(client, "rooms", "room_id", 1)["room_number"] == 999
+    assert row(client, "rooms", "room_id", 2)["room_number"] == 102
+
+
+def test_failed_chunk_is_rolled_back(client, chunk_of_one, monkeypatch):
+    calls = []
+
+    def record(cur, table, op, ids):
+        calls.append(table)
+        if calls.count("orders") == 2:
+            raise crud.DatabaseError("журнал змін недоступний")
+    monkeypatch.setattr(crud.changefeed, "record", record)
+
+    response = client.delete("/orders/bulk", json={"ids": [1, 2, 3]})
+    assert response.status_code == 409
+    assert response.json["ids"] == [1]
+    assert row(client, "orders", "order_id", 1) is None
+    assert row(client, "orders", "order_id", 2) and row(client, "orders", "order_id", 3)
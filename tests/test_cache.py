@@ -0,0 +1,56 @@
+import pytest
+
+import crud
+from cache import MemoryBackend, ResponseCache
+
+
+def test_invalidate_moves_to_new_generation():
+    cache = ResponseCache(MemoryBackend())
+    key = cache.key("rooms", "/rooms")
+    etag = cache.set(key, b"[]")
+    assert cache.get(key) == (etag, b"[]")
+    cache.invalidate("rooms")
+    assert cache.key("rooms", "/rooms") != key
+    assert cache.get(cache.key("rooms", "/rooms")) is None
+
+
+def test_memory_backend_evicts_and_expires(monkeypatch):
+    backend = MemoryBackend(max_entries=2)
+    for name in ("a", "b", "c"):
+        backend.set(name, name.encode())
+    assert backend.get("a") is None and backend.get("c") == b"c"
+    assert backend.add("c", b"x") is False
+    backend.set("t", b"t", ttl=0.01)
+    monkeypatch.setattr("cache.time.monotonic", lambda: float("inf"))
+    assert backend.get("t") is None
+
+
+def test_etag_and_304(client):
+    response = client.get("/menuitems")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200 and etag
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    response = client.get("/menuitems", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+
+
+def test_hit_does_not_query_database(client, monkeypatch):
+    first = client.get("/rooms?limit=2")
+
+    def fail(*args, **kwargs):
+        pytest.fail("кешована відповідь не повинна читати базу")
+    monkeypatch.setattr(crud, "list_collection", fail)
+    second = client.get("/rooms?limit=2")
+    assert second.get_data() == first.get_data()
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+def test_write_invalidates(client):
+    etag = client.get("/menuitems").headers["ETag"]
+    client.put("/menuitems/1", json={"price": 111})
+    response = client.get("/menuitems", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json[0]["price"] == "111.00"
@@ -0,0 +1,94 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import changefeed
+from db import primary_connection
+
+ORDER = {"client_id": 1, "dish_id": 1, "order_date": "2025-11-16", "quantity": 2, "order_status": "new"}
+
+
+def test_read_returns_changes_with_rows(client):
+    new_id = client.post("/orders", json=ORDER).json["id"]
+    client.put(f"/orders/{new_id}", json={"order_status": "completed"})
+    client.delete(f"/orders/{new_id}")
+    changes = changefeed.read("orders", 0, 100)
+    assert [(c["seq"], c["op"], c["id"]) for c in changes] == \
+        [(1, "insert", new_id), (2, "update", new_id), (3, "delete", new_id)]
+    # row — поточний стан: рядок уже видалено
+    assert all(c["row"] is None for c in changes)
+    assert changefeed.read("orders", 2, 100)[0]["seq"] == 3
+
+
+def test_seq_is_taken_at_commit(app):
+    conn = primary_connection()
+    cur = conn.cursor()
+    changefeed.record(cur, "orders", "update", [1, 2])
+    changefeed.record(cur, "payments", "insert", [1])
+    # До коміту лічильник не змінено і не заблоковано
+    assert changefeed.read("orders", 0, 100) == []
+    conn.rollback()
+    conn.commit()
+    assert changefeed.read("orders", 0, 100) == []
+
+    changefeed.record(cur, "orders", "update", [3])
+    conn.commit()
+    conn.close()
+    assert [(c["seq"], c["id"]) for c in changefeed.read("orders", 0, 100)] == [(1, 3)]
+    assert changefeed.read("payments", 0, 100) == []
+
+
+def test_poll_waits_for_commit(client):
+    assert changefeed.poll("orders", 0, 100) == []
+    threading.Timer(0.2, lambda: client.application.test_client().post("/orders", json=ORDER)).start()
+    started = time.monotonic()
+    changes = changefeed.poll("orders", 0, 100, wait=5)
+    assert [c["op"] for c in changes] == ["insert"]
+    assert time.monotonic() - started < 5
+
+
+def test_long_poll_route(client):
+    response = client.get("/changes/orders?since=0&wait=0")
+    assert response.json == {"changes": [], "next_since": 0}
+    client.post("/orders", json=ORDER)
+    assert client.get("/changes/orders?since=0").json["next_since"] == 1
+    assert client.get("/changes/clients").status_code == 404
+
+
+def test_stream_is_bounded(app):
+    conn = primary_connection()
+    changefeed.record(conn.cursor(), "bookings", "update", [1, 2])
+    conn.commit()
+    conn.close()
+    started = time.monotonic()
+    chunks = list(changefeed.stream("bookings", 1, app.json.dumps, max_duration=0.3))
+    assert time.monotonic() - started < 2
+    assert chunks[0] == f"retry: {changefeed.STREAM_RETRY}\n\n"
+    assert chunks[1].startswith("id: 2\nevent: update\ndata: ")
+    assert len(chunks) == 2
+
+
+def test_stream_resumes_from_last_event_id(client):
+    for _ in range(2):
+        client.post("/orders", json=ORDER)
+    response = client.get("/changes/orders/stream", headers={"Last-Event-ID": "1"})
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b"retry:")
+    assert next(chunks).startswith(b"id: 2\n")
+    response.close()
+
+
+def test_trim_and_expired_since(client):
+    for _ in range(3):
+        client.post("/orders", json=ORDER)
+    conn = primary_connection()
+    assert changefeed.trim(conn, datetime.now() - timedelta(days=1)) == 0
+    assert changefeed.trim(conn, datetime.now() + timedelta(days=1)) == 3
+    conn.close()
+
+    response = client.get("/changes/orders?since=0")
+    assert response.status_code == 410 and "since=3" in response.json["message"]
+    assert client.get("/changes/orders/stream?since=1").status_code == 410
+    assert client.get("/changes/orders?since=3").json == {"changes": [], "next_since": 3}
+    client.post("/orders", json=ORDER)
+    assert [c["seq"] for c in client.get("/changes/orders?since=3").json["changes"]] == [4]
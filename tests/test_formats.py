@@ -0,0 +1,76 @@
+import gzip
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+import formats
+
+
+def test_dates_match_flask_default_provider(client):
+    booking = client.get("/bookings?limit=1").json["items"][0]
+    assert booking["check_in"] == "Thu, 20 Nov 2025 00:00:00 GMT"
+    assert booking["total_amount"] == "2500.00"
+
+
+def test_same_output_as_flask_default_provider(app):
+    data = {"day": date(2025, 11, 20), "at": datetime(2025, 11, 20, 12, 30), "amount": Decimal("0.30"),
+            "name": "Олена"}
+    default = DefaultJSONProvider(app)
+    assert app.json.loads(app.json.dumps(data)) == default.loads(default.dumps(data))
+
+
+@pytest.fixture
+def gzip_calls(monkeypatch):
+    calls = []
+    encode = formats.ENCODERS["gzip"]
+
+    def counting(body):
+        calls.append(len(body))
+        return encode(body)
+    monkeypatch.setitem(formats.ENCODERS, "gzip", counting)
+    monkeypatch.setattr(formats, "COMPRESS_MIN_SIZE", 0)
+    return calls
+
+
+def test_cached_collection_is_compressed_once(client, gzip_calls):
+    plain = client.get("/rooms")
+    assert "Content-Encoding" not in plain.headers
+    headers = {"Accept-Encoding": "gzip"}
+    first = client.get("/rooms", headers=headers)
+    second = client.get("/rooms", headers=headers)
+    assert len(gzip_calls) == 1
+    assert first.headers["Content-Encoding"] == second.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(second.get_data()) == plain.get_data()
+    assert second.headers["ETag"] == f"W/{plain.headers['ETag']}"
+
+    response = client.get("/rooms", headers={**headers, "If-None-Match": second.headers["ETag"]})
+    assert response.status_code == 304 and "Content-Encoding" not in response.headers
+    assert len(gzip_calls) == 1
+
+    # Після запису — нове покоління кешу і новий стиснений варіант
+    client.put("/rooms/1", json={"price": 555})
+    response = client.get("/rooms", headers=headers)
+    assert b"555.00" in gzip.decompress(response.get_data())
+    assert len(gzip_calls) == 2
+
+
+def test_uncached_responses_are_still_compressed(client, gzip_calls):
+    response = client.get("/clients", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.get_data()))[0]["client_id"] == 1
+
+
+@pytest.mark.parametrize("sort_keys", [True, False])
+def test_key_order_without_orjson(app, client, monkeypatch, sort_keys):
+    monkeypatch.setattr(app.json, "sort_keys", sort_keys)
+    data = {"b": 1, "a": {"d": Decimal("1.50"), "c": date(2025, 11, 20)}}
+    fast = app.json.dumps(data), client.get("/bookings?limit=2").get_data(), client.get("/clients/1/folio").get_data()
+    monkeypatch.setattr(formats, "orjson", None)
+    plain = app.json.dumps(data), client.get("/bookings?limit=2").get_data(), client.get("/clients/1/folio").get_data()
+    assert fast[1:] == plain[1:]
+    assert list(json.loads(fast[0])) == list(json.loads(plain[0])) == (["a", "b"] if sort_keys else ["b", "a"])
+    booking = json.loads(plain[1])["items"][0]
+    assert (list(booking) == sorted(booking)) == sort_keys
@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+
+
+def post(client, booking_id, action, **data):
+    return client.post(f"/bookings/{booking_id}/{action}", json=data)
+
+
+def booking(client, booking_id):
+    return client.get(f"/bookings?booking_id={booking_id}").json[0]
+
+
+def room_status(client, room_id):
+    return client.get(f"/rooms?room_id={room_id}").json[0]["room_status"]
+
+
+def payments(client, booking_id):
+    return client.get(f"/payments?booking_id={booking_id}").json
+
+
+def test_check_in_and_out_with_payments(client):
+    # Бронювання 3: номер 3, 6000.00, оплат ще немає
+    response = post(client, 3, "check-in", amount=1000, payment_method="cash")
+    assert response.status_code == 200
+    assert response.json["booking_status"] == "checked_in" and response.json["room_status"] == "occupied"
+    assert response.json["balance"] == "5000.00"
+    assert room_status(client, 3) == "occupied"
+    [payment] = payments(client, 3)
+    assert (payment["amount"], payment["payment_method"]) == ("1000.00", "cash")
+
+    # Без amount гість сплачує залишок
+    response = post(client, 3, "check-out")
+    assert response.status_code == 200
+    assert response.json["balance"] == "0.00"
+    assert sorted(p["amount"] for p in payments(client, 3)) == ["1000.00", "5000.00"]
+    assert booking(client, 3)["booking_status"] == "completed"
+    assert room_status(client, 3) == "available"
+
+
+def test_zero_amount_adds_no_payment(client):
+    post(client, 3, "check-in")
+    response = post(client, 3, "check-out", amount=0)
+    assert response.json["payment_id"] is None and response.json["balance"] == "6000.00"
+    assert payments(client, 3) == []
+
+
+def test_negative_amount(client):
+    assert post(client, 3, "check-in", amount=-1).status_code == 400
+    assert booking(client, 3)["booking_status"] == "confirmed"
+    assert room_status(client, 3) == "available"
+
+
+@pytest.mark.parametrize("steps, action", [
+    (["check-in"], "check-in"),                   # повторний заїзд
+    ([], "check-out"),                            # виїзд без заїзду
+    (["check-in", "check-out"], "check-out"),     # повторний виїзд
+    (["check-in", "check-out"], "check-in"),      # заїзд після виїзду
+])
+def test_illegal_transitions(client, steps, action):
+    for step in steps:
+        assert post(client, 3, step, amount=0).status_code == 200
+    before = booking(client, 3)
+    response = post(client, 3, action, amount=100)
+    assert response.status_code == 409
+    assert booking(client, 3) == before
+    assert payments(client, 3) == []
+
+
+def test_cancelled_booking_and_unknown_id(client):
+    client.put("/bookings/3", json={"booking_status": "cancelled"})
+    assert post(client, 3, "check-in").status_code == 409
+    assert post(client, 99, "check-in").status_code == 404
+
+
+def test_room_still_occupied(client):
+    # Номер 2 у тестових даних позначено як occupied
+    response = post(client, 2, "check-in")
+    assert response.status_code == 409
+    assert booking(client, 2)["booking_status"] == "confirmed"
+
+
+def concurrently(app, requests):
+    barrier = threading.Barrier(len(requests))
+    statuses = [None] * len(requests)
+
+    def run(i, booking_id, action):
+        test_client = app.test_client()
+        barrier.wait()
+        statuses[i] = post(test_client, booking_id, action, amount=0).status_code
+
+    threads = [threading.Thread(target=run, args=(i, *request)) for i, request in enumerate(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(statuses)
+
+
+def test_concurrent_check_out_of_same_booking(app, client):
+    post(client, 3, "check-in", amount=0)
+    assert concurrently(app, [(3, "check-out"), (3, "check-out")]) == [200, 409]
+    assert room_status(client, 3) == "available"
+
+
+def test_concurrent_check_in_to_same_room(app, client):
+    ids = [client.post("/bookings", json={"client_id": 1, "room_id": 3, "check_in": check_in,
+                                          "check_out": check_out, "booking_status": "confirmed"}).json["id"]
+           for check_in, check_out in (("2026-02-01", "2026-02-03"), ("2026-02-03", "2026-02-05"))]
+    assert concurrently(app, [(ids[0], "check-in"), (ids[1], "check-in")]) == [200, 409]
+    assert sorted(booking(client, i)["booking_status"] for i in ids) == ["checked_in", "confirmed"]
@@ -0,0 +1,83 @@
+import uuid
+
+import pytest
+
+from cache import MemoryBackend
+from idempotency import IdempotencyStore
+
+CLIENT = {"name": "Оксана", "surname": "Бондар", "phone": "380501112244", "email": "oksana@example.com"}
+
+
+@pytest.fixture
+def key():
+    return str(uuid.uuid4())
+
+
+def count_clients(client):
+    return len(client.get("/clients").json)
+
+
+def test_store_states():
+    store = IdempotencyStore(MemoryBackend())
+    assert store.claim("k", "fp") is None
+    assert store.claim("k", "fp") == "pending"
+    assert store.claim("k", "other") == "mismatch"
+    store.save("k", "fp", 201, "application/json", b'{"id": 6}')
+    assert store.claim("k", "fp") == (201, "application/json", b'{"id": 6}')
+    store.release("k")
+    assert store.claim("k", "fp") is None
+
+
+def test_repeat_is_replayed(client, key):
+    before = count_clients(client)
+    first = client.post("/clients", json=CLIENT, headers={"Idempotency-Key": key})
+    repeat = client.post("/clients", json=CLIENT, headers={"Idempotency-Key": key})
+    assert first.status_code == repeat.status_code == 201
+    assert repeat.get_data() == first.get_data()
+    assert repeat.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert count_clients(client) == before + 1
+
+
+def test_same_key_other_body(client, key):
+    client.post("/clients", json=CLIENT, headers={"Idempotency-Key": key})
+    response = client.post("/clients", json={**CLIENT, "name": "Інша"}, headers={"Idempotency-Key": key})
+    assert response.status_code == 422
+
+
+def test_key_is_per_path(client, key):
+    client.post("/clients", json=CLIENT, headers={"Idempotency-Key": key})
+    response = client.post("/menuitems", json={"name": "Узвар", "category": "Напої", "price": 40},
+                           headers={"Idempotency-Key": key})
+    assert response.status_code == 201 and "Idempotent-Replayed" not in response.headers
+
+
+def test_pending_request_conflicts(client, key):
+    from idempotency import idempotency_store
+
+    # Ключ займає запит, який ще обробляється (та сама адреса й тіло)
+    client.post("/clients", json=CLIENT, headers={"Idempotency-Key": key})
+    storage_key = f"idem:/clients:{key}"
+    fingerprint = idempotency_store.backend.get(storage_key).split(b"\n")[1]
+    idempotency_store.backend.set(storage_key, b"pending\n" + fingerprint + b"\n")
+    response = client.post("/clients", json=CLIENT, headers={"Idempotency-Key": key})
+    assert response.status_code == 409
+
+
+def test_server_error_releases_key(client, key, monkeypatch):
+    import crud
+
+    def fail(*args):
+        raise RuntimeError("збій")
+    monkeypatch.setattr(crud.changefeed, "record", fail)
+    before = count_clients(client)
+    assert client.post("/clients", json=CLIENT, headers={"Idempotency-Key": key}).status_code == 500
+    monkeypatch.undo()
+
+    response = client.post("/clients", json=CLIENT, headers={"Idempotency-Key": key})
+    assert response.status_code == 201 and "Idempotent-Replayed" not in response.headers
+    assert count_clients(client) == before + 1
+
+
+def test_long_key_is_rejected(client):
+    assert client.post("/clients", json=CLIENT, headers={"Idempotency-Key": "k" * 256}).status_code == 400
@@ -0,0 +1,96 @@
+import io
+import json
+
+import changefeed
+import importer
+from db import DatabaseError
+
+ROOMS = "room_number,type,price,room_status\n"
+BOOKINGS = "client_id,room_id,check_in,check_out,booking_status\n"
+
+
+def import_csv(client, table, text, chunk_size=1000):
+    data = text.encode() if isinstance(text, str) else text
+    response = client.post(f"/{table}/import?chunk_size={chunk_size}", data=data,
+                           content_type="text/csv")
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def room_numbers(client):
+    return sorted(room["room_number"] for room in client.get("/rooms").json)
+
+
+def test_rejected_rows_are_reported(client):
+    text = ROOMS + ("301,Single,500,available\n"
+                    "302,Single,дорого,available\n"   # не число
+                    "101,Double,700,available\n"      # номер 101 уже є (UNIQUE)
+                    "303,Suite,1500\n"                # бракує room_status
+                    "304,Single,500,available,зайве\n")
+    *progress, summary = import_csv(client, "rooms", text)
+    assert [e["line"] for e in progress[0]["errors"]] == [3, 4, 5, 6]
+    assert summary == {**summary, "done": True, "processed": 5, "inserted": 1, "rejected": 4}
+    assert room_numbers(client) == [101, 102, 103, 201, 202, 301]
+
+
+def test_checked_rows_see_earlier_rows(client):
+    # Другий рядок перетинається з першим: під SAVEPOINT відкочується лише він
+    text = BOOKINGS + ("1,3,2026-03-01,2026-03-05,confirmed\n"
+                       "2,3,2026-03-04,2026-03-06,confirmed\n"
+                       "2,3,2026-03-05,2026-03-06,confirmed\n")
+    progress, summary = import_csv(client, "bookings", text)
+    assert [e["line"] for e in progress["errors"]] == [3]
+    assert (summary["inserted"], summary["rejected"]) == (2, 1)
+    booked = client.get("/bookings?room_id=3&check_in__gte=2026-03-01").json
+    assert sorted(b["total_amount"] for b in booked) == ["1500.00", "6000.00"]
+
+
+def test_failed_chunk_is_rolled_back_and_reported(client, monkeypatch):
+    record = changefeed.record
+    calls = []
+
+    def fail_second_chunk(cur, table, op, ids):
+        calls.append(ids)
+        if len(calls) == 2:
+            raise DatabaseError("диск заповнено")
+        record(cur, table, op, ids)
+    monkeypatch.setattr(changefeed, "record", fail_second_chunk)
+    text = ROOMS + "".join(f"{n},Single,500,available\n" for n in range(301, 306))
+    events = import_csv(client, "rooms", text, chunk_size=2)
+    assert events[-1] == {**events[-1], "done": False, "error": "диск заповнено", "line": 4,
+                          "processed": 2, "inserted": 2}
+    assert len(events) == 2
+    assert room_numbers(client) == [101, 102, 103, 201, 202, 301, 302]
+
+
+def test_broken_file_stops_import(client):
+    # Зіпсовані байти далеко за першим буфером декодера, тож помилка виникає посеред імпорту
+    good = "".join(f"{n},Single,500,available\n" for n in range(1000, 1500))
+    text = (ROOMS + good).encode() + b"1500,\xff\xfe,500,available\n"
+    *progress, event = import_csv(client, "rooms", text, chunk_size=100)
+    # Збережено лише цілі частини перед зіпсованою; line — перший рядок першої незбереженої
+    assert event["done"] is False and "utf-8" in event["error"]
+    assert event["inserted"] % 100 == 0 and event["line"] == event["inserted"] + 2
+    assert len(room_numbers(client)) == 5 + event["inserted"]
+
+    response = client.post("/rooms/import", data=ROOMS.encode() + b"\xff\n", content_type="text/csv")
+    assert response.status_code == 400
+
+
+def test_bad_header(client):
+    response = client.post("/rooms/import", data=b"room_number,floor\n1,2\n", content_type="text/csv")
+    assert response.status_code == 400
+    assert "floor" in response.json["message"]
+
+
+def test_cli(app, tmp_path, monkeypatch, capsys):
+    source = tmp_path / "rooms.csv"
+    source.write_text(ROOMS + "301,Single,500,available\n302,Single,x,available\n", encoding="utf-8")
+    rejected = tmp_path / "rejected.jsonl"
+    assert importer.main(["rooms", str(source), "--rejected", str(rejected)]) == 2
+    assert [json.loads(line)["line"] for line in rejected.read_text(encoding="utf-8").splitlines()] == [3]
+
+    monkeypatch.setattr(changefeed, "record", lambda *args: (_ for _ in ()).throw(DatabaseError("збій")))
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO((ROOMS + "303,Suite,900,available\n").encode())))
+    assert importer.main(["rooms", "-"]) == 1
+    assert "рядку 2: збій" in capsys.readouterr().err
@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+
+import db
+from db import ConnectionPool, DatabaseError, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.in_transaction = False
+        self.connected = True
+        self.closed = False
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.in_transaction = False
+        self.rollbacks += 1
+
+    def is_connected(self):
+        return self.connected
+
+    def ping(self, reconnect=False):
+        if not self.connected:
+            raise DatabaseError("gone away")
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def opened():
+    return []
+
+
+def make_pool(opened, **kwargs):
+    def factory():
+        opened.append(FakeConnection())
+        return opened[-1]
+    return ConnectionPool(factory, **{"size": 1, "max_overflow": 1, "timeout": 0.05, **kwargs})
+
+
+def test_connection_is_reused(opened):
+    pool = make_pool(opened)
+    conn = pool.acquire()
+    conn.close()
+    conn.close()
+    pool.acquire().close()
+    assert len(opened) == 1
+    with pytest.raises(DatabaseError):
+        conn.cursor()
+
+
+def test_overflow_and_timeout(opened):
+    pool = make_pool(opened)
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    # Простоює не більше size з'єднань: повернене останнім закривається
+    second.close()
+    first.close()
+    assert [c.closed for c in opened] == [True, False]
+
+
+def test_waiter_gets_released_connection(opened):
+    pool = make_pool(opened, max_overflow=0, timeout=2)
+    conn = pool.acquire()
+    threading.Timer(0.05, conn.close).start()
+    assert pool.acquire()._raw is opened[0]
+    assert len(opened) == 1
+
+
+def test_release_rolls_back_and_drops_broken(opened):
+    pool = make_pool(opened)
+    conn = pool.acquire()
+    opened[0].in_transaction = True
+    conn.close()
+    assert opened[0].rollbacks == 1
+
+    conn = pool.acquire()
+    opened[0].connected = False
+    conn.close()
+    assert opened[0].closed
+    assert pool.acquire()._raw is opened[1]
+
+
+def test_idle_connection_is_pinged(opened):
+    pool = make_pool(opened, ping_after=0)
+    pool.acquire().close()
+    opened[0].connected = False
+    assert pool.acquire()._raw is opened[1]
+
+
+def test_pool_timeout_is_503(client, monkeypatch, opened):
+    pool = make_pool(opened, size=0, max_overflow=0, timeout=0.01)
+    monkeypatch.setattr(db, "_pool", pool)
+    response = client.get("/clients")
+    assert response.status_code == 503
+    assert "з'єднань" in response.json["message"]
@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+import pytest
+
+from db import primary_connection
+from errors import ApiError
+from pricing import PriceIndex
+
+ORDER = {"client_id": 1, "dish_id": 1, "order_date": "2025-11-16", "quantity": 2, "order_status": "new"}
+
+
+@pytest.fixture
+def index(app):
+    return PriceIndex(primary_connection)
+
+
+def set_dish_price(dish_id, price):
+    # Зміна в обхід API, як з іншого процесу
+    conn = primary_connection()
+    conn.cursor().execute("UPDATE menuitems SET price=%s WHERE dish_id=%s", (price, dish_id))
+    conn.commit()
+    conn.close()
+
+
+def test_price_order(index):
+    assert index.price_order({"dish_id": 2, "quantity": 3}, {"dish_id": 2, "quantity": 3}) == \
+        {"price": Decimal("150.00"), "total_amount": Decimal("450.00")}
+    # Зміна лише кількості: ціна з моменту замовлення, а не з поточного меню
+    row = {"dish_id": 2, "quantity": 4, "price": Decimal("140.00")}
+    assert index.price_order(row, {"quantity": 4}) == {"price": Decimal("140.00"), "total_amount": Decimal("560.00")}
+    assert index.price_order(row, {"order_status": "completed"}) == {}
+    with pytest.raises(ApiError) as e:
+        index.price_order({"dish_id": 99, "quantity": 1}, {"dish_id": 99})
+    assert e.value.status == 404
+    with pytest.raises(ApiError):
+        index.price_order({"dish_id": 1, "quantity": 0}, {"quantity": 0})
+
+
+def test_price_booking(index):
+    row = {"room_id": 3, "check_in": "2025-12-01", "check_out": "2025-12-04"}
+    assert index.price_booking(row, row) == {"total_amount": Decimal("4500.00")}
+    with pytest.raises(ApiError):
+        index.price_booking({**row, "check_out": "2025-12-01"}, {"check_out": "2025-12-01"})
+
+
+def test_reload_after_max_age_and_invalidate(app):
+    index = PriceIndex(primary_connection, max_age=3600)
+    assert index.price("dish", 1) == Decimal("100.00")
+    set_dish_price(1, 130)
+    assert index.price("dish", 1) == Decimal("100.00")
+    index.invalidate()
+    assert index.price("dish", 1) == Decimal("130.00")
+
+    fresh = PriceIndex(primary_connection, max_age=0)
+    fresh.price("dish", 1)
+    set_dish_price(1, 140)
+    assert fresh.price("dish", 1) == Decimal("140.00")
+
+
+def test_written_updates_index(index):
+    index.price("dish", 1)
+    index.written("dish", "update", 1, {"price": 120})
+    assert index.price("dish", 1) == Decimal("120.00")
+    index.written("dish", "delete", 1, None)
+    assert index.price("dish", 1) is None
+
+
+def test_order_is_priced_by_server(client):
+    created = client.post("/orders", json={**ORDER, "price": 1, "total_amount": 1})
+    order = client.get(f"/orders?order_id={created.json['id']}").json[0]
+    assert (order["price"], order["total_amount"]) == ("100.00", "200.00")
+
+    # Нова ціна меню діє для нових замовлень, а старе при зміні кількості зберігає свою
+    client.put("/menuitems/1", json={"price": 120})
+    client.put(f"/orders/{created.json['id']}", json={"quantity": 3})
+    order = client.get(f"/orders?order_id={created.json['id']}").json[0]
+    assert (order["price"], order["total_amount"]) == ("100.00", "300.00")
+    created = client.post("/orders", json=ORDER)
+    assert client.get(f"/orders?order_id={created.json['id']}").json[0]["total_amount"] == "240.00"
+
+
+def test_booking_is_priced_by_server(client):
+    client.put("/rooms/4", json={"price": 900})
+    created = client.post("/bookings", json={"client_id": 1, "room_id": 4, "check_in": "2026-01-10",
+                                             "check_out": "2026-01-12", "total_amount": 1,
+                                             "booking_status": "confirmed"})
+    booking = client.get(f"/bookings?booking_id={created.json['id']}").json[0]
+    assert booking["total_amount"] == "1800.00"
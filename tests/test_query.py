@@ -0,0 +1,109 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_date
+
+from errors import ApiError
+from query import compile_filters, decode_cursor, encode_cursor, keyset_clause, order_by, parse_sort
+
+
+def test_compile_filters():
+    clauses, params = compile_filters("bookings", MultiDict([
+        ("booking_status", "confirmed"), ("check_in__gte", "2025-11-01"), ("room_id__in", "1,2,"),
+        ("limit", "10")]))
+    assert clauses == ["booking_status = %s", "check_in >= %s", "room_id IN (%s, %s)"]
+    assert params == ["confirmed", date(2025, 11, 1), 1, 2]
+
+
+@pytest.mark.parametrize("args", [{"name": "x"}, {"room_id__like": "1"}, {"room_id__in": ","},
+                                  {"check_in": "20.11.2025"}])
+def test_compile_filters_rejects(args):
+    with pytest.raises(ApiError):
+        compile_filters("bookings", MultiDict(args))
+
+
+def test_parse_sort_and_order_by():
+    assert parse_sort("orders", "order_id", MultiDict()) == ("order_id", False)
+    assert parse_sort("orders", "order_id", MultiDict({"sort": "-order_date"})) == ("order_date", True)
+    with pytest.raises(ApiError):
+        parse_sort("orders", "order_id", MultiDict({"sort": "quantity"}))
+    assert order_by("order_id", "order_id", True) == "order_id DESC"
+    assert order_by("order_date", "order_id", False) == "order_date, order_id"
+
+
+def test_keyset_clause_breaks_ties_by_pk():
+    assert keyset_clause("order_id", "order_id", False, (7, 7)) == ("order_id > %s", [7])
+    clause, params = keyset_clause("order_date", "order_id", True, (date(2025, 11, 18), 4))
+    assert clause == "(order_date < %s OR (order_date = %s AND order_id < %s) OR order_date IS NULL)"
+    assert params == [date(2025, 11, 18), date(2025, 11, 18), 4]
+
+
+def test_keyset_clause_after_null():
+    assert keyset_clause("booking_id", "payment_id", False, (None, 4)) == \
+        ("((booking_id IS NULL AND payment_id > %s) OR booking_id IS NOT NULL)", [4])
+    assert keyset_clause("booking_id", "payment_id", True, (None, 4)) == \
+        ("(booking_id IS NULL AND payment_id < %s)", [4])
+
+
+@pytest.mark.parametrize("table, column, value", [
+    ("orders", "order_date", date(2025, 11, 18)),
+    ("menuitems", "price", Decimal("70.00")),
+    ("menuitems", "category", "Напої"),
+    ("clients", "client_id", 5),
+    ("payments", "booking_id", None),
+])
+def test_cursor_round_trip(table, column, value):
+    token = encode_cursor(value, 42)
+    assert "=" not in token
+    assert decode_cursor(table, column, token) == (value, 42)
+
+
+@pytest.mark.parametrize("token", ["", "not-base64!", encode_cursor("x", "y"), "WzFd"])
+def test_decode_cursor_rejects(token):
+    with pytest.raises(ApiError):
+        decode_cursor("orders", "order_date", token)
+
+
+@pytest.mark.parametrize("sort", ["order_date", "-order_date", "-order_id", "dish_id"])
+def test_pages_with_ties_on_sort_key(client, sort):
+    column, descending = sort.lstrip("-"), sort.startswith("-")
+    rows = client.get("/orders").json
+    # Дати у відповіді — HTTP-дати, тож для порядку їх треба розібрати
+    key = (lambda row: (parse_date(row[column]), row["order_id"])) if column == "order_date" \
+        else (lambda row: (row[column], row["order_id"]))
+    expected = [row["order_id"] for row in sorted(rows, key=key, reverse=descending)]
+    # При сортуванні за id next_cursor — це after_id
+    param = "after_id" if column == "order_id" else "cursor"
+    seen, cursor = [], None
+    while True:
+        url = f"/orders?sort={sort}&limit=2" + (f"&{param}={cursor}" if cursor else "")
+        page = client.get(url).json
+        seen.extend(row["order_id"] for row in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def walk(client, url):
+    seen, cursor = [], None
+    while True:
+        page = client.get(url + (f"&cursor={cursor}" if cursor else "")).json
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("sort", ["booking_id", "-booking_id", "order_id", "-order_id"])
+def test_pages_over_nullable_column(client, sort):
+    column, descending = sort.lstrip("-"), sort.startswith("-")
+    rows = client.get("/payments").json
+    assert any(row[column] is None for row in rows) and any(row[column] is not None for row in rows)
+    # NULL — найменше значення: перші за зростанням, останні за спаданням
+    key = lambda row: (row[column] is not None, row[column] or 0, row["payment_id"])
+    expected = [row["payment_id"] for row in sorted(rows, key=key, reverse=descending)]
+    seen = walk(client, f"/payments?sort={sort}&limit=2")
+    assert [row["payment_id"] for row in seen] == expected
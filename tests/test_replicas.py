@@ -0,0 +1,143 @@
+import pytest
+
+import db
+import storage
+from db import DatabaseError, ReplicaSet
+
+
+class FakeCursor:
+    rowcount = -1
+
+    def __init__(self, replica):
+        self.replica = replica
+
+    def execute(self, sql, params=()):
+        assert sql == "SHOW REPLICA STATUS"
+        self.replica.status_checks += 1
+        if self.replica.lag == "error":
+            raise DatabaseError("немає прав REPLICATION CLIENT")
+
+    def fetchone(self):
+        return {"Seconds_Behind_Source": self.replica.lag}
+
+    def close(self):
+        pass
+
+
+class FakeReplica:
+    """Сервер-репліка: доступність, відставання і скільки разів його перевіряли."""
+
+    def __init__(self, host):
+        self.host = host
+        self.down = False
+        self.lag = 0
+        self.status_checks = 0
+        self.in_transaction = False
+
+    def connect(self):
+        if self.down:
+            raise DatabaseError(f"{self.host} недоступна")
+        return self
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def is_connected(self):
+        return not self.down
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def servers(monkeypatch):
+    servers = {}
+
+    class FakeBackend:
+        def __init__(self, config):
+            self.connect = servers.setdefault(config["host"], FakeReplica(config["host"])).connect
+    monkeypatch.setattr(storage, "MySQLBackend", FakeBackend)
+    monkeypatch.setattr(db.replica_up, "_values", {})
+    return servers
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(db.time, "monotonic", lambda: now[0])
+    return now
+
+
+def host(conn):
+    return conn._raw.host
+
+
+def test_round_robin(servers):
+    replicas = ReplicaSet(["r1", "r2:3307"])
+    assert [host(replicas.acquire()) for _ in range(4)] == ["r1", "r2", "r1", "r2"]
+
+
+def test_unreachable_replica_is_skipped_until_retry(servers, clock):
+    replicas = ReplicaSet(["r1", "r2"], retry_after=10)
+    servers["r1"].down = True
+    assert [host(replicas.acquire()) for _ in range(3)] == ["r2", "r2", "r2"]
+    assert db.replica_up._values[("r1",)] == 0
+
+    servers["r1"].down = False
+    clock[0] += 11
+    assert sorted(host(replicas.acquire()) for _ in range(2)) == ["r1", "r2"]
+    assert db.replica_up._values[("r1",)] == 1
+
+
+def test_all_down_returns_none(servers):
+    replicas = ReplicaSet(["r1"])
+    servers["r1"].down = True
+    assert replicas.acquire() is None
+
+
+@pytest.mark.parametrize("lag", [30, None, "error"])
+def test_lagging_replica_is_skipped(servers, clock, lag):
+    # None — реплікацію зупинено, "error" — статус недоступний
+    replicas = ReplicaSet(["r1", "r2"], retry_after=10, max_lag=5, check_interval=1)
+    servers["r1"].lag = lag
+    assert [host(replicas.acquire()) for _ in range(2)] == ["r2", "r2"]
+    assert db.replica_up._values[("r1",)] == 0
+
+    servers["r1"].lag = 2
+    clock[0] += 11
+    assert host(replicas.acquire()) == "r1"
+
+
+def test_lag_is_checked_once_per_interval(servers, clock):
+    replicas = ReplicaSet(["r1"], max_lag=5, check_interval=5)
+    for _ in range(3):
+        replicas.acquire().close()
+    assert servers["r1"].status_checks == 1
+    clock[0] += 5
+    replicas.acquire()
+    assert servers["r1"].status_checks == 2
+
+
+def test_reads_go_to_replica_and_writes_to_primary(app, servers, monkeypatch):
+    monkeypatch.setattr(db, "DB_REPLICAS", ["r1"])
+    monkeypatch.setattr(db, "_replicas", ReplicaSet(["r1"]))
+    with app.test_request_context("/rooms"):
+        assert host(db.get_connection()) == "r1"
+        assert not isinstance(db.get_connection(primary=True)._raw, FakeReplica)
+    with app.test_request_context("/rooms", headers={"Cookie": f"{db.PRIMARY_COOKIE}=1"}):
+        assert not isinstance(db.get_connection()._raw, FakeReplica)
+    with app.test_request_context("/rooms", method="POST"):
+        assert not isinstance(db.get_connection()._raw, FakeReplica)
+
+    servers["r1"].down = True
+    db._replicas._mark_down(0)
+    with app.test_request_context("/rooms"):
+        assert not isinstance(db.get_connection()._raw, FakeReplica)
+
+
+def test_write_pins_client_to_primary(client, monkeypatch):
+    monkeypatch.setattr(db, "DB_REPLICAS", ["r1"])
+    response = client.put("/menuitems/1", json={"price": 120})
+    cookie = response.headers["Set-Cookie"]
+    assert cookie.startswith(f"{db.PRIMARY_COOKIE}=1") and f"Max-Age={db.READ_YOUR_WRITES}" in cookie
+    assert "Set-Cookie" not in client.put("/menuitems/99", json={"price": 1}).headers
@@ -0,0 +1,148 @@
+"""
+serve.py запускається окремим процесом на тій самій базі SQLite, що й решта
+тестів; робочі процеси повідомляють про готовність у stderr головного.
+"""
+import os
+import queue
+import re
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="serve.py потребує fork")
+
+READY = re.compile(r"процес (\d+) готовий")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    def __init__(self, **env):
+        self.port = free_port()
+        env = {**os.environ, "SERVER_HOST": "127.0.0.1", "SERVER_PORT": str(self.port), "SERVER_WORKERS": "2",
+               "SERVER_GRACEFUL_TIMEOUT": "5", **env}
+        self.process = subprocess.Popen([sys.executable, os.path.join(ROOT, "serve.py")], cwd=ROOT, env=env,
+                                        stderr=subprocess.PIPE, text=True, encoding="utf-8")
+        self.lines = queue.Queue()
+        self.log = []
+        threading.Thread(target=self.read, daemon=True).start()
+
+    def read(self):
+        for line in self.process.stderr:
+            self.lines.put(line)
+
+    def wait_for(self, pattern, count=1, timeout=20):
+        """Чекає count нових рядків журналу з pattern; повертає їхні збіги."""
+        found = []
+        deadline = time.monotonic() + timeout
+        while len(found) < count:
+            try:
+                line = self.lines.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                pytest.fail(f"не дочекалися {pattern!r}:\n{''.join(self.log)}")
+            self.log.append(line)
+            match = re.search(pattern, line)
+            if match:
+                found.append(match)
+        return found
+
+    def get(self, path):
+        with urllib.request.urlopen(f"http://127.0.0.1:{self.port}{path}", timeout=10) as response:
+            return response.status, response.read()
+
+    def ready_pids(self, count=2):
+        return {int(match.group(1)) for match in self.wait_for(READY, count)}
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+
+@pytest.fixture
+def server(app):
+    server = Server()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(params=["sync", "async"])
+def any_mode_server(app, request):
+    if request.param == "async":
+        pytest.importorskip("uvicorn")
+    server = Server(SERVER_MODE=request.param)
+    yield server
+    server.stop()
+
+
+def exited(pid, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_workers_serve_requests(any_mode_server):
+    server = any_mode_server
+    assert len(server.ready_pids()) == 2
+    status, body = server.get("/clients")
+    assert status == 200 and body.startswith(b"[")
+    status, body = server.get("/metrics")
+    assert b'process_startup_seconds{phase="total"}' in body
+
+
+def test_reload_replaces_workers_without_downtime(server):
+    old = server.ready_pids()
+    failures = []
+    stop = threading.Event()
+
+    def poll():
+        while not stop.is_set():
+            try:
+                server.get("/rooms")
+            except OSError as e:
+                failures.append(e)
+    poller = threading.Thread(target=poll)
+    poller.start()
+    try:
+        server.process.send_signal(signal.SIGHUP)
+        new = server.ready_pids()
+        assert new.isdisjoint(old)
+        assert all(exited(pid) for pid in old)
+        time.sleep(0.2)
+    finally:
+        stop.set()
+        poller.join()
+    assert failures == []
+    assert server.get("/rooms")[0] == 200
+
+
+def test_crashed_worker_is_restarted(server):
+    pid, _ = server.ready_pids()
+    os.kill(pid, signal.SIGKILL)
+    server.wait_for(rf"процес {pid} несподівано завершився")
+    server.ready_pids(1)
+    assert server.get("/clients")[0] == 200
+
+
+def test_graceful_stop(server):
+    pids = server.ready_pids()
+    server.process.send_signal(signal.SIGTERM)
+    assert server.process.wait(timeout=15) == 0
+    assert all(exited(pid, timeout=1) for pid in pids)
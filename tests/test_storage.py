@@ -0,0 +1,120 @@
+import sqlite3
+from decimal import Decimal
+
+import pytest
+
+from storage import MONEY, NUMBER, MoneySum, SQLiteBackend, result_kinds, translate, translate_schema
+
+
+def test_placeholders_and_write_lock():
+    sql, locking, kinds = translate("UPDATE orders SET order_status=%s WHERE order_id=%s")
+    assert sql == "UPDATE orders SET order_status=? WHERE order_id=?"
+    assert locking and kinds == {}
+
+
+def test_for_update_is_removed_and_locks():
+    sql, locking, _ = translate("SELECT room_id FROM rooms WHERE room_id=%s FOR UPDATE")
+    assert sql == "SELECT room_id FROM rooms WHERE room_id=?"
+    assert locking
+    assert translate("SELECT room_id FROM rooms WHERE room_id=%s")[1] is False
+
+
+def test_on_duplicate_key_update():
+    sql, locking, _ = translate(
+        "INSERT INTO revenue_daily (day, payment_method, amount, payments) VALUES (%s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE amount = revenue_daily.amount + VALUES(amount), "
+        "payments = revenue_daily.payments + VALUES(payments)")
+    assert sql == ("INSERT INTO revenue_daily (day, payment_method, amount, payments) VALUES (?, ?, ?, ?) "
+                   "ON CONFLICT DO UPDATE SET amount = ROUND(revenue_daily.amount + excluded.amount, 2), "
+                   "payments = revenue_daily.payments + excluded.payments")
+    assert locking
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("SET FOREIGN_KEY_CHECKS=0", "PRAGMA foreign_keys=OFF"),
+    ("SET FOREIGN_KEY_CHECKS=1", "PRAGMA foreign_keys=ON"),
+    ("ALTER TABLE orders AUTO_INCREMENT = 1", "DELETE FROM sqlite_sequence WHERE name = 'orders' COLLATE NOCASE"),
+])
+def test_mysql_statements(statement, expected):
+    assert translate(statement)[0] == expected
+
+
+def test_money_sum_and_result_kinds():
+    sql, _, kinds = translate("SELECT payment_date, SUM(amount), COUNT(*), SUM(payments) AS payments "
+                              "FROM revenue_daily WHERE method = 'amount' GROUP BY payment_date")
+    assert sql.startswith("SELECT payment_date, MONEY_SUM(amount), COUNT(*), SUM(payments) AS payments")
+    assert kinds == {1: MONEY, 3: NUMBER}
+
+
+def test_union_column_is_money_in_any_branch():
+    kinds = result_kinds("SELECT 'booking' AS kind, NULL AS price, b.total_amount AS amount FROM bookings b "
+                         "UNION ALL SELECT 'order', o.price, o.quantity * o.price FROM orders o")
+    assert kinds == {1: MONEY, 2: MONEY}
+
+
+def test_result_kinds_ignore_subqueries_and_stop_at_star():
+    assert result_kinds("SELECT t.n FROM (SELECT SUM(amount) AS n FROM payments) t") == {}
+    assert result_kinds("SELECT COUNT(price), * , SUM(amount) FROM rooms") == {}
+    assert result_kinds("SELECT (SELECT MAX(price) FROM rooms), room_id FROM rooms") == {0: MONEY}
+
+
+def test_money_sum_is_exact():
+    total = MoneySum()
+    for value in (0.1, 0.2, None, 70):
+        total.step(value)
+    assert total.finalize() == 70.3
+    assert MoneySum().finalize() is None
+
+
+def test_schema_translation():
+    statements = translate_schema("""
+        CREATE DATABASE coursework;
+        USE coursework;
+        CREATE TABLE Rooms (
+            room_id INT PRIMARY KEY AUTO_INCREMENT,
+            type ENUM('Single', 'Double'),
+            price DECIMAL(8,2)
+        );
+        INSERT INTO Rooms (type, price) VALUES ('Single', 500.00);
+    """)
+    assert len(statements) == 2
+    assert "room_id INTEGER PRIMARY KEY AUTOINCREMENT" in statements[0]
+    assert "type TEXT CHECK (type IN ('Single', 'Double'))" in statements[0]
+    assert "price DECIMAL\n" in statements[0]
+
+
+@pytest.fixture
+def conn(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "test.sqlite"))
+    conn = backend.connect()
+    yield conn
+    conn.close()
+
+
+def test_cursor_returns_decimals(conn):
+    cur = conn.cursor(dictionary=True)
+    cur.executemany("INSERT INTO payments (client_id, payment_date, amount, payment_method) VALUES (%s, %s, %s, %s)",
+                    [(1, "2030-01-01", Decimal("0.10"), "card"), (1, "2030-01-01", Decimal("0.20"), "card")])
+    assert cur.lastrowid == 6
+    cur.execute("SELECT amount, SUM(amount) AS total, COUNT(*) AS n FROM payments WHERE payment_date=%s",
+                ("2030-01-01",))
+    row = cur.fetchone()
+    assert row == {"amount": Decimal("0.10"), "total": Decimal("0.30"), "n": 2}
+    assert str(row["total"]) == "0.30"
+    conn.commit()
+
+
+def test_locking_statement_opens_write_transaction(conn):
+    cur = conn.cursor()
+    cur.execute("SELECT room_id FROM rooms WHERE room_id=%s FOR UPDATE", (1,))
+    assert conn.in_transaction
+    conn.rollback()
+    cur.execute("SELECT room_id FROM rooms WHERE room_id=%s", (1,))
+    assert not conn.in_transaction
+
+
+def test_sqlite_errors_are_backend_errors(conn):
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.cursor().execute("INSERT INTO bookings (client_id, room_id, check_in, check_out, total_amount, "
+                              "booking_status) VALUES (%s, %s, %s, %s, %s, %s)",
+                              (99, 1, "2030-01-01", "2030-01-02", 1, "confirmed"))
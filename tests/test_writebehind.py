@@ -0,0 +1,83 @@
+import pytest
+
+from writebehind import WriteBehindQueue
+
+
+class Crash(Exception):
+    """Імітує падіння процесу посеред дозапису."""
+
+
+def order(client_id):
+    return {"client_id": client_id, "dish_id": 1, "order_date": "2025-11-16", "quantity": 2,
+            "price": "100.00", "total_amount": "200.00", "order_status": "new"}
+
+
+@pytest.fixture
+def make_queue(app, tmp_path):
+    import app as application
+
+    def make():
+        return WriteBehindQueue(application.RESOURCES[3], path=str(tmp_path / "queue.sqlite"), name="test")
+    return make
+
+
+def count_orders(client, client_id):
+    return len(client.get(f"/orders?client_id={client_id}").json)
+
+
+def test_drain_inserts_and_rejects(client, make_queue):
+    queue = make_queue()
+    before = count_orders(client, 1), count_orders(client, 2)
+    for client_id in (1, 99, 2):
+        queue.log.append(order(client_id))
+    assert queue.drain() == 3
+    assert (count_orders(client, 1), count_orders(client, 2)) == (before[0] + 1, before[1] + 1)
+    # Неіснуючий клієнт: рядок перенесено в rejected, черга порожня
+    [(seq, row, error)] = queue.log.rejected()
+    assert seq == 2 and row["client_id"] == 99 and error
+    assert queue.log.stats()[0] == 0
+    assert queue.drain() == 0
+
+
+def test_crash_after_commit_keeps_rejects(client, make_queue, monkeypatch):
+    queue = make_queue()
+    before = count_orders(client, 1)
+    queue.log.append(order(1))
+    queue.log.append(order(99))
+    trim = queue.log.trim
+
+    def crash_after_commit(upto):
+        if upto:
+            raise Crash()
+        trim(upto)
+    monkeypatch.setattr(queue.log, "trim", crash_after_commit)
+    with pytest.raises(Crash):
+        queue.drain()
+
+    # Після перезапуску журнал обрізається до last_seq з бази без повторної вставки
+    restarted = make_queue()
+    assert restarted.drain() == 0
+    assert restarted.log.stats()[0] == 0
+    assert count_orders(client, 1) == before + 1
+    assert [seq for seq, _, _ in restarted.log.rejected()] == [2]
+
+
+def test_crash_before_commit_replays_batch(client, make_queue, monkeypatch):
+    queue = make_queue()
+    before = count_orders(client, 1)
+    queue.log.append(order(99))
+    queue.log.append(order(1))
+    reject = queue.log.reject
+
+    def crash_before_commit(*args):
+        reject(*args)
+        raise Crash()
+    monkeypatch.setattr(queue.log, "reject", crash_before_commit)
+    with pytest.raises(Crash):
+        queue.drain()
+    assert count_orders(client, 1) == before
+
+    restarted = make_queue()
+    assert restarted.drain() == 2
+    assert count_orders(client, 1) == before + 1
+    assert [seq for seq, _, _ in restarted.log.rejected()] == [1]
@@ -0,0 +1,226 @@
+"""
+Відкладений запис замовлень (ORDERS_WRITE_BEHIND=1).
+
+POST /orders лише перевіряє поля, дописує рядок у локальний журнал
+(SQLite у режимі WAL) і одразу відповідає 202. Фоновий потік кожного
+процесу забирає з журналу пачки до WRITE_BEHIND_BATCH рядків і вставляє їх
+у Orders одним багаторядковим INSERT разом з оновленням зведених таблиць.
+
+Номер останнього застосованого запису зберігається в MySQL (таблиця
+write_behind_state) у тій самій транзакції, що й вставка, а рядок стану
+блокується на час пачки. Тому після падіння процесу записи, які вже потрапили
+в базу, не вставляться вдруге, а решта дозапишеться при наступному старті;
+кілька процесів можуть ділити один файл журналу. Відхилені базою записи
+переносяться в локальну таблицю rejected ще до коміту пачки в MySQL.
+"""
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+import changefeed
+import metrics
+from db import get_connection
+
+ENABLED = os.environ.get("ORDERS_WRITE_BEHIND", "0") == "1"
+LOG_FILE = os.environ.get("WRITE_BEHIND_LOG",
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), "orders_queue.sqlite"))
+# Ім'я журналу в write_behind_state: у кожного сервера власний файл і власна нумерація
+LOG_NAME = os.environ.get("WRITE_BEHIND_NAME", f"orders@{socket.gethostname()}")
+BATCH_SIZE = int(os.environ.get("WRITE_BEHIND_BATCH", 500))
+# Пауза між перевірками порожнього журналу і після помилки бази, секунди
+INTERVAL = float(os.environ.get("WRITE_BEHIND_INTERVAL", 0.2))
+
+lag = metrics.Gauge("write_behind_lag_seconds", "Вік найстарішого незаписаного в базу замовлення", ())
+pending = metrics.Gauge("write_behind_pending", "Кількість замовлень у локальному журналі", ())
+rejected = metrics.Counter("write_behind_rejected_total", "Замовлення, які база відхилила при дозаписі", ())
+metrics.REGISTRY.extend([lag, pending, rejected])
+
+logger = logging.getLogger(__name__)
+
+
+class OrderLog:
+    """
+    Локальний журнал замовлень.
+
+    Кожен рядок має наростаючий seq; synchronous=FULL означає, що append()
+    повертається лише після запису WAL на диск. Рядки, які база відхилила
+    (наприклад, неіснуючий client_id), переносяться в rejected з текстом помилки.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS queue (seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                                              queued_at REAL NOT NULL, payload TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS rejected (seq INTEGER PRIMARY KEY, queued_at REAL NOT NULL,
+                                                 payload TEXT NOT NULL, error TEXT NOT NULL);
+        """)
+
+    def _connection(self):
+        # sqlite3 не дозволяє ділити з'єднання між потоками, а після fork — між процесами
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def append(self, row):
+        payload = json.dumps(row, default=str, ensure_ascii=False)
+        cur = self._connection().execute("INSERT INTO queue (queued_at, payload) VALUES (?, ?)",
+                                         (time.time(), payload))
+        return cur.lastrowid
+
+    def read(self, after, limit):
+        rows = self._connection().execute(
+            "SELECT seq, queued_at, payload FROM queue WHERE seq > ? ORDER BY seq LIMIT ?", (after, limit))
+        return [(seq, queued_at, json.loads(payload)) for seq, queued_at, payload in rows]
+
+    def reject(self, first, last, failed):
+        """
+        Записує відхилені рядки пачки з seq від first до last однією транзакцією.
+
+        Відмови попередньої спроби тієї ж пачки (якщо її коміт у базу не
+        відбувся) замінюються, тож повтор пачки дає той самий результат.
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM rejected WHERE seq BETWEEN ? AND ?", (first, last))
+            conn.executemany("INSERT INTO rejected VALUES (?, ?, ?, ?)",
+                             [(seq, queued_at, json.dumps(row, default=str, ensure_ascii=False), error)
+                              for seq, queued_at, row, error in failed])
+
+    def rejected(self):
+        """Відхилені рядки: список (seq, row, текст помилки)."""
+        rows = self._connection().execute("SELECT seq, payload, error FROM rejected ORDER BY seq")
+        return [(seq, json.loads(payload), error) for seq, payload, error in rows]
+
+    def trim(self, upto):
+        self._connection().execute("DELETE FROM queue WHERE seq <= ?", (upto,))
+
+    def stats(self):
+        """(кількість рядків у журналі, час додавання найстарішого або None)."""
+        return self._connection().execute("SELECT COUNT(*), MIN(queued_at) FROM queue").fetchone()
+
+
+class WriteBehindQueue:
+    """
+    Черга замовлень між обробником POST і таблицею Orders.
+
+    resource — crud.Resource таблиці orders: з нього беруться INSERT,
+    функція зведених таблиць і on_write.
+    """
+
+    def __init__(self, resource, path=LOG_FILE, name=LOG_NAME, batch_size=BATCH_SIZE, interval=INTERVAL):
+        self.resource = resource
+        self.log = OrderLog(path)
+        self.name = name
+        self.batch_size = batch_size
+        self.interval = interval
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Запускає фоновий потік у поточному процесі (після fork — заново)."""
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def enqueue(self, row):
+        """Дописує перевірений рядок у журнал і повертає його номер."""
+        seq = self.log.append(row)
+        self.start()
+        self._wake.set()
+        return seq
+
+    def _run(self):
+        while True:
+            try:
+                drained = self.drain()
+            except Exception:
+                logger.exception("Помилка дозапису замовлень")
+                drained = 0
+            self._update_metrics()
+            if drained < self.batch_size:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+
+    def _update_metrics(self):
+        count, oldest = self.log.stats()
+        pending.set(count)
+        lag.set(round(time.time() - oldest, 3) if oldest is not None else 0)
+
+    def drain(self):
+        """Переносить одну пачку з журналу в базу. Повертає кількість оброблених записів."""
+        resource = self.resource
+        table = resource.table
+        columns = tuple(table.writable)
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT last_seq FROM write_behind_state WHERE name=%s FOR UPDATE", (self.name,))
+            state = cur.fetchone()
+            if state is None:
+                cur.execute("INSERT INTO write_behind_state (name, last_seq) VALUES (%s, 0)", (self.name,))
+                last_seq = 0
+            else:
+                last_seq = state[0]
+            # Те, що вже в базі, але не встигло зникнути з журналу до падіння
+            self.log.trim(last_seq)
+            entries = self.log.read(last_seq, self.batch_size)
+            if not entries:
+                conn.rollback()
+                return 0
+
+            values = [tuple(None if row.get(c) is None else table.convert(c, row[c]) for c in columns)
+                      for _, _, row in entries]
+            # Один поганий рядок не повинен зупиняти чергу: insert_many відкладає його в errors
+            ids, errors = resource.insert_many(cur, columns, values)
+            failed = [(*entries[i], error) for i, error in errors.items()]
+            ids = [id for id in ids if id is not None]
+            if ids and resource.summary is not None:
+                resource.summary(cur, f"{table.pk} IN ({', '.join(['%s'] * len(ids))})", tuple(ids))
+            changefeed.record(cur, table.name, "insert", ids)
+            last_seq = entries[-1][0]
+            cur.execute("UPDATE write_behind_state SET last_seq=%s WHERE name=%s", (last_seq, self.name))
+            # Після коміту журнал обрізається до last_seq, тож відмови мають
+            # бути збережені раніше: інакше падіння між комітом і записом їх губить
+            if failed:
+                self.log.reject(entries[0][0], last_seq, failed)
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+        for seq, queued_at, row, error in failed:
+            rejected.inc(1)
+            logger.warning("Замовлення #%s відхилено: %s", seq, error)
+        self.log.trim(last_seq)
+        if ids:
+            resource.written("bulk", ids, None)
+        return len(entries)
+
+
+def init_app(app, resource):
+    """Вмикає відкладений запис для resource, якщо задано ORDERS_WRITE_BEHIND=1."""
+    if not ENABLED:
+        return None
+    queue = resource.queue = WriteBehindQueue(resource)
+    # Потік стартує з першим запитом процесу: і після fork, і щоб дозаписати
+    # журнал, що лишився після падіння
+    app.before_request(queue.start)
+    return queue